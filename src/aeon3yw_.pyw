@@ -13,12 +13,14 @@ from pywriter.ui.ui import Ui
 from pywriter.ui.ui_tk import UiTk
 from pywriter.config.configuration import Configuration
 from aeon3ywlib.pywaeon3_converter import Pywaeon3Converter
+from aeon3ywlib.parse_cache import ParseCache
 
 SUFFIX = ''
 APPNAME = 'aeon3yw'
 SETTINGS = dict(
     part_number_prefix='Part',
     chapter_number_prefix='Chapter',
+    narrative_policy='outline',
     type_event='Event',
     type_character='Character',
     type_location='Location',
@@ -42,7 +44,7 @@ SETTINGS = dict(
 )
 
 
-def run(sourcePath, silentMode=True, installDir='.'):
+def run(sourcePath, silentMode=True, installDir='.', cacheDir=None, processes=None, deduplicate=False):
     if silentMode:
         ui = Ui('')
     else:
@@ -60,6 +62,9 @@ def run(sourcePath, silentMode=True, installDir='.'):
     kwargs = {'suffix': SUFFIX}
     kwargs.update(configuration.settings)
     kwargs.update(configuration.options)
+    kwargs['cache_dir'] = cacheDir
+    kwargs['processes'] = processes
+    kwargs['deduplicate'] = deduplicate
     converter = Pywaeon3Converter()
     converter.ui = ui
     converter.run(sourcePath, **kwargs)
@@ -72,14 +77,34 @@ if __name__ == '__main__':
         epilog='')
     parser.add_argument('sourcePath',
                         metavar='Sourcefile',
-                        help='The path of the .aeon or .csv file.')
+                        help='The path of the .aeon, .aeonzip, or .csv file, '
+                        'or a directory or glob pattern referring to several .csv files.')
     parser.add_argument('--silent',
                         action="store_true",
                         help='suppress error messages and the request to confirm overwriting')
+    parser.add_argument('--nocache',
+                        action="store_true",
+                        help='bypass the parse cache')
+    parser.add_argument('--clearcache',
+                        action="store_true",
+                        help='clear the parse cache before converting')
+    parser.add_argument('--processes',
+                        type=int,
+                        metavar='N',
+                        help='parse a csv file with N worker processes')
+    parser.add_argument('--deduplicate',
+                        action="store_true",
+                        help='skip csv rows with the same label and type as a preceding row')
     args = parser.parse_args()
     try:
         homeDir = str(Path.home()).replace('\\', '/')
         installDir = f'{homeDir}/.pywriter/{APPNAME}/config'
+        cacheDir = f'{homeDir}/.pywriter/{APPNAME}/cache'
     except:
         installDir = '.'
-    run(args.sourcePath, args.silent, installDir)
+        cacheDir = None
+    if args.clearcache and cacheDir is not None:
+        ParseCache(cacheDir).clear()
+    if args.nocache:
+        cacheDir = None
+    run(args.sourcePath, args.silent, installDir, cacheDir, args.processes, args.deduplicate)
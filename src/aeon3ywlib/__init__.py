@@ -3,11 +3,22 @@
 Modules:
 
 json_timeline3 -- Provide a class for Aeon Timeline 3 JSON representation.
+zip_timeline3 -- Provide a class for zipped Aeon Timeline 3 project representation.
 csv_timeline3 -- Provide a class for Aeon Timeline 3 csv representation.
 uid_helper -- Provide a GUID generator for Aeon Timeline.
 dt_helper -- Provide helper functions for date/time processing.
 pywaeon3_converter -- Provide an Aeon3 converter class for yWriter projects. 
 aeon3_fop -- Provide helper functions for Aeon Timeline 3 file operation.
+json_stream -- Provide a class for incremental reading of the JSON part of Aeon Timeline 3 files.
+parse_cache -- Provide a persistent cache for novel structures built from timeline files.
+label_schema -- Provide a class for resolving the configured labels of Aeon Timeline 3 definitions.
+lazy_elements -- Provide a mapping class for novel elements built on first access.
+column_plan -- Provide a class for locating the configured fields of an Aeon Timeline 3 csv export.
+csv_chunks -- Provide functions for decoding an Aeon Timeline 3 csv export in chunks.
+csv_combiner -- Provide a class for reading several csv files as one.
+yw7_target -- Provide a class for yWriter 7 project files created or updated by the converter.
+io_account -- Provide a class for accounting the file I/O of a conversion.
+merge_plan -- Provide a class for merging the fields of novel elements by a table, and a list merging function.
 
 Copyright (c) 2022 Peter Triesberger
 For further information see https://github.com/peter88213/aeon3yw
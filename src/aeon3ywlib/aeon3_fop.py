@@ -5,48 +5,120 @@ For further information see https://github.com/peter88213/aeon3yw
 Published under the MIT License (https://opensource.org/licenses/mit-license.php)
 """
 import os
+import re
+import mmap
+import json
 import codecs
 from pywriter.pywriter_globals import ERROR
 
+_DECODER = json.JSONDecoder()
+_UNDECODABLE = re.compile('[\udc80-\udcff]')
+# Bytes that are not valid UTF-8 show up as lone surrogates with the "surrogateescape" error handler.
+_CHUNK_SIZE = 1 << 20
+# Number of bytes decoded first; the decoded span doubles with each further attempt.
+
+
+def locate_json(buffer):
+    """Locate and decode the JSON part of an Aeon 3 project.
+
+    Positional arguments:
+        buffer -- bytes-like object (bytes, mmap, or memoryview) with the project file's content.
+
+    Return a tuple with two elements:
+    - jsonData: the decoded JSON object
+    - jsonStr: str containing the JSON part
+
+    The JSON part starts with the first opening curly bracket.
+    Its end is determined by the C-accelerated JSON decoder,
+    so curly brackets within JSON strings are handled correctly.
+    The buffer is decoded in spans doubling in size, until the JSON part is complete,
+    so the binary data following the JSON part is decoded at most up to the JSON part's size.
+
+    Raise ValueError in case of corrupted data.
+    Raise UnicodeError if the JSON part is not UTF-8 encoded.
+    """
+    start = buffer.find(b'{')
+    if start < 0:
+        raise ValueError('No JSON part found')
+
+    # Bytes that are not valid UTF-8 are preserved as lone surrogates.
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='surrogateescape')
+    size = len(buffer)
+    text = ''
+    pos = start
+    with memoryview(buffer) as view:
+        while True:
+            end = min(pos + max(pos - start, _CHUNK_SIZE), size)
+            text += decoder.decode(view[pos:end], final=(end == size))
+            pos = end
+            try:
+                jsonData, jsonEnd = _DECODER.raw_decode(text)
+                break
+
+            except(ValueError):
+                if pos == size:
+                    raise
+
+    jsonStr = text[:jsonEnd]
+    if _UNDECODABLE.search(jsonStr) is not None:
+        raise UnicodeError('JSON part is not UTF-8 encoded')
+
+    return jsonData, jsonStr
+
+
+def _read_file(filePath):
+    """Return a tuple: (message, jsonData, jsonStr).
 
-def scan_file(filePath):
-    """Read and scan the project file.
-    
     Positional arguments:
         filePath -- str: Path to the Aeon 3 project file.
-    
-    Return a string containing either the JSON part or an error message.
+
+    The file is memory-mapped, so it is not copied to the heap as a whole.
     """
     try:
         with open(filePath, 'rb') as f:
-            binInput = f.read()
+            try:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    jsonData, jsonStr = locate_json(mm)
+            except(UnicodeError):
+                return f'{ERROR}Cannot decode "{os.path.normpath(filePath)}".', None, None
+
+            except(ValueError):
+                # Includes json.JSONDecodeError, and the error raised when mapping an empty file.
+                return f'{ERROR}Corrupted data.', None, None
+
     except(FileNotFoundError):
-        return f'{ERROR}"{os.path.normpath(filePath)}" not found.'
+        return f'{ERROR}"{os.path.normpath(filePath)}" not found.', None, None
 
     except:
-        return f'{ERROR}Cannot read "{os.path.normpath(filePath)}".'
-    
-    # JSON part: all characters between the first and last curly bracket.
-    chrData = []
-    opening = ord('{')
-    closing = ord('}')
-    level = 0
-    for c in binInput:
-        if c == opening:
-            level += 1
-        if level > 0:
-            chrData.append(c)
-            if c == closing:
-                level -= 1
-                if level == 0:
-                    break
-
-    if level != 0:
-        return f'{ERROR}Corrupted data.'
+        return f'{ERROR}Cannot read "{os.path.normpath(filePath)}".', None, None
 
-    try:
-        jsonStr = codecs.decode(bytes(chrData), encoding='utf-8')
-    except:
-        return f'{ERROR}Cannot decode "{os.path.normpath(filePath)}".'
+    return 'JSON part found.', jsonData, jsonStr
+
+
+def scan_file(filePath):
+    """Read and scan the project file.
+
+    Positional arguments:
+        filePath -- str: Path to the Aeon 3 project file.
+
+    Return a string containing either the JSON part or an error message.
+    """
+    message, __, jsonStr = _read_file(filePath)
+    if message.startswith(ERROR):
+        return message
 
     return jsonStr
+
+
+def read_json(filePath):
+    """Read the project file and decode its JSON part.
+
+    Positional arguments:
+        filePath -- str: Path to the Aeon 3 project file.
+
+    Return a tuple with two elements:
+    - A message beginning with the ERROR constant in case of error
+    - jsonData: the decoded JSON object, or None in case of error
+    """
+    message, jsonData, __ = _read_file(filePath)
+    return message, jsonData
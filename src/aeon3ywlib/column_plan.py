@@ -0,0 +1,86 @@
+"""Provide a class for locating the configured fields of an Aeon Timeline 3 csv export.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/aeon3yw
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+
+
+class ColumnPlan:
+    """Column indices of the fields of a csv export, compiled from its header.
+
+    Public methods:
+        get_assignments(pairs) -- return (attribute, column index) tuples of the present fields.
+        report() -- return a message listing the missing required fields.
+        report_absent() -- return a message listing the missing optional fields.
+
+    Public instance variables:
+        width -- int: number of columns.
+        missing -- list of the labels of missing required fields.
+        absent -- list of (setting, label) tuples of the missing optional fields.
+
+    For each field, there is an instance variable holding its column index,
+    or None if the field is missing.
+    """
+
+    def __init__(self, header, fields):
+        """Locate the fields in the header.
+
+        Positional arguments:
+            header -- list of the column labels.
+            fields -- iterable of (name, label, setting, required) tuples:
+                      name -- str: name of the instance variable holding the column index.
+                      label -- str: column label. Fields with an empty label are considered missing.
+                      setting -- str: name of the setting holding the label, or None for fixed labels.
+                      required -- bool: if True, the field must be present.
+
+        If a label occurs more than once, the first column is used.
+        """
+        self.width = len(header)
+        self.missing = []
+        self.absent = []
+        columns = {}
+        for i, label in enumerate(header):
+            columns.setdefault(label, i)
+        for name, label, setting, required in fields:
+            column = None
+            if label:
+                column = columns.get(label, None)
+            setattr(self, name, column)
+            if column is None:
+                if required:
+                    self.missing.append(label)
+                elif label:
+                    self.absent.append((setting, label))
+
+    def get_assignments(self, pairs):
+        """Return a list of (attribute, column index) tuples for the present fields.
+
+        Positional arguments:
+            pairs -- iterable of (attribute, name) tuples; name refers to a field.
+        """
+        assignments = []
+        for attr, name in pairs:
+            column = getattr(self, name)
+            if column is not None:
+                assignments.append((attr, column))
+        return assignments
+
+    def report(self):
+        """Return a message listing the missing required fields, or an empty string."""
+        if not self.missing:
+            return ''
+
+        labels = ', '.join(f'"{label}"' for label in self.missing)
+        if len(self.missing) == 1:
+            return f'Label {labels} is missing.'
+
+        return f'Labels {labels} are missing.'
+
+    def report_absent(self):
+        """Return a message listing the missing optional fields, or an empty string."""
+        if not self.absent:
+            return ''
+
+        labels = ', '.join(f'"{label}" ({setting})' for setting, label in self.absent)
+        return f'Columns not found: {labels}.'
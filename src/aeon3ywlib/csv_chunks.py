@@ -0,0 +1,267 @@
+"""Provide functions for decoding an Aeon Timeline 3 csv export in chunks.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/aeon3yw
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+import os
+import csv
+import io
+from pywriter.model.scene import Scene
+from aeon3ywlib.dt_helper import normalize_iso_dates
+from aeon3ywlib.dt_helper import SECONDS_PER_DAY
+
+BLOCK_SIZE = 1048576
+# Number of bytes read at once when searching for chunk boundaries.
+
+
+def find_record_offsets(filePath, chunks):
+    """Return the byte offsets splitting a csv file into chunks of whole records.
+
+    Positional arguments:
+        filePath -- str: path to the csv file.
+        chunks -- int: number of chunks aimed at.
+
+    Return a list of offsets, beginning with 0 and ending with the file size.
+    Chunks end at the first line break after an even split of the file that is
+    outside of quoted fields, i.e. preceded by an even number of quote characters.
+    This requires fields containing quote characters to be quoted,
+    as written by Aeon Timeline and the csv module.
+    """
+    size = os.path.getsize(filePath)
+    targets = [size * i // chunks for i in range(chunks - 1, 0, -1)]
+    # Remaining split positions, the next one last.
+    offsets = [0]
+    quotes = 0
+    blockStart = 0
+    with open(filePath, 'rb') as f:
+        while targets:
+            block = f.read(BLOCK_SIZE)
+            if not block:
+                break
+
+            blockEnd = blockStart + len(block)
+            searchStart = 0
+            while targets and targets[-1] < blockEnd:
+                lineEnd = block.find(b'\n', max(targets[-1] - blockStart, searchStart))
+                if lineEnd < 0:
+                    # Continue with the next block.
+                    break
+
+                searchStart = lineEnd + 1
+                if (quotes + block.count(b'"', 0, lineEnd)) % 2 == 0:
+                    offsets.append(blockStart + searchStart)
+                    while targets and targets[-1] < blockStart + searchStart:
+                        targets.pop()
+            quotes += block.count(b'"')
+            blockStart = blockEnd
+    if offsets[-1] < size:
+        offsets.append(size)
+    return offsets
+
+
+def get_narrative_position(narrativeString):
+    """Return a tuple (narrative type, narrative position) of a "Narrative Position" field.
+
+    The narrative position is a sortable tuple of numbers;
+    it is empty if the field is empty, and None if it is invalid.
+    """
+    if not narrativeString:
+        return '', ()
+
+    narrativeType, narrativePosition = narrativeString.split(' ')
+    try:
+        return narrativeType, tuple(int(number) for number in narrativePosition.split('.'))
+
+    except(ValueError):
+        return narrativeType, None
+
+
+def get_ids(titles, idsByTitle):
+    """Return a list of element IDs, or None if an element is unknown.
+
+    Positional arguments:
+        titles -- list of element titles.
+        idsByTitle -- dict: element ID by title.
+    """
+    elemIds = []
+    for title in titles:
+        elemId = idsByTitle.get(title, None)
+        if elemId is None:
+            return None
+
+        elemIds.append(elemId)
+    return elemIds
+
+
+def decode_events(rows, plan, memo, idTables, delimiter=','):
+    """Return a list of compact records of event rows.
+
+    Positional arguments:
+        rows -- list of the events' csv rows.
+        plan -- ColumnPlan instance compiled from the header.
+        memo -- dict: memo to be passed to normalize_iso_dates().
+        idTables -- tuple of dicts with the character, location, and item IDs by title.
+
+    Optional arguments:
+        delimiter -- str: delimiter of the list entries within a field.
+
+    Each record is a tuple with the following elements:
+    - narrativeString -- str: the "Narrative Position" field.
+    - narrativeType, narrativePosition -- as returned by get_narrative_position().
+    - title -- str: scene title.
+    - date, time -- str: start date and time; the Scene class null values if unknown.
+    - lastsDays, lastsHours, lastsMinutes -- str: duration, or None if unknown.
+    - desc, notes -- str, or None if the column is missing.
+    - tags -- list of str, or None if there are no tags.
+    - locations, characters, items -- list of IDs as returned by get_ids(), or None if the column is missing.
+      The viewpoint character comes first.
+    Raise ValueError if a date/time is invalid.
+    """
+    chrIdsByTitle, locIdsByTitle, itmIdsByTitle = idTables
+    starts = normalize_iso_dates([row[plan.start] for row in rows], memo)
+    ends = normalize_iso_dates([row[plan.end] for row in rows], memo)
+    positionColumn = plan.position
+    titleColumn = plan.sceneTitle
+    descColumn = plan.sceneDesc
+    notesColumn = plan.notes
+    tagColumn = plan.tags
+    locationColumn = plan.location
+    characterColumn = plan.character
+    itemColumn = plan.item
+    viewpointColumn = plan.viewpoint
+    dateTimes = {}
+    durations = {}
+    # Recurring values are shared, so the records take less memory, and are faster to transfer.
+    records = []
+    for row, start, end in zip(rows, starts, ends):
+        lastsDays = lastsHours = lastsMinutes = None
+        if start is None:
+            date = Scene.NULL_DATE
+            time = Scene.NULL_TIME
+        else:
+            startDateTimeStr, startSeconds = start
+            dateTime = dateTimes.get(startDateTimeStr, None)
+            if dateTime is None:
+                dateTime = dateTimes[startDateTimeStr] = startDateTimeStr.split(' ')
+            date, time = dateTime
+            if end is not None:
+                # Calculate duration of scenes that begin after 99-12-31.
+                sceneDuration = end[1] - startSeconds
+                duration = durations.get(sceneDuration, None)
+                if duration is None:
+                    days, seconds = divmod(sceneDuration, SECONDS_PER_DAY)
+                    duration = durations[sceneDuration] = (str(days), str(seconds // 3600), str((seconds % 3600) // 60))
+                lastsDays, lastsHours, lastsMinutes = duration
+        tags = None
+        if tagColumn is not None and row[tagColumn]:
+            tags = row[tagColumn].split(delimiter)
+        characters = None
+        if characterColumn is not None:
+            characters = get_ids(row[characterColumn].split(delimiter), chrIdsByTitle)
+        if viewpointColumn is not None:
+            vpId = chrIdsByTitle.get(row[viewpointColumn], None)
+            if vpId is not None:
+                if characters is None:
+                    characters = []
+                elif vpId in characters:
+                    characters.remove(vpId)
+                characters.insert(0, vpId)
+        narrativeString = row[positionColumn]
+        records.append((
+            narrativeString,
+            *get_narrative_position(narrativeString),
+            row[titleColumn],
+            date,
+            time,
+            lastsDays,
+            lastsHours,
+            lastsMinutes,
+            None if descColumn is None else row[descColumn],
+            None if notesColumn is None else row[notesColumn],
+            tags,
+            None if locationColumn is None else get_ids(row[locationColumn].split(delimiter), locIdsByTitle),
+            characters,
+            None if itemColumn is None else get_ids(row[itemColumn].split(delimiter), itmIdsByTitle),
+        ))
+    return records
+
+
+def read_element_rows(filePath, start, end, plan, elementTypes, separator=','):
+    """Parse a chunk of a csv file and return its character, location, and item rows.
+
+    To be run in a worker process.
+
+    Positional arguments:
+        filePath -- str: path to the csv file.
+        start, end -- int: byte offsets of the chunk, as returned by find_record_offsets().
+        plan -- ColumnPlan instance compiled from the header.
+        elementTypes -- set of the types of the rows to return.
+
+    Optional arguments:
+        separator -- str: csv field separator.
+
+    Return a list of rows as tuples, padded to the header's width.
+    """
+    typeColumn = plan.type
+    return [tuple(row) for row in _parse_chunk(filePath, start, end, plan, separator) if row[typeColumn] in elementTypes]
+
+
+def read_chunk(filePath, start, end, plan, eventType, folderType, idTables, separator=',', delimiter=','):
+    """Parse a chunk of a csv file and decode its events.
+
+    To be run in a worker process when the characters, locations, and items are known.
+
+    Positional arguments:
+        filePath -- str: path to the csv file.
+        start, end -- int: byte offsets of the chunk, as returned by find_record_offsets().
+        plan -- ColumnPlan instance compiled from the header.
+        eventType -- str: type of the event rows.
+        folderType -- str: type of the narrative folder rows.
+        idTables -- tuple of dicts with the character, location, and item IDs by title.
+
+    Optional arguments:
+        separator -- str: csv field separator.
+        delimiter -- str: delimiter of the list entries within a field.
+
+    Return a tuple with two elements:
+    - rows: list of the narrative folder rows as tuples, padded to the header's width,
+      and of None for each event row, in file order.
+    - events: list of the event records as returned by decode_events(),
+      or None if a date/time is invalid.
+    """
+    typeColumn = plan.type
+    rows = []
+    eventRows = []
+    for row in _parse_chunk(filePath, start, end, plan, separator):
+        entityType = row[typeColumn]
+        if entityType == eventType:
+            eventRows.append(row)
+            rows.append(None)
+        elif entityType == folderType:
+            rows.append(tuple(row))
+    try:
+        events = decode_events(eventRows, plan, {}, idTables, delimiter)
+    except(ValueError):
+        events = None
+    return rows, events
+
+
+def _parse_chunk(filePath, start, end, plan, separator):
+    """Return a list of the non-blank rows of a chunk, padded to the header's width.
+
+    The header is skipped in the first chunk.
+    """
+    with open(filePath, 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start)
+    width = plan.width
+    rows = []
+    for row in csv.reader(io.StringIO(data.decode('utf-8'), newline=''), delimiter=separator):
+        if row:
+            if len(row) < width:
+                row.extend([''] * (width - len(row)))
+            rows.append(row)
+    if start == 0:
+        del rows[:1]
+    return rows
@@ -0,0 +1,152 @@
+"""Provide a class for reading several csv files as one.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/aeon3yw
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+import os
+import csv
+import glob
+
+GLOB_CHARACTERS = '*?['
+
+COMBINED_CSV = 'combined.csv'
+# Name of the file written by tools/combine_csv.py; not read as part of an export.
+
+
+def find_csv_files(sourcePath):
+    """Return the paths of the csv files a source path refers to.
+
+    Positional arguments:
+        sourcePath -- str: path to a directory, or a glob pattern.
+
+    Return a sorted list of the csv files in the directory, or of the files matching the pattern,
+    except a combined csv file written before.
+    Return None if sourcePath is an existing file, or neither a directory nor a pattern.
+    """
+    if os.path.isfile(sourcePath):
+        # File names may contain glob characters.
+        return None
+
+    if os.path.isdir(sourcePath):
+        pattern = os.path.join(glob.escape(sourcePath), '*.csv')
+    elif any(character in sourcePath for character in GLOB_CHARACTERS):
+        pattern = sourcePath
+    else:
+        return None
+
+    return sorted(
+        filePath for filePath in glob.glob(pattern)
+        if os.path.isfile(filePath) and os.path.basename(filePath) != COMBINED_CSV
+    )
+
+
+class CsvCombiner:
+    """Rows of several csv files with different columns, combined into one table.
+
+    Public methods:
+        iter_rows() -- iterate over the combined rows, beginning with the header.
+        write(filePath) -- write the combined rows to a csv file.
+
+    Public instance variables:
+        filePaths -- list of str: paths to the csv files.
+        header -- list of the column labels of all files, in order of their first appearance.
+        duplicates -- int: number of rows skipped as duplicates while iterating.
+
+    The rows are read file by file; only the header and the keys of the rows are held.
+    """
+
+    def __init__(self, filePaths, keyLabels=None, separator=','):
+        """Set the files to combine.
+
+        Positional arguments:
+            filePaths -- list of str: paths to the csv files, in reading order.
+
+        Optional arguments:
+            keyLabels -- tuple of column labels. If given, skip rows whose values
+                         in these columns are the same as in a preceding row.
+            separator -- str: csv field separator.
+        """
+        self.filePaths = filePaths
+        self.header = []
+        self.duplicates = 0
+        self._keyLabels = keyLabels
+        self._separator = separator
+
+    def iter_rows(self):
+        """Iterate over the combined rows as lists, beginning with the header; skip blank lines.
+
+        The header is compiled in a pre-pass over the first row of each file.
+        Each row has a value for each column of the header; missing values are empty.
+        Raise OSError if a file cannot be read, and csv.Error if a file cannot be parsed.
+        """
+        #--- Compile the header, and map the columns of each file to its columns.
+        self.header = []
+        self.duplicates = 0
+        columns = {}
+        fileColumns = []
+        for filePath in self.filePaths:
+            rows = self._read_file(filePath)
+            fileHeader = next(rows, [])
+            rows.close()
+            mapping = []
+            labels = set()
+            for i, label in enumerate(fileHeader):
+                if label in labels:
+                    # The first column with a label is used.
+                    continue
+
+                labels.add(label)
+                if not label in columns:
+                    columns[label] = len(self.header)
+                    self.header.append(label)
+                mapping.append((i, columns[label]))
+            fileColumns.append(mapping)
+        yield list(self.header)
+
+        keyColumns = None
+        if self._keyLabels is not None:
+            keyColumns = [columns.get(label, None) for label in self._keyLabels]
+            keys = set()
+        width = len(self.header)
+        for filePath, mapping in zip(self.filePaths, fileColumns):
+            passThrough = len(mapping) == width and all(i == column for i, column in mapping)
+            rows = self._read_file(filePath)
+            next(rows, None)
+            for row in rows:
+                if passThrough:
+                    if len(row) < width:
+                        row.extend([''] * (width - len(row)))
+                    del row[width:]
+                    combinedRow = row
+                else:
+                    combinedRow = [''] * width
+                    for i, column in mapping:
+                        if i < len(row):
+                            combinedRow[column] = row[i]
+                if keyColumns is not None:
+                    key = tuple('' if column is None else combinedRow[column] for column in keyColumns)
+                    if key in keys:
+                        self.duplicates += 1
+                        continue
+
+                    keys.add(key)
+                yield combinedRow
+
+    def write(self, filePath):
+        """Write the combined rows to a csv file, with all fields quoted.
+
+        Positional arguments:
+            filePath -- str: path to the csv file to write.
+
+        Raise OSError if a file cannot be read or written, and csv.Error if a file cannot be parsed.
+        """
+        with open(filePath, 'w', newline='', encoding='utf-8') as f:
+            csv.writer(f, delimiter=self._separator, quoting=csv.QUOTE_ALL).writerows(self.iter_rows())
+
+    def _read_file(self, filePath):
+        """Iterate over the rows of a csv file as lists; skip blank lines."""
+        with open(filePath, newline='', encoding='utf-8') as f:
+            for row in csv.reader(f, delimiter=self._separator):
+                if row:
+                    yield row
@@ -6,14 +6,22 @@ Published under the MIT License (https://opensource.org/licenses/mit-license.php
 """
 import os
 import csv
-from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
+from itertools import islice
 from pywriter.pywriter_globals import ERROR
 from pywriter.model.novel import Novel
 from pywriter.model.scene import Scene
 from pywriter.model.chapter import Chapter
 from pywriter.model.world_element import WorldElement
 from pywriter.model.character import Character
-from aeon3ywlib.dt_helper import fix_iso_dt
+from aeon3ywlib.csv_chunks import find_record_offsets
+from aeon3ywlib.csv_chunks import get_narrative_position
+from aeon3ywlib.csv_chunks import decode_events
+from aeon3ywlib.csv_chunks import read_element_rows
+from aeon3ywlib.csv_chunks import read_chunk
+from aeon3ywlib.column_plan import ColumnPlan
+from aeon3ywlib.csv_combiner import CsvCombiner
 
 
 class CsvTimeline3(Novel):
@@ -22,14 +30,38 @@ class CsvTimeline3(Novel):
     Public methods:
         read() -- parse the file and get the instance variables.
 
+    Public instance variables:
+        streaming -- bool: if True, read the file twice instead of holding the event rows;
+                           if None, depending on the file size.
+        processes -- int: number of worker processes parsing the file; if None, parse in this process.
+        csvFiles -- list of str: paths to csv files read as one, or None if only the file at filePath is read.
+        deduplicate -- bool: if True, skip rows with the same label and type as a preceding row.
+
     Represents a csv file with a record per scene.
     - Records are separated by line breaks.
     - Data fields are delimited by commas.
+    Events refer to characters, locations, and items by title, so these are read first.
+    In streaming mode, the events and narrative folders are read in a second pass over the file,
+    so the memory needed does not depend on the number of rows.
+    With worker processes, the file is split into chunks of whole records, parsed in parallel.
+    The workers also decode the event rows; the novel elements are then built in file order,
+    so the element IDs are the same as with serial parsing.
+    An export split into several csv files can be read as one; their columns are combined.
     """
     EXTENSION = '.csv'
     DESCRIPTION = 'Aeon Timeline CSV export'
     SUFFIX = ''
+    STREAMING_THRESHOLD = 50000000
+    # Files larger than this number of bytes are read in streaming mode by default.
+    CHUNK_SIZE = 1000000
+    # Minimum number of bytes per chunk parsed by a worker process.
+    CHUNKS_PER_PROCESS = 4
+    # Number of chunks per worker process, balancing the load.
+
     _SEPARATOR = ','
+    _INTERNAL_DELIMITER = ','
+    _BATCH_SIZE = 1000
+    # Number of rows whose event dates are converted at once.
 
     # Aeon 3 csv export structure (fix part)
 
@@ -78,6 +110,17 @@ class CsvTimeline3(Novel):
             character_desc_label3 -- str: label of the character property imported as 3rd part of the description.
             character_bio_label -- str: 
             character_aka_label -- str: label of the "Nickname" property of characters.           
+
+        Optional keyword arguments:
+            streaming -- bool: if True, read the file in streaming mode; if False, hold the event rows.
+                               Default: depending on the file size.
+            processes -- int: number of worker processes parsing the file in parallel.
+                              Default: parse the file in this process.
+                              Ignored when several csv files are read, or rows are de-duplicated.
+            csv_files -- list of str: paths to several csv files to be read as one, in this order.
+                         Default: read the file at filePath.
+            deduplicate -- bool: if True, skip rows with the same label and type as a preceding row,
+                                 also within a single file. Default: False.
         
         Extends the superclass constructor.
         """
@@ -108,6 +151,35 @@ class CsvTimeline3(Novel):
         self.characterBioField = kwargs['character_bio_label']
         self.characterAkaField = kwargs['character_aka_label']
         self.locationDescField = kwargs['location_desc_label']
+        self.streaming = kwargs.get('streaming', None)
+        self.processes = kwargs.get('processes', None)
+        self.csvFiles = kwargs.get('csv_files', None)
+        self.deduplicate = kwargs.get('deduplicate', False)
+
+        # Fields located by the column plan: (name, label, setting, required).
+        self._fields = (
+            ('type', self._TYPE_FIELD, None, True),
+            ('label', self._LABEL_FIELD, None, True),
+            ('position', self._SCENE_FIELD, None, True),
+            ('start', self._START_DATE_TIME_FIELD, None, True),
+            ('end', self._END_DATE_TIME_FIELD, None, True),
+            ('sceneTitle', self.sceneTitleField, 'scene_title_label', True),
+            ('sceneDesc', self.sceneDescField, 'scene_desc_label', False),
+            ('partDesc', self.partDescField, 'part_desc_label', False),
+            ('chapterDesc', self.chapterDescField, 'chapter_desc_label', False),
+            ('notes', self.notesField, 'notes_label', False),
+            ('tags', self.tagField, 'tag_label', False),
+            ('item', self.itemField, 'item_label', False),
+            ('character', self.characterField, 'character_label', False),
+            ('viewpoint', self.viewpointField, 'viewpoint_label', False),
+            ('location', self.locationField, 'location_label', False),
+            ('characterDesc1', self.characterDescField1, 'character_desc_label1', False),
+            ('characterDesc2', self.characterDescField2, 'character_desc_label2', False),
+            ('characterDesc3', self.characterDescField3, 'character_desc_label3', False),
+            ('characterBio', self.characterBioField, 'character_bio_label', False),
+            ('characterAka', self.characterAkaField, 'character_aka_label', False),
+            ('locationDesc', self.locationDescField, 'location_desc_label', False),
+        )
 
     def read(self):
         """Parse the file and get the instance variables.
@@ -116,105 +188,50 @@ class CsvTimeline3(Novel):
         Return a message beginning with the ERROR constant in case of error.
         Overrides the superclass method.
         """
+        if self.processes is not None and self.processes > 1 and self.csvFiles is None and not self.deduplicate:
+            message = self._read_chunks(self.processes)
+        else:
+            message = self._read_rows()
+        if message.startswith(ERROR):
+            return message
 
-        def get_lcIds(lcTitles):
-            """Return a list of location IDs; Add new location to the project."""
-            lcIds = []
-            for lcTitle in lcTitles:
-                if lcTitle in self.locIdsByTitle:
-                    lcIds.append(self.locIdsByTitle[lcTitle])
-                else:
-                    return None
-            return lcIds
-
-        def get_itIds(itTitles):
-            """Return a list of item IDs; Add new item to the project."""
-            itIds = []
-            for itTitle in itTitles:
-                if itTitle in self.itmIdsByTitle:
-                    itIds.append(self.itmIdsByTitle[itTitle])
-                else:
-                    return None
-            return itIds
-
-        def get_crIds(crTitles):
-            """Return a list of character IDs; Add new characters to the project."""
-            crIds = []
-            for crTitle in crTitles:
-                if crTitle in self.chrIdsByTitle:
-                    crIds.append(self.chrIdsByTitle[crTitle])
-                else:
-                    return None
-            return crIds
-        #--- Read the csv file.
-        internalDelimiter = ','
+        self._build_structure()
+        message = 'Timeline data converted to novel structure.'
+        if self._plan.absent:
+            message = f'{message} {self._plan.report_absent()}'
+        return message
+
+    def _read_rows(self):
+        """Read the csv file in this process and create the novel elements.
+
+        Return a message beginning with the ERROR constant in case of error.
+        """
+        streaming = self.streaming
+        if streaming is None:
+            try:
+                streaming = sum(map(os.path.getsize, self.csvFiles or [self.filePath])) > self.STREAMING_THRESHOLD
+            except(OSError):
+                streaming = False
         try:
-            with open(self.filePath, newline='', encoding='utf-8') as f:
-                reader = csv.DictReader(f, delimiter=self._SEPARATOR)
-                for label in reader.fieldnames:
-                    self.labels.append(label)
-                eventsAndFolders = []
-                characterCount = 0
-                self.chrIdsByTitle = {}
-                # key = character title
-                # value = character ID
-                locationCount = 0
-                self.locIdsByTitle = {}
-                # key = location title
-                # value = location ID
-                itemCount = 0
-                self.itmIdsByTitle = {}
-                # key = item title
-                # value = item ID
-                for row in reader:
-                    aeonEntity = {}
-                    for label in row:
-                        aeonEntity[label] = row[label]
-                    if self._TYPE_EVENT == aeonEntity[self._TYPE_FIELD]:
-                        eventsAndFolders.append(aeonEntity)
-                    elif self._TYPE_NARRATIVE == aeonEntity[self._TYPE_FIELD]:
-                        eventsAndFolders.append(aeonEntity)
-                    elif self.typeCharacter == aeonEntity[self._TYPE_FIELD]:
-                        characterCount += 1
-                        crId = str(characterCount)
-                        self.chrIdsByTitle[aeonEntity[self._LABEL_FIELD]] = crId
-                        self.characters[crId] = Character()
-                        self.characters[crId].title = aeonEntity[self._LABEL_FIELD]
-                        charDesc = []
-                        if self.characterDescField1 in aeonEntity:
-                            charDesc.append(aeonEntity[self.characterDescField1])
-                        if self.characterDescField2 and self.characterDescField2 in aeonEntity:
-                            charDesc.append(aeonEntity[self.characterDescField2])
-                        if self.characterDescField3 and self.characterDescField3 in aeonEntity:
-                            charDesc.append(aeonEntity[self.characterDescField3])
-                        self.characters[crId].desc = ('\n').join(charDesc)
-                        if self.characterBioField in aeonEntity:
-                            self.characters[crId].bio = aeonEntity[self.characterBioField]
-                        if self.characterAkaField in aeonEntity:
-                            self.characters[crId].aka = aeonEntity[self.characterAkaField]
-                        if self.tagField in aeonEntity and aeonEntity[self.tagField]:
-                            self.characters[crId].tags = aeonEntity[self.tagField].split(internalDelimiter)
-                        if self.notesField in aeonEntity:
-                            self.characters[crId].notes = aeonEntity[self.notesField]
-                        self.srtCharacters.append(crId)
-                    elif self.typeLocation == aeonEntity[self._TYPE_FIELD]:
-                        locationCount += 1
-                        lcId = str(locationCount)
-                        self.locIdsByTitle[aeonEntity[self._LABEL_FIELD]] = lcId
-                        self.locations[lcId] = WorldElement()
-                        self.locations[lcId].title = aeonEntity[self._LABEL_FIELD]
-                        self.srtLocations.append(lcId)
-                        if self.locationDescField in aeonEntity:
-                            self.locations[lcId].desc = aeonEntity[self.locationDescField]
-                        if self.tagField in aeonEntity:
-                            self.locations[lcId].tags = aeonEntity[self.tagField].split(internalDelimiter)
-                    elif self.typeItem == aeonEntity[self._TYPE_FIELD]:
-                        itemCount += 1
-                        itId = str(itemCount)
-                        self.itmIdsByTitle[aeonEntity[self._LABEL_FIELD]] = itId
-                        self.items[itId] = WorldElement()
-                        self.items[itId].title = aeonEntity[self._LABEL_FIELD]
-                        self.srtItems.append(itId)
+            rows = self._iter_rows()
+            message = self._read_header(next(rows, []))
+            if message.startswith(ERROR):
+                return message
+
+            # Characters, locations, and items are built at once;
+            # events and narrative folders are built when all of them are known.
+            eventsAndFolders = []
+            builders = self._get_builders()
+            typeColumn = self._plan.type
+            for row in self._complete_rows(rows):
+                entityType = row[typeColumn]
+                if entityType == self._TYPE_EVENT or entityType == self._TYPE_NARRATIVE:
+                    if not streaming:
+                        eventsAndFolders.append(row)
+                else:
+                    builder = builders.get(entityType, None)
+                    if builder is not None:
+                        builder(row)
         except(FileNotFoundError):
             return f'{ERROR}"{os.path.normpath(self.filePath)}" not found.'
 
@@ -222,108 +239,14 @@ class CsvTimeline3(Novel):
             return f'{ERROR}Can not parse csv file "{os.path.normpath(self.filePath)}".'
 
         try:
-            for label in [self._SCENE_FIELD, self.sceneTitleField, self._START_DATE_TIME_FIELD, self._END_DATE_TIME_FIELD]:
-                if not label in self.labels:
-                    return f'{ERROR}Label "{label}" is missing.'
-
-            scIdsByStruc = {}
-            chIdsByStruc = {}
-            otherEvents = []
-            eventCount = 0
-            chapterCount = 0
-            for aeonEntity in eventsAndFolders:
-                if aeonEntity[self._SCENE_FIELD]:
-                    narrativeType, narrativePosition = aeonEntity[self._SCENE_FIELD].split(' ')
-
-                    # Make the narrative position a sortable string.
-                    numbers = narrativePosition.split('.')
-                    for i in range(len(numbers)):
-                        numbers[i] = numbers[i].zfill(4)
-                        narrativePosition = ('.').join(numbers)
-                else:
-                    narrativeType = ''
-                    narrativePosition = ''
-                if aeonEntity[self._TYPE_FIELD] == self._TYPE_NARRATIVE:
-                    if narrativeType == self._CHAPTER_MARKER:
-                        chapterCount += 1
-                        chId = str(chapterCount)
-                        chIdsByStruc[narrativePosition] = chId
-                        self.chapters[chId] = Chapter()
-                        self.chapters[chId].chLevel = 0
-                        if self.chapterDescField:
-                            self.chapters[chId].desc = aeonEntity[self.chapterDescField]
-                    elif narrativeType == self._PART_MARKER:
-                        chapterCount += 1
-                        chId = str(chapterCount)
-                        chIdsByStruc[narrativePosition] = chId
-                        self.chapters[chId] = Chapter()
-                        self.chapters[chId].chLevel = 1
-                        narrativePosition += '.0000'
-                        if self.partDescField:
-                            self.chapters[chId].desc = aeonEntity[self.partDescField]
-                    continue
-
-                elif aeonEntity[self._TYPE_FIELD] != self._TYPE_EVENT:
-                    continue
-
-                eventCount += 1
-                scId = str(eventCount)
-                self.scenes[scId] = Scene()
-                if narrativeType == self._SCENE_MARKER:
-                    self.scenes[scId].isNotesScene = False
-                    scIdsByStruc[narrativePosition] = scId
-                else:
-                    self.scenes[scId].isNotesScene = True
-                    otherEvents.append(scId)
-                self.scenes[scId].title = aeonEntity[self.sceneTitleField]
-                startDateTimeStr = fix_iso_dt(aeonEntity[self._START_DATE_TIME_FIELD])
-                if startDateTimeStr is not None:
-                    startDateTime = startDateTimeStr.split(' ')
-                    self.scenes[scId].date = startDateTime[0]
-                    self.scenes[scId].time = startDateTime[1]
-                    endDateTimeStr = fix_iso_dt(aeonEntity[self._END_DATE_TIME_FIELD])
-                    if endDateTimeStr is not None:
-                        # Calculate duration of scenes that begin after 99-12-31.
-                        sceneStart = datetime.fromisoformat(startDateTimeStr)
-                        sceneEnd = datetime.fromisoformat(endDateTimeStr)
-                        sceneDuration = sceneEnd - sceneStart
-                        lastsHours = sceneDuration.seconds // 3600
-                        lastsMinutes = (sceneDuration.seconds % 3600) // 60
-                        self.scenes[scId].lastsDays = str(sceneDuration.days)
-                        self.scenes[scId].lastsHours = str(lastsHours)
-                        self.scenes[scId].lastsMinutes = str(lastsMinutes)
-                else:
-                    self.scenes[scId].date = Scene.NULL_DATE
-                    self.scenes[scId].time = Scene.NULL_TIME
-                if self.sceneDescField in aeonEntity:
-                    self.scenes[scId].desc = aeonEntity[self.sceneDescField]
-                if self.notesField in aeonEntity:
-                    self.scenes[scId].sceneNotes = aeonEntity[self.notesField]
-                if self.tagField in aeonEntity and aeonEntity[self.tagField]:
-                    self.scenes[scId].tags = aeonEntity[self.tagField].split(internalDelimiter)
-                if self.locationField in aeonEntity:
-                    self.scenes[scId].locations = get_lcIds(aeonEntity[self.locationField].split(internalDelimiter))
-                if self.characterField in aeonEntity:
-                    self.scenes[scId].characters = get_crIds(aeonEntity[self.characterField].split(internalDelimiter))
-                if self.viewpointField in aeonEntity:
-                    vpIds = get_crIds([aeonEntity[self.viewpointField]])
-                    if vpIds is not None:
-                        vpId = vpIds[0]
-                        if self.scenes[scId].characters is None:
-                            self.scenes[scId].characters = []
-                        elif vpId in self.scenes[scId].characters:
-                            self.scenes[scId].characters.remove[vpId]
-                        self.scenes[scId].characters.insert(0, vpId)
-                if self.itemField in aeonEntity:
-                    self.scenes[scId].items = get_itIds(aeonEntity[self.itemField].split(internalDelimiter))
-
-                self.scenes[scId].status = 1
-                # Set scene status = "Outline".
-        except(FileNotFoundError):
-            return f'{ERROR}"{os.path.normpath(self.filePath)}" not found.'
-
-        except(KeyError):
-            return f'{ERROR}Wrong csv structure.'
+            if streaming:
+                # Read the file again, instead of holding the rows.
+                rows = self._iter_rows()
+                next(rows, None)
+                eventsAndFolders = self._complete_rows(rows)
+            message = self._build_events_and_folders(eventsAndFolders)
+            if message is not None:
+                return message
 
         except(ValueError):
             return f'{ERROR}Wrong date/time format.'
@@ -331,29 +254,312 @@ class CsvTimeline3(Novel):
         except:
             return f'{ERROR}Can not parse "{os.path.normpath(self.filePath)}".'
 
-        # Build the chapter structure as defined with Aeon v3.
-        srtChpDict = sorted(chIdsByStruc.items())
-        srtScnDict = sorted(scIdsByStruc.items())
+        return 'Csv rows read.'
+
+    def _read_chunks(self, processes):
+        """Read the csv file in chunks parsed by worker processes, and create the novel elements.
+
+        Positional arguments:
+            processes -- int: maximum number of worker processes.
+
+        The workers parse each chunk twice: first for the characters, locations, and items,
+        then for the events, which they decode with the element IDs.
+        The novel elements are created in file order, while the workers parse the next chunks.
+        Return a message beginning with the ERROR constant in case of error.
+        """
+        try:
+            rows = self._iter_rows()
+            message = self._read_header(next(rows, []))
+            rows.close()
+            if message.startswith(ERROR):
+                return message
+
+            chunks = min(processes * self.CHUNKS_PER_PROCESS, os.path.getsize(self.filePath) // self.CHUNK_SIZE + 1)
+            offsets = find_record_offsets(self.filePath, chunks)
+        except(FileNotFoundError):
+            return f'{ERROR}"{os.path.normpath(self.filePath)}" not found.'
+
+        except:
+            return f'{ERROR}Can not parse csv file "{os.path.normpath(self.filePath)}".'
+
+        count = len(offsets) - 1
+        chunkArgs = ([self.filePath] * count, offsets[:-1], offsets[1:], [self._plan] * count)
+        builders = self._get_builders()
+        try:
+            with ProcessPoolExecutor(min(processes, count)) as executor:
+                typeColumn = self._plan.type
+                for row in chain.from_iterable(executor.map(
+                        read_element_rows, *chunkArgs, [set(builders)] * count, [self._SEPARATOR] * count)):
+                    builders[row[typeColumn]](row)
+                idTables = (self._chrIdsByTitle, self._locIdsByTitle, self._itmIdsByTitle)
+                for chunkRows, events in executor.map(
+                        read_chunk, *chunkArgs, [self._TYPE_EVENT] * count, [self._TYPE_NARRATIVE] * count,
+                        [idTables] * count, [self._SEPARATOR] * count, [self._INTERNAL_DELIMITER] * count):
+                    if events is None:
+                        return f'{ERROR}Wrong date/time format.'
+
+                    message = self._build_batch(chunkRows, iter(events))
+                    if message is not None:
+                        return message
+
+        except:
+            return f'{ERROR}Can not parse csv file "{os.path.normpath(self.filePath)}".'
+
+        return 'Csv chunks read.'
+
+    def _iter_rows(self):
+        """Iterate over the rows of the csv file as lists, beginning with the header; skip blank lines.
+
+        If several csv files are read, or rows are to be de-duplicated, iterate over their combined rows.
+        """
+        if self.csvFiles is not None or self.deduplicate:
+            csvFiles = self.csvFiles
+            if csvFiles is None:
+                csvFiles = [self.filePath]
+            keyLabels = None
+            if self.deduplicate:
+                keyLabels = (self._LABEL_FIELD, self._TYPE_FIELD)
+            yield from CsvCombiner(csvFiles, keyLabels, self._SEPARATOR).iter_rows()
+            return
+
+        with open(self.filePath, newline='', encoding='utf-8') as f:
+            for row in csv.reader(f, delimiter=self._SEPARATOR):
+                if row:
+                    yield row
+
+    def _complete_rows(self, rows):
+        """Iterate over the rows, padding short rows to the header's width."""
+        width = self._plan.width
+        for row in rows:
+            if len(row) < width:
+                row.extend([''] * (width - len(row)))
+            yield row
+
+    def _read_header(self, header):
+        """Compile the column plan from the csv header.
+
+        Positional arguments:
+            header -- list of the column labels.
+
+        Return a message beginning with the ERROR constant if required columns are missing.
+        """
+        self.labels = header
+        self._plan = plan = ColumnPlan(header, self._fields)
+        if plan.missing:
+            return f'{ERROR}{plan.report()}'
+
+        self._characterColumns = plan.get_assignments((('bio', 'characterBio'), ('aka', 'characterAka'),
+                                                       ('notes', 'notes')))
+        self._characterDescColumns = [column for __, column in plan.get_assignments(
+            (('', 'characterDesc1'), ('', 'characterDesc2'), ('', 'characterDesc3')))]
+        self._locationColumns = plan.get_assignments((('desc', 'locationDesc'),))
+        self._chrIdsByTitle = {}
+        self._locIdsByTitle = {}
+        self._itmIdsByTitle = {}
+        self._chIdsByStruc = {}
+        self._scIdsByStruc = {}
+        self._otherEvents = []
+        return 'Column plan compiled.'
+
+    def _get_builders(self):
+        """Return the builders of characters, locations, and items by type label."""
+        builders = {}
+        for entityType, builder in (
+                (self.typeItem, self._build_item),
+                (self.typeLocation, self._build_location),
+                (self.typeCharacter, self._build_character),
+                ):
+            builders[entityType] = builder
+        return builders
+
+    def _build_character(self, row):
+        """Create a character from a csv row."""
+        crId = str(len(self.characters) + 1)
+        character = Character()
+        self.characters[crId] = character
+        title = row[self._plan.label]
+        self._chrIdsByTitle[title] = crId
+        character.title = title
+        character.desc = ('\n').join([row[column] for column in self._characterDescColumns])
+        for attr, column in self._characterColumns:
+            setattr(character, attr, row[column])
+        tagColumn = self._plan.tags
+        if tagColumn is not None and row[tagColumn]:
+            character.tags = row[tagColumn].split(self._INTERNAL_DELIMITER)
+        self.srtCharacters.append(crId)
+
+    def _build_location(self, row):
+        """Create a location from a csv row."""
+        lcId = str(len(self.locations) + 1)
+        location = WorldElement()
+        self.locations[lcId] = location
+        title = row[self._plan.label]
+        self._locIdsByTitle[title] = lcId
+        location.title = title
+        self.srtLocations.append(lcId)
+        for attr, column in self._locationColumns:
+            setattr(location, attr, row[column])
+        tagColumn = self._plan.tags
+        if tagColumn is not None:
+            location.tags = row[tagColumn].split(self._INTERNAL_DELIMITER)
+
+    def _build_item(self, row):
+        """Create an item from a csv row."""
+        itId = str(len(self.items) + 1)
+        item = WorldElement()
+        self.items[itId] = item
+        title = row[self._plan.label]
+        self._itmIdsByTitle[title] = itId
+        item.title = title
+        self.srtItems.append(itId)
+
+    def _build_events_and_folders(self, rows):
+        """Create scenes, parts, and chapters from csv rows.
+
+        Positional arguments:
+            rows -- iterable of csv rows; rows of other types are skipped.
+
+        The event dates are converted per batch of rows.
+        Return a message beginning with the ERROR constant in case of error, otherwise None.
+        """
+        typeColumn = self._plan.type
+        idTables = (self._chrIdsByTitle, self._locIdsByTitle, self._itmIdsByTitle)
+        dateMemo = {}
+        rows = iter(rows)
+        while True:
+            batch = list(islice(rows, self._BATCH_SIZE))
+            if not batch:
+                return None
+
+            events = decode_events([row for row in batch if row[typeColumn] == self._TYPE_EVENT],
+                                   self._plan, dateMemo, idTables, self._INTERNAL_DELIMITER)
+            message = self._build_batch(batch, iter(events))
+            if message is not None:
+                return message
+
+    def _build_batch(self, rows, events):
+        """Create scenes, parts, and chapters from a batch of csv rows.
+
+        Positional arguments:
+            rows -- list of csv rows; rows of other types are skipped. 
+                    Event rows may be replaced by None.
+            events -- iterator over the records of the event rows, as returned by decode_events().
+
+        Return a message beginning with the ERROR constant in case of error, otherwise None.
+        """
+        typeColumn = self._plan.type
+        for row in rows:
+            if row is None or row[typeColumn] == self._TYPE_EVENT:
+                message = self._build_event(next(events))
+            elif row[typeColumn] == self._TYPE_NARRATIVE:
+                message = self._build_folder(row)
+            else:
+                continue
+
+            if message is not None:
+                return message
+
+        return None
+
+    def _build_folder(self, row):
+        """Create a part or a chapter from a narrative folder's csv row.
+
+        Return a message beginning with the ERROR constant in case of error, otherwise None.
+        """
+        narrativeType, narrativePosition = get_narrative_position(row[self._plan.position])
+        if narrativePosition is None:
+            return f'{ERROR}Wrong narrative position: "{row[self._plan.position]}".'
+
+        if narrativeType == self._CHAPTER_MARKER:
+            chLevel = 0
+            descColumn = self._plan.chapterDesc
+        elif narrativeType == self._PART_MARKER:
+            chLevel = 1
+            descColumn = self._plan.partDesc
+        else:
+            return None
+
+        chId = str(len(self.chapters) + 1)
+        self._chIdsByStruc[narrativePosition] = chId
+        chapter = Chapter()
+        self.chapters[chId] = chapter
+        chapter.chLevel = chLevel
+        if descColumn is not None:
+            chapter.desc = row[descColumn]
+        return None
+
+    def _build_event(self, record):
+        """Create a scene from an event's record.
+
+        Positional arguments:
+            record -- tuple: the event's data, as returned by decode_events().
+
+        Return a message beginning with the ERROR constant in case of error, otherwise None.
+        """
+        (narrativeString, narrativeType, narrativePosition, title, date, time, lastsDays, lastsHours, lastsMinutes,
+         desc, notes, tags, locations, characters, items) = record
+        if narrativePosition is None:
+            return f'{ERROR}Wrong narrative position: "{narrativeString}".'
+
+        scId = str(len(self.scenes) + 1)
+        scene = Scene()
+        self.scenes[scId] = scene
+        if narrativeType == self._SCENE_MARKER:
+            scene.isNotesScene = False
+            self._scIdsByStruc[narrativePosition] = scId
+        else:
+            scene.isNotesScene = True
+            self._otherEvents.append(scId)
+        scene.title = title
+        scene.date = date
+        scene.time = time
+        if lastsDays is not None:
+            scene.lastsDays = lastsDays
+            scene.lastsHours = lastsHours
+            scene.lastsMinutes = lastsMinutes
+        if desc is not None:
+            scene.desc = desc
+        if notes is not None:
+            scene.sceneNotes = notes
+        if tags is not None:
+            scene.tags = tags
+        if locations is not None:
+            scene.locations = locations
+        if characters is not None:
+            scene.characters = characters
+        if items is not None:
+            scene.items = items
+        scene.status = 1
+        # Set scene status = "Outline".
+        return None
+
+    def _build_structure(self):
+        """Build the chapter structure as defined with Aeon v3."""
+        srtScenesByStruc = {}
         partNr = 0
         chapterNr = 0
-        for ch in srtChpDict:
-            self.srtChapters.append(ch[1])
-            if self.chapters[ch[1]].chLevel == 0:
+        for narrativePosition, chId in sorted(self._chIdsByStruc.items()):
+            self.srtChapters.append(chId)
+            if self.chapters[chId].chLevel == 0:
                 chapterNr += 1
-                self.chapters[ch[1]].title = self.chapterNrPrefix + str(chapterNr)
-                for sc in srtScnDict:
-                    if sc[0].startswith(ch[0]):
-                        self.chapters[ch[1]].srtScenes.append(sc[1])
+                self.chapters[chId].title = self.chapterNrPrefix + str(chapterNr)
+                srtScenesByStruc[narrativePosition] = self.chapters[chId].srtScenes
             else:
                 partNr += 1
-                self.chapters[ch[1]].title = self.partNrPrefix + str(partNr)
+                self.chapters[chId].title = self.partNrPrefix + str(partNr)
+
+        # Add each scene to the chapters whose narrative position is a prefix of the scene's position.
+        for narrativePosition, scId in sorted(self._scIdsByStruc.items()):
+            for i in range(1, len(narrativePosition) + 1):
+                srtScenes = srtScenesByStruc.get(narrativePosition[:i], None)
+                if srtScenes is not None:
+                    srtScenes.append(scId)
+
         # Create a chapter for the non-narrative events.
-        chapterNr += 1
-        chId = str(chapterCount + 1)
+        chId = str(len(self.chapters) + 1)
         self.chapters[chId] = Chapter()
         self.chapters[chId].title = 'Other events'
         self.chapters[chId].desc = 'Scenes generated from events that ar not assigned to the narrative structure.'
         self.chapters[chId].chType = 1
-        self.chapters[chId].srtScenes = otherEvents
+        self.chapters[chId].srtScenes = self._otherEvents
         self.srtChapters.append(chId)
-        return 'Timeline data converted to novel structure.'
@@ -4,6 +4,29 @@ Copyright (c) 2022 Peter Triesberger
 For further information see https://github.com/peter88213/aeon3yw
 Published under the MIT License (https://opensource.org/licenses/mit-license.php)
 """
+from datetime import date
+from datetime import datetime
+from itertools import islice
+try:
+    import numpy as np
+except(ImportError):
+    np = None
+
+SECONDS_PER_DAY = 86400
+AEON_EPOCH_DAY = 306
+# Day number of 0001-01-01, the origin of Aeon 3 timestamps.
+# Day numbers count from 0000-03-01 of the proleptic Gregorian calendar,
+# with astronomical year numbering (year 0 is 1 BC).
+
+NUMPY_THRESHOLD = 1000
+# Minimum number of events or date/time strings for which NumPy is used, if available.
+
+DATE_MEMO_SIZE = 100000
+# Maximum number of date/time strings memoized by normalize_iso_dates().
+
+_ORDINAL_OFFSET = AEON_EPOCH_DAY - 1
+# Difference between day numbers and the proleptic Gregorian ordinals of the datetime module.
+_DATE_MAX_DAY = date.max.toordinal() + _ORDINAL_OFFSET + 1
 
 
 def fix_iso_dt(dateTimeStr):
@@ -42,3 +65,197 @@ def fix_iso_dt(dateTimeStr):
     dt[0] = ('-').join(date)
     dateTimeStr = (' ').join(dt)
     return dateTimeStr
+
+
+def normalize_iso_dates(dateTimeStrs, memo=None, useNumpy=None):
+    """Return normalized date/time strings and their seconds for a column of an Aeon3 csv export.
+
+    Positional arguments:
+        dateTimeStrs -- list of str: date/time as read in from Aeon3 csv export.
+
+    Optional arguments:
+        memo -- dict: results by date/time string, to be passed to subsequent calls.
+                Its size is limited to DATE_MEMO_SIZE entries.
+        useNumpy -- bool: if True, parse with NumPy; if None, depending on availability
+                    and the number of new values.
+
+    Return a list with a (dateTimeStr, seconds) tuple per date/time string:
+    - dateTimeStr -- str: normalized date/time as returned by fix_iso_dt().
+    - seconds -- int: seconds since 0001-01-01 00:00:00, so durations are differences.
+    The list has None where fix_iso_dt() returns None.
+    Each distinct string is converted once.
+    Raise ValueError if a date/time is invalid.
+    """
+    if memo is None:
+        memo = {}
+    results = {}
+    newStrs = []
+    for dateTimeStr in dict.fromkeys(dateTimeStrs):
+        if dateTimeStr in memo:
+            results[dateTimeStr] = memo[dateTimeStr]
+        else:
+            newStrs.append(dateTimeStr)
+    isoStrs = [fix_iso_dt(dateTimeStr) for dateTimeStr in newStrs]
+    validStrs = [isoStr for isoStr in isoStrs if isoStr is not None]
+    if useNumpy is None:
+        useNumpy = np is not None and len(validStrs) >= NUMPY_THRESHOLD
+    if useNumpy:
+        seconds = (np.array(validStrs, dtype='datetime64[s]') - np.datetime64('0001-01-01T00:00:00', 's'))
+        seconds = seconds.astype(np.int64).tolist()
+    else:
+        seconds = list(map(_get_seconds, validStrs))
+    seconds.reverse()
+    for dateTimeStr, isoStr in zip(newStrs, isoStrs):
+        if isoStr is None:
+            result = None
+        else:
+            result = (isoStr, seconds.pop())
+        results[dateTimeStr] = result
+        memo[dateTimeStr] = result
+
+    # Forget the oldest entries.
+    for dateTimeStr in list(islice(memo, max(len(memo) - DATE_MEMO_SIZE, 0))):
+        del memo[dateTimeStr]
+    return [results[dateTimeStr] for dateTimeStr in dateTimeStrs]
+
+
+def _get_seconds(isoStr):
+    """Return the seconds since 0001-01-01 00:00:00 of a normalized date/time string."""
+    dt = datetime.fromisoformat(isoStr)
+    return (dt.toordinal() - 1) * SECONDS_PER_DAY + dt.hour * 3600 + dt.minute * 60 + dt.second
+
+
+def days_from_civil(year, month, day):
+    """Return the day number of a date.
+
+    Positional arguments:
+        year, month, day -- int, or NumPy integer arrays: proleptic Gregorian date.
+
+    The day number counts from 0000-03-01. Starting the year in March puts the
+    leap day at its end, so the day of the year is a closed-form function of the month.
+    """
+    year = year - (month <= 2)
+    era = year // 400
+    yearOfEra = year - era * 400
+    dayOfYear = (153 * ((month + 9) % 12) + 2) // 5 + day - 1
+    dayOfEra = yearOfEra * 365 + yearOfEra // 4 - yearOfEra // 100 + dayOfYear
+    return era * 146097 + dayOfEra
+
+
+def civil_from_days(dayNumber):
+    """Return a (year, month, day) tuple for a day number, as counted by days_from_civil().
+
+    Positional arguments:
+        dayNumber -- int, or NumPy integer array.
+    """
+    era = dayNumber // 146097
+    dayOfEra = dayNumber - era * 146097
+    yearOfEra = (dayOfEra - dayOfEra // 1460 + dayOfEra // 36524 - dayOfEra // 146096) // 365
+    dayOfYear = dayOfEra - (365 * yearOfEra + yearOfEra // 4 - yearOfEra // 100)
+    marchMonth = (5 * dayOfYear + 2) // 153
+    day = dayOfYear - (153 * marchMonth + 2) // 5 + 1
+    month = (marchMonth + 2) % 12 + 1
+    year = yearOfEra + era * 400 + (month <= 2)
+    return year, month, day
+
+
+def convert_aeon_dates(timestamps, durations, useNumpy=None):
+    """Return date, time, and duration strings for a batch of Aeon 3 events.
+
+    Positional arguments:
+        timestamps -- list of int: start times in seconds since 0001-01-01 00:00:00; may be negative.
+        durations -- list of dict: Aeon 3 duration records with years, months, weeks, days, hours,
+                     minutes, and seconds.
+
+    Optional arguments:
+        useNumpy -- bool: if True, compute with NumPy arrays; if None, depending on availability
+                    and batch size.
+
+    Return a list of (date, time, lastsDays, lastsHours, lastsMinutes) string tuples.
+    Dates are ISO formatted, with negative years for BC dates (year 0 is 1 BC).
+    A duration in years and months ends on the same day of the month, or on the last day
+    of a shorter month. Negative years and months are ignored, unless the other one is positive.
+    """
+    if useNumpy is None:
+        useNumpy = np is not None and len(timestamps) >= NUMPY_THRESHOLD
+    years = []
+    months = []
+    extraMinutes = []
+    for duration in durations:
+        durYears = duration['years']
+        durMonths = duration['months']
+        if durYears > 0 or durMonths > 0:
+            years.append(durYears)
+            months.append(max(durMonths, 0))
+        else:
+            years.append(0)
+            months.append(0)
+        extraMinutes.append(
+            ((duration['weeks'] * 7 + duration['days']) * 24 + duration['hours']) * 60
+            +duration['minutes'] + duration['seconds'] // 60
+            )
+    if not useNumpy:
+        return list(map(_convert_event, timestamps, years, months, extraMinutes))
+
+    #--- Compute all events at once; only the string formatting is done per event.
+    timestamps = np.array(timestamps, dtype=np.int64)
+    years = np.array(years, dtype=np.int64)
+    months = np.array(months, dtype=np.int64)
+    dayNumbers, seconds = np.divmod(timestamps, SECONDS_PER_DAY)
+    dayNumbers += AEON_EPOCH_DAY
+    startYears, startMonths, startDays = civil_from_days(dayNumbers)
+    endYears, endMonths = np.divmod(startYears * 12 + startMonths - 1 + years * 12 + months, 12)
+    endMonths += 1
+    endMonthStarts = days_from_civil(endYears, endMonths, 1)
+    endMonthLengths = days_from_civil(endYears + endMonths // 12, endMonths % 12 + 1, 1) - endMonthStarts
+    endDays = endMonthStarts + np.minimum(startDays, endMonthLengths) - 1
+    lastsDays, minutes = np.divmod((endDays - dayNumbers) * 1440 + np.array(extraMinutes, dtype=np.int64), 1440)
+    hours, seconds = np.divmod(seconds, 3600)
+    columns = (startYears, startMonths, startDays, hours, seconds // 60, seconds % 60,
+               lastsDays, minutes // 60, minutes % 60)
+    return list(map(_format_event, *(column.tolist() for column in columns)))
+
+
+def _convert_event(timestamp, years, months, extraMinutes):
+    """Return the date, time, and duration strings of an event.
+
+    Positional arguments:
+        timestamp -- int: start time in seconds since 0001-01-01 00:00:00.
+        years, months -- int: duration in years and months, to be added calendar-wise.
+        extraMinutes -- int: remaining duration in minutes.
+    """
+    dayNumber, seconds = divmod(timestamp, SECONDS_PER_DAY)
+    dayNumber += AEON_EPOCH_DAY
+    if AEON_EPOCH_DAY <= dayNumber < _DATE_MAX_DAY:
+        # Within the range of the datetime module, its C implementation is faster.
+        start = date.fromordinal(dayNumber - _ORDINAL_OFFSET)
+        year = start.year
+        month = start.month
+        day = start.day
+        startDate = start.isoformat()
+    else:
+        year, month, day = civil_from_days(dayNumber)
+        startDate = _format_date(year, month, day)
+    if years or months:
+        # Add years and months, and clip the day to the length of the target month.
+        endYear, endMonth = divmod(year * 12 + month - 1 + years * 12 + months, 12)
+        endMonth += 1
+        endMonthStart = days_from_civil(endYear, endMonth, 1)
+        endMonthLength = days_from_civil(endYear + endMonth // 12, endMonth % 12 + 1, 1) - endMonthStart
+        extraMinutes += (endMonthStart + min(day, endMonthLength) - 1 - dayNumber) * 1440
+    lastsDays, minutes = divmod(extraMinutes, 1440)
+    hours, seconds = divmod(seconds, 3600)
+    return (startDate, '%02d:%02d:%02d' % (hours, seconds // 60, seconds % 60),
+            str(lastsDays), str(minutes // 60), str(minutes % 60))
+
+
+def _format_event(year, month, day, hour, minute, second, lastsDays, lastsHours, lastsMinutes):
+    return (_format_date(year, month, day), '%02d:%02d:%02d' % (hour, minute, second),
+            str(lastsDays), str(lastsHours), str(lastsMinutes))
+
+
+def _format_date(year, month, day):
+    if year < 0:
+        return '-%04d-%02d-%02d' % (-year, month, day)
+
+    return '%04d-%02d-%02d' % (year, month, day)
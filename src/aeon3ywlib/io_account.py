@@ -0,0 +1,47 @@
+"""Provide a class for accounting the file I/O of a conversion.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/aeon3yw
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+
+
+class IoAccount:
+    """Files accessed, bytes read, and bytes written, by phase.
+
+    Public methods:
+        add(phase, files, bytesRead, bytesWritten) -- add to the counters of a phase.
+        report() -- return a message listing the counters by phase.
+
+    Public instance variables:
+        phases -- dict: [files, bytesRead, bytesWritten] list by phase name, in order of first use.
+    """
+
+    def __init__(self):
+        self.phases = {}
+
+    def add(self, phase, files=0, bytesRead=0, bytesWritten=0):
+        """Add to the counters of a phase.
+
+        Positional arguments:
+            phase -- str: name of the phase, e.g. "read".
+
+        Optional arguments:
+            files -- int: number of files opened or renamed.
+            bytesRead -- int: number of bytes read.
+            bytesWritten -- int: number of bytes written.
+        """
+        counters = self.phases.setdefault(phase, [0, 0, 0])
+        counters[0] += files
+        counters[1] += bytesRead
+        counters[2] += bytesWritten
+
+    def report(self):
+        """Return a message listing the counters by phase, or an empty string."""
+        if not self.phases:
+            return ''
+
+        entries = []
+        for phase, (files, bytesRead, bytesWritten) in self.phases.items():
+            entries.append(f'{phase}: {files} file(s), {bytesRead} bytes read, {bytesWritten} bytes written')
+        return f'File I/O -- {"; ".join(entries)}.'
@@ -0,0 +1,166 @@
+"""Provide a class for incremental reading of the JSON part of Aeon Timeline 3 files.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/aeon3yw
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+import codecs
+import json
+
+_DECODER = json.JSONDecoder()
+_WHITESPACE = ' \t\n\r'
+
+
+class JsonStream:
+    """Incremental JSON reader working on a binary stream.
+
+    Public methods:
+        iter_object() -- iterate over the keys of a JSON object.
+        iter_array() -- iterate over the elements of a JSON array.
+        value() -- decode the next value.
+        skip() -- skip the next value.
+
+    Containers are walked token by token, so only the current value is
+    held in memory. Values are decoded by the C-accelerated JSON decoder.
+    The caller must consume the value belonging to each key or array element
+    yielded by the iterators, either by calling value() or skip(), or by
+    walking it with a nested iterator.
+
+    All methods raise json.JSONDecodeError in case of corrupted data.
+    """
+    CHUNK_SIZE = 1 << 20
+    # Number of bytes read from the stream at a time.
+
+    def __init__(self, stream, chunkSize=None):
+        """Skip the binary data preceding the JSON part.
+
+        Positional arguments:
+            stream -- binary file object, positioned at the start of the Aeon 3 project.
+
+        Optional arguments:
+            chunkSize -- int: number of bytes read from the stream at a time.
+
+        The JSON part starts with the first opening curly bracket.
+        Raise json.JSONDecodeError, if there is none.
+        """
+        self._stream = stream
+        if chunkSize is not None:
+            self._chunkSize = chunkSize
+        else:
+            self._chunkSize = self.CHUNK_SIZE
+        self._decoder = codecs.getincrementaldecoder('utf-8')(errors='surrogateescape')
+        self._text = ''
+        self._pos = 0
+        self._eof = False
+        while True:
+            data = stream.read(self._chunkSize)
+            if not data:
+                raise json.JSONDecodeError('No JSON part found', '', 0)
+
+            start = data.find(b'{')
+            if start >= 0:
+                self._text = self._decoder.decode(data[start:])
+                break
+
+    def iter_object(self):
+        """Iterate over the keys of the next value, which must be an object."""
+        self._expect('{')
+        char = self._peek()
+        if char == '}':
+            self._pos += 1
+            return
+
+        while True:
+            key = self.value()
+            if not isinstance(key, str):
+                raise json.JSONDecodeError('Object key expected', self._text, self._pos)
+
+            self._expect(':')
+            yield key
+
+            char = self._peek()
+            self._pos += 1
+            if char == '}':
+                return
+
+            if char != ',':
+                raise json.JSONDecodeError('"," or "}" expected', self._text, self._pos - 1)
+
+    def iter_array(self):
+        """Iterate over the element indices of the next value, which must be an array."""
+        self._expect('[')
+        char = self._peek()
+        if char == ']':
+            self._pos += 1
+            return
+
+        i = 0
+        while True:
+            yield i
+
+            i += 1
+            char = self._peek()
+            self._pos += 1
+            if char == ']':
+                return
+
+            if char != ',':
+                raise json.JSONDecodeError('"," or "]" expected', self._text, self._pos - 1)
+
+    def value(self):
+        """Decode and return the next value."""
+        self._peek()
+        size = self._chunkSize
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self._text, self._pos)
+                if end < len(self._text) or self._eof:
+                    # A number at the end of the buffer might be continued in the stream.
+                    self._pos = end
+                    return value
+
+            except(json.JSONDecodeError):
+                if self._eof:
+                    raise
+
+            # The value is incomplete. Read more, doubling the amount each time,
+            # so that decoding large values does not take quadratic time.
+            self._fill(size)
+            size *= 2
+
+    def skip(self):
+        """Skip the next value."""
+        self.value()
+
+    def _expect(self, char):
+        """Consume the next non-whitespace character, which must be char."""
+        found = self._peek()
+        if found != char:
+            raise json.JSONDecodeError(f'"{char}" expected', self._text, self._pos)
+
+        self._pos += 1
+
+    def _peek(self):
+        """Skip whitespace and return the next character without consuming it."""
+        while True:
+            text = self._text
+            pos = self._pos
+            length = len(text)
+            while pos < length and text[pos] in _WHITESPACE:
+                pos += 1
+            self._pos = pos
+            if pos < length:
+                return text[pos]
+
+            if self._eof:
+                raise json.JSONDecodeError('Unexpected end of data', self._text, self._pos)
+
+            self._fill(self._chunkSize)
+
+    def _fill(self, size):
+        """Discard the consumed text and append the decoded next size bytes of the stream."""
+        data = self._stream.read(size)
+        if not data:
+            self._eof = True
+        self._text = self._text[self._pos:] + self._decoder.decode(data, final=self._eof)
+        self._pos = 0
@@ -4,16 +4,22 @@ Copyright (c) 2022 Peter Triesberger
 For further information see https://github.com/peter88213/aeon3yw
 Published under the MIT License (https://opensource.org/licenses/mit-license.php)
 """
+import os
 import json
 from datetime import datetime
-from datetime import timedelta
 from pywriter.pywriter_globals import ERROR
 from pywriter.model.novel import Novel
 from pywriter.model.scene import Scene
 from pywriter.model.chapter import Chapter
 from pywriter.model.world_element import WorldElement
 from pywriter.model.character import Character
-from aeon3ywlib.aeon3_fop import scan_file
+from aeon3ywlib.aeon3_fop import read_json
+from aeon3ywlib.json_stream import JsonStream
+from aeon3ywlib.parse_cache import ParseCache
+from aeon3ywlib.label_schema import LabelSchema
+from aeon3ywlib.label_schema import get_schema
+from aeon3ywlib.dt_helper import convert_aeon_dates
+from aeon3ywlib.lazy_elements import LazyElements
 
 
 class JsonTimeline3(Novel):
@@ -21,14 +27,54 @@ class JsonTimeline3(Novel):
 
     Public methods:
         read() -- parse the file and get the instance variables.
+        register_builder(typeLabel, builder) -- register a builder for the items of a custom Aeon type.
+        build_scene(uid, dataItem) -- create a scene from an item of the "Event" type.
+        build_chapter(uid, dataItem) -- create a chapter from an item of a narrative folder type.
+        build_character(uid, dataItem) -- create a character from an item of the "Character" type.
+        build_location(uid, dataItem) -- create a location from an item of the "Location" type.
+        build_item(uid, dataItem) -- create an item from an item of the "Item" type.
+
+    Public instance variables:
+        streaming -- bool: if True, read the project in streaming mode; if False, decode it at once;
+                           if None, depending on the file size.
+        cacheDir -- str: path to the parse cache directory; if None, the cache is not used.
+        lazy -- bool: if True, build scenes, characters, locations, and items on first access.
 
     Represents the JSON part of the project file.
+    In streaming mode, the items and relationships are decoded one at a time,
+    so the memory needed does not depend on the size of the JSON object graph.
+    Each item is passed to the builder registered for its type;
+    each builder walks the item's property values once, using a dispatch table,
+    and keeps a compact record of the item.
+    The novel elements are built from these records when all sections are read;
+    in lazy mode, scenes, characters, locations, and items are mapping views
+    building each element with its dates, tags, and relationships on first access.
     """
     EXTENSION = '.aeon'
     DESCRIPTION = 'Aeon Timeline 3 project'
     SUFFIX = ''
     DATE_LIMIT = (datetime(100, 1, 1) - datetime.min).total_seconds()
     # Dates before 100-01-01 can not be displayed properly in yWriter
+    DATE_MAX = (datetime.max - datetime.min).total_seconds()
+    # Dates after 9999-12-31 can not be displayed in yWriter either
+    NARRATIVE_POLICIES = {
+        'outline': 2,
+        'nested': None,
+    }
+    # Depth of the narrative folders converted to parts and chapters, by policy name; None means any depth.
+    # 'outline': Top-level folders holding folders become parts, and the folders below become chapters.
+    #            The scenes of deeper folders are merged into the chapter.
+    # 'nested': Each folder becomes a part if it holds folders, and a chapter otherwise.
+
+    STREAMING_THRESHOLD = 50000000
+    # Project files larger than this number of bytes are read in streaming mode by default.
+
+    _LABEL_SETTINGS = tuple(setting for __, attributes in LabelSchema.SECTIONS for setting, __ in attributes)
+    # Settings holding the labels of the Aeon 3 types, properties, and references.
+
+    _VIEWPOINT = '<viewpoint>'
+    _CHR_DESC = '<description>'
+    # Property dispatch targets that are not element attributes.
 
     def __init__(self, filePath, **kwargs):
         """Initialize instance variables.
@@ -52,317 +98,603 @@ class JsonTimeline3(Novel):
             item_label -- str: label of the "Item" role type.
             part_number_prefix -- str: prefix to the part number in the part's heading.
             chapter_number_prefix -- str: prefix to the chapter number in the chapter's heading.
+            narrative_policy -- str: mapping of the narrative folders to parts and chapters, see NARRATIVE_POLICIES.
+
+        Optional keyword arguments:
+            streaming -- bool: if True, read the project in streaming mode; if False, decode it at once.
+                               Default: depending on the file size.
+            cache_dir -- str: path to the parse cache directory. Default: do not use the cache.
+            lazy -- bool: if True, build scenes, characters, locations, and items on first access.
+                          Default: build them all when reading.
         
         Extends the superclass constructor.
         """
         super().__init__(filePath, **kwargs)
 
-        # JSON[definitions][types][byId]
-        self._labelEventType = kwargs['type_event']
-        self._labelCharacterType = kwargs['type_character']
-        self._labelLocationType = kwargs['type_location']
-        self._labelItemType = kwargs['type_item']
-
-        # JSON[definitions][properties][byId]
-        self._labelNotesProperty = kwargs['notes_label']
-        self._labelChrDesc1Property = kwargs['character_desc_label1']
-        self._labelChrDesc2Property = kwargs['character_desc_label2']
-        self._labelChrDesc3Property = kwargs['character_desc_label3']
-        self._labelAkaProperty = kwargs['character_aka_label']
-        self._labelViewpointProperty = kwargs['viewpoint_label']
-
-        # JSON[definitions][references][byId]
-        self._labelParticipantRef = kwargs['character_label']
-        self._labelLocationRef = kwargs['location_label']
-        self._labelItemRef = kwargs['item_label']
+        # Labels of the JSON[definitions] entries, resolved by a LabelSchema.
+        self._labelSettings = tuple((key, kwargs[key]) for key in self._LABEL_SETTINGS)
 
         # Misc.
         self._partHdPrefix = kwargs['part_number_prefix']
         self._chapterHdPrefix = kwargs['chapter_number_prefix']
+        self.streaming = kwargs.get('streaming', None)
+        self.cacheDir = kwargs.get('cache_dir', None)
+        self.lazy = kwargs.get('lazy', False)
+        self._customBuilders = {}
+        self._labelReport = ''
+        # Message listing the unresolved labels; stored with the cache entry.
+        self._narrativePolicy = kwargs['narrative_policy']
+        self._cacheSettings = self._labelSettings + (
+            ('part_number_prefix', self._partHdPrefix),
+            ('chapter_number_prefix', self._chapterHdPrefix),
+            ('narrative_policy', self._narrativePolicy),
+        )
 
     def read(self):
         """Parse the file and get the instance variables.
         
         Extract the JSON part of the Aeon Timeline 3 file located at filePath
         and build a yWriter novel structure.
+        If a cache directory is set, a novel structure built before from the same
+        file content with the same settings is taken from the cache instead.
         Return a message beginning with the ERROR constant in case of error.
         Overrides the superclass method.
         """
-        jsonPart = scan_file(self.filePath)
-        if not jsonPart:
-            return f'{ERROR}No JSON part found.'
-        elif jsonPart.startswith(ERROR):
-            return jsonPart
+        if self.cacheDir is None or self._customBuilders:
+            return self._read_project()
+
+        cache = ParseCache(self.cacheDir)
         try:
-            jsonData = json.loads(jsonPart)
-        except('JSONDecodeError'):
-            return f'{ERROR}Invalid JSON data.'
-
-        #--- Find types.
-        typeEventUid = None
-        typeCharacterUid = None
-        typeLocationUid = None
-        typeItemUid = None
-        NarrativeFolderTypes = []
-        for uid in jsonData['definitions']['types']['byId']:
-
-            if jsonData['definitions']['types']['byId'][uid]['isNarrativeFolder']:
-                NarrativeFolderTypes.append(uid)
-
-            elif jsonData['definitions']['types']['byId'][uid]['label'] == self._labelEventType:
-                typeEventUid = uid
-
-            elif jsonData['definitions']['types']['byId'][uid]['label'] == self._labelCharacterType:
-                typeCharacterUid = uid
-
-            elif jsonData['definitions']['types']['byId'][uid]['label'] == self._labelLocationType:
-                typeLocationUid = uid
-
-            elif jsonData['definitions']['types']['byId'][uid]['label'] == self._labelItemType:
-                typeItemUid = uid
-
-        #--- Find properties.
-        propNotesUid = None
-        propChrDesc1Uid = None
-        propChrDesc2Uid = None
-        propChrDesc3Uid = None
-        propAkaUid = None
-        propViewpointUid = None
-        for uid in jsonData['definitions']['properties']['byId']:
-
-            if jsonData['definitions']['properties']['byId'][uid]['label'] == self._labelNotesProperty:
-                typeNotesUid = uid
-
-            elif jsonData['definitions']['properties']['byId'][uid]['label'] == self._labelChrDesc1Property:
-                propChrDesc1Uid = uid
-
-            elif jsonData['definitions']['properties']['byId'][uid]['label'] == self._labelChrDesc2Property:
-                propChrDesc2Uid = uid
-
-            elif jsonData['definitions']['properties']['byId'][uid]['label'] == self._labelChrDesc3Property:
-                propChrDesc3Uid = uid
-
-            elif jsonData['definitions']['properties']['byId'][uid]['label'] == self._labelAkaProperty:
-                propAkaUid = uid
-
-            elif jsonData['definitions']['properties']['byId'][uid]['label'] == self._labelViewpointProperty:
-                propViewpointUid = uid
-
-        #--- Find references.
-        refParticipant = None
-        refLocation = None
-        for uid in jsonData['definitions']['references']['byId']:
-
-            if jsonData['definitions']['references']['byId'][uid]['label'] == self._labelParticipantRef:
-                refParticipant = uid
-
-            elif jsonData['definitions']['references']['byId'][uid]['label'] == self._labelLocationRef:
-                refLocation = uid
-
-        #--- Read items.
-        crIdsByGuid = {}
-        lcIdsByGuid = {}
-        itIdsByGuid = {}
-        scIdsByGuid = {}
-        chIdsByGuid = {}
-        characterCount = 0
-        locationCount = 0
-        itemCount = 0
-        eventCount = 0
-        chapterCount = 0
-        vpGuidByScId = {}
-        for uid in jsonData['data']['items']['byId']:
-            dataItem = jsonData['data']['items']['byId'][uid]
-            if dataItem['type'] == typeEventUid:
-
-                #--- Create scenes.
-                eventCount += 1
-                scId = str(eventCount)
-                scIdsByGuid[uid] = scId
-                self.scenes[scId] = Scene()
-                self.scenes[scId].status = 1
-                # Set scene status = "Outline"
-                self.scenes[scId].isNotesScene = True
-                # Will be set to False later if it is part of the narrative.
-                self.scenes[scId].title = dataItem['label']
-                self.scenes[scId].desc = dataItem['summary']
-                timestamp = dataItem['startDate']['timestamp']
-
-                #--- Get scene tags.
-                for tagId in dataItem['tags']:
-                    if self.scenes[scId].tags is None:
-                        self.scenes[scId].tags = []
-                    self.scenes[scId].tags.append(jsonData['data']['tags'][tagId])
-
-                #--- Get scene properties.
-                for propId in dataItem['propertyValues']:
-                    if propId == propNotesUid:
-                        self.scenes[scId].sceneNotes = dataItem['propertyValues'][propId]
-                    elif propId == propViewpointUid:
-                        vpGuidByScId[scId] = dataItem['propertyValues'][propId]
-
-                #--- Get scene date, time, and duration.
-                if timestamp is not None and timestamp >= self.DATE_LIMIT:
-                    # Restrict date/time calculation to dates within yWriter's range
-                    sceneStart = datetime.min + timedelta(seconds=timestamp)
-                    startDateTime = sceneStart.isoformat().split('T')
-                    self.scenes[scId].date = startDateTime[0]
-                    self.scenes[scId].time = startDateTime[1]
-
-                    # Calculate duration.
-                    if dataItem['duration']['years'] > 0 or dataItem['duration']['months'] > 0:
-                        endYear = sceneStart.year + dataItem['duration']['years']
-                        endMonth = sceneStart.month
-                        if dataItem['duration']['months'] > 0:
-                            endMonth += dataItem['duration']['months']
-                            while endMonth > 12:
-                                endMonth -= 12
-                                endYear += 1
-                        sceneDuration = datetime(endYear, endMonth, sceneStart.day) - \
-                                datetime(sceneStart.year, sceneStart.month, sceneStart.day)
-                        lastsDays = sceneDuration.days
-                        lastsHours = sceneDuration.seconds // 3600
-                        lastsMinutes = (sceneDuration.seconds % 3600) // 60
+            key = cache.get_key(self.filePath, self._cacheSettings)
+        except(OSError):
+            # Let the project reader report the error.
+            return self._read_project()
+
+        labelReport = cache.load(key, self)
+        if labelReport is not None:
+            if labelReport:
+                return f'Timeline data read from cache. {labelReport}'
+
+            return 'Timeline data read from cache.'
+
+        message = self._read_project()
+        if not message.startswith(ERROR) and not self.lazy:
+            # Storing would build all elements.
+            cache.store(key, self, self._labelReport)
+        return message
+
+    def _read_project(self):
+        """Read the project and build the novel structure.
+
+        Return a message beginning with the ERROR constant in case of error.
+        """
+        streaming = self.streaming
+        if streaming is None:
+            try:
+                streaming = self._get_project_size() > self.STREAMING_THRESHOLD
+            except(OSError):
+                streaming = False
+        if not streaming:
+            message, jsonData = self._read_json()
+            if message.startswith(ERROR):
+                return message
+
+            try:
+                return self._read_sections(self._iter_json_data(jsonData))
+
+            except(KeyError, TypeError):
+                return f'{ERROR}Wrong JSON structure.'
+
+        message, stream = self._open_stream()
+        if message.startswith(ERROR):
+            return message
+
+        try:
+            with stream:
+                return self._read_sections(self._iter_json_stream(JsonStream(stream)))
+
+        except(json.JSONDecodeError):
+            return f'{ERROR}Corrupted data.'
+
+        except(KeyError, TypeError):
+            return f'{ERROR}Wrong JSON structure.'
+
+        except(OSError):
+            return f'{ERROR}Cannot read "{os.path.normpath(self.filePath)}".'
+
+    def _get_project_size(self):
+        """Return the size of the project in bytes.
+
+        Raise OSError if the project file cannot be accessed.
+        """
+        return os.path.getsize(self.filePath)
+
+    def _read_json(self):
+        """Read the project and decode its JSON part.
+
+        Return a tuple with two elements:
+        - A message beginning with the ERROR constant in case of error
+        - jsonData: the decoded JSON object, or None in case of error
+        """
+        return read_json(self.filePath)
+
+    def _open_stream(self):
+        """Open the project for streaming.
+
+        Return a tuple with two elements:
+        - A message beginning with the ERROR constant in case of error
+        - stream: binary file object positioned at the start of the project, or None in case of error
+        """
+        try:
+            return 'Project opened.', open(self.filePath, 'rb')
+
+        except(FileNotFoundError):
+            return f'{ERROR}"{os.path.normpath(self.filePath)}" not found.', None
+
+        except(OSError):
+            return f'{ERROR}Cannot read "{os.path.normpath(self.filePath)}".', None
+
+    def _iter_json_data(self, jsonData):
+        """Iterate over the sections of the decoded JSON part required for conversion.
+
+        Positional arguments:
+            jsonData -- dict: the decoded JSON part of the project.
+
+        Yield tuples (section, uid, value) in the same way as _iter_json_stream().
+        """
+        yield 'definitions', None, jsonData['definitions']
+        for uid, dataItem in jsonData['data']['items']['byId'].items():
+            yield 'item', uid, dataItem
+        for uid, relationship in jsonData['data']['relationships']['byId'].items():
+            yield 'relationship', uid, relationship
+        yield 'narrative', None, jsonData['data']['narrative']
+        yield 'tags', None, jsonData['data']['tags']
+
+    def _iter_json_stream(self, stream):
+        """Iterate over the sections of the JSON part required for conversion, reading them one by one.
+
+        Positional arguments:
+            stream -- JsonStream instance, positioned at the start of the JSON part.
+
+        Yield tuples (section, uid, value):
+        - ('definitions', None, dict)
+        - ('item', uid, dict) for each entry of data.items.byId
+        - ('relationship', uid, dict) for each entry of data.relationships.byId
+        - ('narrative', None, dict)
+        - ('tags', None, dict)
+        The sections are yielded in the order of the file.
+        All other data is skipped. The trailing sections following "data" are not read at all.
+        Raise KeyError if a section is missing, like _iter_json_data().
+        """
+        missing = {'definitions', 'data', 'items', 'relationships', 'narrative', 'tags'}
+        for key in stream.iter_object():
+            if key == 'definitions':
+                missing.discard(key)
+                yield 'definitions', None, stream.value()
+            elif key == 'data':
+                missing.discard(key)
+                for dataKey in stream.iter_object():
+                    if dataKey == 'items':
+                        missing.discard(dataKey)
+                        for uid in self._iter_by_id(stream):
+                            yield 'item', uid, stream.value()
+                    elif dataKey == 'relationships':
+                        missing.discard(dataKey)
+                        for uid in self._iter_by_id(stream):
+                            yield 'relationship', uid, stream.value()
+                    elif dataKey in ('narrative', 'tags'):
+                        missing.discard(dataKey)
+                        yield dataKey, None, stream.value()
                     else:
-                        lastsDays = 0
-                        lastsHours = 0
-                        lastsMinutes = 0
-                    lastsDays += dataItem['duration']['weeks'] * 7
-                    lastsDays += dataItem['duration']['days']
-                    lastsDays += dataItem['duration']['hours'] // 24
-                    lastsHours += dataItem['duration']['hours'] % 24
-                    lastsHours += dataItem['duration']['minutes'] // 60
-                    lastsMinutes += dataItem['duration']['minutes'] % 60
-                    lastsMinutes += dataItem['duration']['seconds'] // 60
-                    lastsHours += lastsMinutes // 60
-                    lastsMinutes %= 60
-                    lastsDays += lastsHours // 24
-                    lastsHours %= 24
-                    self.scenes[scId].lastsDays = str(lastsDays)
-                    self.scenes[scId].lastsHours = str(lastsHours)
-                    self.scenes[scId].lastsMinutes = str(lastsMinutes)
-            elif dataItem['type'] in NarrativeFolderTypes:
-                #--- Create chapters.
-                chapterCount += 1
-                chId = str(chapterCount)
-                chIdsByGuid[uid] = chId
-                self.chapters[chId] = Chapter()
-                self.chapters[chId].desc = dataItem['label']
-            elif dataItem['type'] == typeCharacterUid:
-                #--- Create characters.
-                characterCount += 1
-                crId = str(characterCount)
-                crIdsByGuid[uid] = crId
-                self.characters[crId] = Character()
-                if dataItem['shortLabel']:
-                    self.characters[crId].title = dataItem['shortLabel']
+                        stream.skip()
+                break
+
+            else:
+                stream.skip()
+        if missing:
+            raise KeyError(sorted(missing)[0])
+
+    def _iter_by_id(self, stream):
+        """Iterate over the keys of the "byId" member of the next object, skipping the other members."""
+        for key in stream.iter_object():
+            if key == 'byId':
+                yield from stream.iter_object()
+            else:
+                stream.skip()
+
+    def register_builder(self, typeLabel, builder):
+        """Register a builder for the items of a custom Aeon type.
+
+        Positional arguments:
+            typeLabel -- str: label of the Aeon item type.
+            builder -- callable(uid, dataItem) creating novel elements from an item of this type.
+
+        The builder is called with the item's uid and its decoded JSON object.
+        It may delegate to one of the build_*() methods, e.g. to import
+        all items of type "Clue" as yWriter items:
+            timeline.register_builder('Clue', timeline.build_item)
+        A builder registered for a configured type label overrides the default builder.
+        If builders are registered, the parse cache is not used.
+        """
+        self._customBuilders[typeLabel] = builder
+
+    def build_scene(self, uid, dataItem):
+        """Create a scene from an item of the "Event" type.
+
+        Positional arguments:
+            uid -- str: the item's uid.
+            dataItem -- dict: the decoded item.
+        """
+        scId = str(len(self._sceneRecords) + 1)
+        self._scIdsByGuid[uid] = scId
+        timestamp = dataItem['startDate']['timestamp']
+        if timestamp is None or not self.DATE_LIMIT <= timestamp < self.DATE_MAX:
+            # Restrict date/time calculation to dates within yWriter's range
+            timestamp = None
+        self._sceneRecords[scId] = (
+            uid,
+            dataItem['label'],
+            dataItem['summary'],
+            dataItem['tags'],
+            self._get_properties(dataItem, self._sceneProperties),
+            timestamp,
+            dataItem['duration'],
+        )
+
+    def build_chapter(self, uid, dataItem):
+        """Create a chapter from an item of a narrative folder type.
+
+        Positional arguments:
+            uid -- str: the item's uid.
+            dataItem -- dict: the decoded item.
+        """
+        chId = str(len(self.chapters) + 1)
+        self._chIdsByGuid[uid] = chId
+        chapter = Chapter()
+        self.chapters[chId] = chapter
+        chapter.desc = dataItem['label']
+
+    def build_character(self, uid, dataItem):
+        """Create a character from an item of the "Character" type.
+
+        Positional arguments:
+            uid -- str: the item's uid.
+            dataItem -- dict: the decoded item.
+        """
+        crId = str(len(self._characterRecords) + 1)
+        self._crIdsByGuid[uid] = crId
+        self.srtCharacters.append(crId)
+        self._characterRecords[crId] = (
+            dataItem['label'],
+            dataItem['shortLabel'],
+            dataItem['summary'],
+            dataItem['tags'],
+            self._get_properties(dataItem, self._characterProperties),
+        )
+
+    def build_location(self, uid, dataItem):
+        """Create a location from an item of the "Location" type.
+
+        Positional arguments:
+            uid -- str: the item's uid.
+            dataItem -- dict: the decoded item.
+        """
+        lcId = str(len(self._locationRecords) + 1)
+        self._lcIdsByGuid[uid] = lcId
+        self.srtLocations.append(lcId)
+        self._locationRecords[lcId] = (dataItem['label'], dataItem['summary'], dataItem['tags'])
+
+    def build_item(self, uid, dataItem):
+        """Create an item from an item of the "Item" type.
+
+        Positional arguments:
+            uid -- str: the item's uid.
+            dataItem -- dict: the decoded item.
+        """
+        itId = str(len(self._itemRecords) + 1)
+        self._itIdsByGuid[uid] = itId
+        self.srtItems.append(itId)
+        self._itemRecords[itId] = (dataItem['label'], dataItem['summary'], dataItem['tags'])
+
+    def _get_properties(self, dataItem, dispatchTable):
+        """Return a list of (attribute, value) tuples for the item's properties found in dispatchTable."""
+        properties = []
+        for propId, propValue in dataItem['propertyValues'].items():
+            attr = dispatchTable.get(propId, None)
+            if attr is not None:
+                properties.append((attr, propValue))
+        return properties
+
+    def _make_scene(self, scId, record, dates):
+        """Return a Scene instance built from a scene record.
+
+        Positional arguments:
+            scId -- str: scene ID.
+            record -- tuple, as stored by build_scene().
+            dates -- tuple (date, time, lastsDays, lastsHours, lastsMinutes), or None.
+        """
+        uid, title, desc, tagIds, properties, __, __ = record
+        scene = Scene()
+        scene.status = 1
+        # Set scene status = "Outline"
+        scene.isNotesScene = scId not in self._narrativeScIds
+        scene.title = title
+        scene.desc = desc
+        if tagIds:
+            scene.tags = self._get_tags(tagIds)
+
+        #--- Set scene properties.
+        vpGuid = None
+        for attr, propValue in properties:
+            if attr == self._VIEWPOINT:
+                vpGuid = propValue
+            else:
+                setattr(scene, attr, propValue)
+
+        #--- Set scene date, time, and duration.
+        if dates is not None:
+            scene.date, scene.time, scene.lastsDays, scene.lastsHours, scene.lastsMinutes = dates
+
+        #--- Assign characters, locations, and items.
+        for attr, subjects, idsByGuid in self._sceneRelations:
+            objects = subjects.get(uid, None)
+            if objects:
+                elemIds = [idsByGuid[obj] for obj in objects if obj in idsByGuid]
+                if elemIds:
+                    setattr(scene, attr, elemIds)
+
+        #--- Set the viewpoint character.
+        vpId = self._crIdsByGuid.get(vpGuid, None)
+        if vpId is not None:
+            if scene.characters is None:
+                scene.characters = []
+            elif vpId in scene.characters:
+                scene.characters.remove(vpId)
+            scene.characters.insert(0, vpId)
+        return scene
+
+    def _make_lazy_scene(self, scId, record):
+        """Return a Scene instance built from a scene record, converting its date alone."""
+        timestamp, duration = record[5:]
+        dates = None
+        if timestamp is not None:
+            dates = convert_aeon_dates([timestamp], [duration])[0]
+        return self._make_scene(scId, record, dates)
+
+    def _make_character(self, crId, record):
+        """Return a Character instance built from a character record."""
+        label, shortLabel, summary, tagIds, properties = record
+        character = Character()
+        if shortLabel:
+            character.title = shortLabel
+        else:
+            character.title = label
+        character.fullName = label
+        character.bio = summary
+        if tagIds:
+            character.tags = self._get_tags(tagIds)
+
+        #--- Set character properties.
+        charDesc = []
+        for attr, propValue in properties:
+            if attr == self._CHR_DESC:
+                charDesc.append(propValue)
+            else:
+                setattr(character, attr, propValue)
+        character.desc = ('\n').join(charDesc)
+        return character
+
+    def _make_world_element(self, elemId, record):
+        """Return a WorldElement instance built from a location or item record."""
+        label, summary, tagIds = record
+        element = WorldElement()
+        element.title = label
+        element.desc = summary
+        if tagIds:
+            element.tags = self._get_tags(tagIds)
+        return element
+
+    def _get_tags(self, tagIds):
+        """Return a list of the tag names."""
+        tags = self._tags
+        return [tags[tagId] for tagId in tagIds]
+
+    def _make_elements(self):
+        """Build the scenes, characters, locations, and items from their records.
+
+        In lazy mode, set up mappings that build each element on first access.
+        """
+        if self.lazy:
+            self.scenes = LazyElements(self._sceneRecords, self._make_lazy_scene)
+            self.characters = LazyElements(self._characterRecords, self._make_character)
+            self.locations = LazyElements(self._locationRecords, self._make_world_element)
+            self.items = LazyElements(self._itemRecords, self._make_world_element)
+            return
+
+        # Convert all scene dates at once.
+        datedScIds = []
+        timestamps = []
+        durations = []
+        for scId, record in self._sceneRecords.items():
+            if record[5] is not None:
+                datedScIds.append(scId)
+                timestamps.append(record[5])
+                durations.append(record[6])
+        datesByScId = dict(zip(datedScIds, convert_aeon_dates(timestamps, durations)))
+        for scId, record in self._sceneRecords.items():
+            self.scenes[scId] = self._make_scene(scId, record, datesByScId.get(scId, None))
+        for crId, record in self._characterRecords.items():
+            self.characters[crId] = self._make_character(crId, record)
+        for lcId, record in self._locationRecords.items():
+            self.locations[lcId] = self._make_world_element(lcId, record)
+        for itId, record in self._itemRecords.items():
+            self.items[itId] = self._make_world_element(itId, record)
+
+    def _build_narrative(self, narrative):
+        """Set up the chapters' scene lists and the chapter sort order from the narrative tree.
+
+        Positional arguments:
+            narrative -- dict: the decoded "narrative" section of the project.
+
+        Walk the tree once in document order, using an explicit stack, so the depth is not limited.
+        Folders down to the depth given by the narrative policy become chapters;
+        a chapter becomes a part if folders directly below it are converted to chapters.
+        Scenes are added to the chapter of their nearest enclosing converted folder.
+        Scenes outside of folders, and other items, are not part of the narrative.
+        """
+        chIdsByGuid = self._chIdsByGuid
+        scIdsByGuid = self._scIdsByGuid
+        narrativeScIds = self._narrativeScIds
+        chapterDepth = self.NARRATIVE_POLICIES[self._narrativePolicy]
+        stack = [(iter(narrative['children']), None, 0)]
+        # Stack entries: (iterator over a node's children, chapter receiving their scenes, depth of the children).
+        while stack:
+            children, chapter, depth = stack[-1]
+            for node in children:
+                scId = scIdsByGuid.get(node['id'], None)
+                if scId is not None:
+                    if chapter is not None:
+                        chapter.srtScenes.append(scId)
+                        if chapter.chLevel is None:
+                            chapter.chLevel = 0
+                        narrativeScIds.add(scId)
+                    continue
+
+                chId = chIdsByGuid.get(node['id'], None)
+                if chId is None:
+                    continue
+
+                if chapterDepth is None or depth < chapterDepth:
+                    self.srtChapters.append(chId)
+                    if chapter is not None:
+                        chapter.chLevel = 1
+                    stack.append((iter(node['children']), self.chapters[chId], depth + 1))
                 else:
-                    self.characters[crId].title = dataItem['label']
-                self.characters[crId].fullName = dataItem['label']
-                self.characters[crId].bio = dataItem['summary']
-                self.srtCharacters.append(crId)
-
-                #--- Get character tags.
-                for tagId in dataItem['tags']:
-                    if self.characters[crId].tags is None:
-                        self.characters[crId].tags = []
-                    self.characters[crId].tags.append(jsonData['data']['tags'][tagId])
-
-                #--- Get character properties.
-                charDesc = []
-                for propId in dataItem['propertyValues']:
-                    if propId == propNotesUid:
-                        self.characters[crId].notes = dataItem['propertyValues'][propId]
-                    elif propId == propAkaUid:
-                        self.characters[crId].aka = dataItem['propertyValues'][propId]
-                    elif propId == propChrDesc1Uid:
-                        charDesc.append(dataItem['propertyValues'][propId])
-                    elif propId == propChrDesc2Uid:
-                        charDesc.append(dataItem['propertyValues'][propId])
-                    elif propId == propChrDesc3Uid:
-                        charDesc.append(dataItem['propertyValues'][propId])
-                self.characters[crId].desc = ('\n').join(charDesc)
-            elif dataItem['type'] == typeLocationUid:
-                #--- Create locations.
-                locationCount += 1
-                lcId = str(locationCount)
-                lcIdsByGuid[uid] = lcId
-                self.locations[lcId] = WorldElement()
-                self.locations[lcId].title = dataItem['label']
-                self.locations[lcId].desc = dataItem['summary']
-                self.srtLocations.append(lcId)
-
-                #--- Get location tags.
-                for tagId in dataItem['tags']:
-                    if self.locations[lcId].tags is None:
-                        self.locations[lcId].tags = []
-                    self.locations[lcId].tags.append(jsonData['data']['tags'][tagId])
-            elif dataItem['type'] == typeItemUid:
-                #--- Create items.
-                itemCount += 1
-                itId = str(itemCount)
-                itIdsByGuid[uid] = itId
-                self.items[itId] = WorldElement()
-                self.items[itId].title = dataItem['label']
-                self.items[itId].desc = dataItem['summary']
-                self.srtItems.append(itId)
-
-                #--- Get item tags.
-                for tagId in dataItem['tags']:
-                    if self.items[itId].tags is None:
-                        self.items[itId].tags = []
-                    self.items[itId].tags.append(jsonData['data']['tags'][tagId])
-        #--- Read relationships.
-        for uid in jsonData['data']['relationships']['byId']:
-            if jsonData['data']['relationships']['byId'][uid]['reference'] == refParticipant:
-                #--- Assign characters.
-                try:
-                    scId = scIdsByGuid[jsonData['data']['relationships']['byId'][uid]['subject']]
-                    crId = crIdsByGuid[jsonData['data']['relationships']['byId'][uid]['object']]
-                    if self.scenes[scId].characters is None:
-                        self.scenes[scId].characters = []
-                    if not crId in self.scenes[scId].characters:
-                        self.scenes[scId].characters.append(crId)
-                except:
-                    pass
-            elif jsonData['data']['relationships']['byId'][uid]['reference'] == refLocation:
-                #--- Assign locations.
-                try:
-                    scId = scIdsByGuid[jsonData['data']['relationships']['byId'][uid]['subject']]
-                    lcId = lcIdsByGuid[jsonData['data']['relationships']['byId'][uid]['object']]
-                    if self.scenes[scId].locations is None:
-                        self.scenes[scId].locations = []
-                    if not lcId in self.scenes[scId].locations:
-                        self.scenes[scId].locations.append(lcId)
-                except:
-                    pass
-        #--- Set scene viewpoints.
-        for scId in vpGuidByScId:
-            if vpGuidByScId[scId] in crIdsByGuid:
-                vpId = crIdsByGuid[vpGuidByScId[scId]]
-                if self.scenes[scId].characters is None:
-                    self.scenes[scId].characters = []
-                elif vpId in self.scenes[scId].characters:
-                    self.scenes[scId].characters.remove[vpId]
-                self.scenes[scId].characters.insert(0, vpId)
-        #--- Build a narrative structure with 2 or 3 levels.
-        for narrative0 in jsonData['data']['narrative']['children']:
-            if narrative0['id'] in chIdsByGuid:
-                self.srtChapters.append(chIdsByGuid[narrative0['id']])
-            for narrative1 in narrative0['children']:
-                if narrative1['id'] in chIdsByGuid:
-                    self.srtChapters.append(chIdsByGuid[narrative1['id']])
-                    self.chapters[chIdsByGuid[narrative0['id']]].chLevel = 1
-                    for narrative2 in narrative1['children']:
-                        if narrative2['id'] in scIdsByGuid:
-                            self.chapters[chIdsByGuid[narrative1['id']]].srtScenes.append(
-                                scIdsByGuid[narrative2['id']])
-                            self.scenes[scIdsByGuid[narrative2['id']]].isNotesScene = False
-                            self.chapters[chIdsByGuid[narrative1['id']]].chLevel = 0
-                elif narrative1['id'] in scIdsByGuid:
-                    self.chapters[chIdsByGuid[narrative0['id']]].srtScenes.append(scIdsByGuid[narrative1['id']])
-                    self.scenes[scIdsByGuid[narrative1['id']]].isNotesScene = False
-                    self.chapters[chIdsByGuid[narrative0['id']]].chLevel = 0
+                    # Merge the folder's scenes into the enclosing chapter.
+                    stack.append((iter(node['children']), chapter, depth + 1))
+                break
+
+            else:
+                stack.pop()
+
+    def _get_builders(self, schema):
+        """Set up the property dispatch tables and return the builders by type uid.
+
+        Positional arguments:
+            schema -- LabelSchema instance for the project's definitions.
+        """
+        # Property uid -> attribute; where uids coincide, the first entry in the list takes precedence.
+        self._sceneProperties = self._dispatch_table([
+            (schema.propNotesUid, 'sceneNotes'),
+            (schema.propViewpointUid, self._VIEWPOINT),
+        ])
+        self._characterProperties = self._dispatch_table([
+            (schema.propNotesUid, 'notes'),
+            (schema.propAkaUid, 'aka'),
+            (schema.propChrDesc1Uid, self._CHR_DESC),
+            (schema.propChrDesc2Uid, self._CHR_DESC),
+            (schema.propChrDesc3Uid, self._CHR_DESC),
+        ])
+
+        builders = {}
+        for typeUid, builder in (
+                (schema.typeItemUid, self.build_item),
+                (schema.typeLocationUid, self.build_location),
+                (schema.typeCharacterUid, self.build_character),
+                (schema.typeEventUid, self.build_scene),
+                ):
+            if typeUid is not None:
+                builders[typeUid] = builder
+        for typeUid in schema.narrativeFolderTypes:
+            builders[typeUid] = self.build_chapter
+        for typeLabel, builder in self._customBuilders.items():
+            typeUid = schema.typeUidsByLabel.get(typeLabel, None)
+            if typeUid is not None:
+                builders[typeUid] = builder
+        return builders
+
+    def _dispatch_table(self, entries):
+        """Return a dictionary made of (uid, attribute) entries, skipping unresolved uids."""
+        table = {}
+        for uid, attr in reversed(entries):
+            if uid is not None:
+                table[uid] = attr
+        return table
+
+    def _read_sections(self, sections):
+        """Build a yWriter novel structure from the sections of the JSON part.
+
+        Positional arguments:
+            sections -- iterator of (section, uid, value) tuples, as yielded by _iter_json_data().
+
+        The definitions must precede the items and relationships.
+        Return a message beginning with the ERROR constant in case of error.
+        """
+        if self._narrativePolicy not in self.NARRATIVE_POLICIES:
+            return f'{ERROR}Unknown narrative policy: "{self._narrativePolicy}".'
+
+        self._crIdsByGuid = {}
+        self._lcIdsByGuid = {}
+        self._itIdsByGuid = {}
+        self._scIdsByGuid = scIdsByGuid = {}
+        self._chIdsByGuid = {}
+        self._sceneRecords = {}
+        self._characterRecords = {}
+        self._locationRecords = {}
+        self._itemRecords = {}
+        self._narrativeScIds = narrativeScIds = set()
+        narrative = None
+        tags = None
+        schema = None
+        for section, uid, value in sections:
+            if section == 'definitions':
+                schema = get_schema(value, self._labelSettings)
+                if schema.typeEventUid is None:
+                    return f'{ERROR}{schema.report()}'
+
+                builders = self._get_builders(schema)
+                relationshipIndex = {}
+                for refUid in (schema.refParticipant, schema.refLocation, schema.refItem):
+                    if refUid is not None:
+                        relationshipIndex[refUid] = {}
+            elif section == 'item':
+                #--- Read items.
+                if schema is None:
+                    return f'{ERROR}Wrong JSON structure.'
+
+                builder = builders.get(value['type'], None)
+                if builder is not None:
+                    builder(uid, value)
+            elif section == 'relationship':
+                #--- Index relationships: reference uid -> subject uid -> ordered set of object uids.
+                if schema is None:
+                    return f'{ERROR}Wrong JSON structure.'
+
+                subjects = relationshipIndex.get(value['reference'], None)
+                if subjects is not None:
+                    objects = subjects.get(value['subject'], None)
+                    if objects is None:
+                        subjects[value['subject']] = {value['object']: None}
+                    else:
+                        objects[value['object']] = None
+            elif section == 'narrative':
+                narrative = value
+            elif section == 'tags':
+                tags = value
+        if narrative is None or tags is None:
+            return f'{ERROR}Wrong JSON structure.'
+
+        self._tags = tags
+        self._sceneRelations = [
+            (attr, relationshipIndex[refUid], idsByGuid)
+            for refUid, idsByGuid, attr in (
+                (schema.refItem, self._itIdsByGuid, 'items'),
+                (schema.refLocation, self._lcIdsByGuid, 'locations'),
+                (schema.refParticipant, self._crIdsByGuid, 'characters'),
+            )
+            if refUid is not None
+        ]
+        self._build_narrative(narrative)
         #--- Auto-number untitled chapters.
         partCount = 0
         chapterCount = 0
@@ -376,13 +708,18 @@ class JsonTimeline3(Novel):
                 if not self.chapters[chId].title:
                     self.chapters[chId].title = f'{self._chapterHdPrefix} {chapterCount}'
         #--- Create a "Notes" chapter for non-narrative scenes.
-        chId = str(partCount + chapterCount + 1)
+        chId = str(len(self.chapters) + 1)
         self.chapters[chId] = Chapter()
         self.chapters[chId].title = 'Other events'
         self.chapters[chId].desc = 'Scenes generated from events that ar not assigned to the narrative structure.'
         self.chapters[chId].chType = 1
         self.srtChapters.append(chId)
-        for scId in self.scenes:
-            if self.scenes[scId].isNotesScene:
+        for scId in self._sceneRecords:
+            if scId not in narrativeScIds:
                 self.chapters[chId].srtScenes.append(scId)
-        return 'Timeline data converted to novel structure.'
+        self._make_elements()
+        message = 'Timeline data converted to novel structure.'
+        if schema.unresolved:
+            self._labelReport = schema.report()
+            message = f'{message} {self._labelReport}'
+        return message
@@ -0,0 +1,114 @@
+"""Provide a class for resolving the configured labels of Aeon Timeline 3 definitions.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/aeon3yw
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+from functools import lru_cache
+
+
+class LabelSchema:
+    """Uid lookup tables for the labels of an Aeon 3 project's definitions.
+
+    Public methods:
+        report() -- return a message listing the unresolved labels.
+
+    Public instance variables:
+        typeEventUid -- str: uid of the "Event" item type.
+        typeCharacterUid -- str: uid of the "Character" item type.
+        typeLocationUid -- str: uid of the "Location" item type.
+        typeItemUid -- str: uid of the "Item" item type.
+        narrativeFolderTypes -- set of the uids of the narrative folder item types.
+        typeUidsByLabel -- dict: uid by label of the other item types.
+        propNotesUid -- str: uid of the "Notes" property.
+        propChrDesc1Uid -- str: uid of the property imported as 1st part of the character description.
+        propChrDesc2Uid -- str: uid of the property imported as 2nd part of the character description.
+        propChrDesc3Uid -- str: uid of the property imported as 3rd part of the character description.
+        propAkaUid -- str: uid of the "Nickname" property.
+        propViewpointUid -- str: uid of the "Viewpoint" property.
+        refParticipant -- str: uid of the "Participant" reference.
+        refLocation -- str: uid of the "Location" reference.
+        refItem -- str: uid of the "Item" reference.
+        unresolved -- list of (setting, label) tuples of the labels not found in the definitions.
+
+    The uid of an unresolved label is None.
+    Use get_schema() to get an instance, reused for projects with the same definitions.
+    """
+    SECTIONS = (
+        ('types', (
+            ('type_event', 'typeEventUid'),
+            ('type_character', 'typeCharacterUid'),
+            ('type_location', 'typeLocationUid'),
+            ('type_item', 'typeItemUid'),
+        )),
+        ('properties', (
+            ('notes_label', 'propNotesUid'),
+            ('character_desc_label1', 'propChrDesc1Uid'),
+            ('character_desc_label2', 'propChrDesc2Uid'),
+            ('character_desc_label3', 'propChrDesc3Uid'),
+            ('character_aka_label', 'propAkaUid'),
+            ('viewpoint_label', 'propViewpointUid'),
+        )),
+        ('references', (
+            ('character_label', 'refParticipant'),
+            ('location_label', 'refLocation'),
+            ('item_label', 'refItem'),
+        )),
+    )
+    # For each section of the definitions: (setting, attribute) pairs.
+
+    def __init__(self, fingerprint, settings):
+        """Resolve the labels in a single pass over each definitions section.
+
+        Positional arguments:
+            fingerprint -- tuple of (uid, label, isNarrativeFolder) tuples for each section, see get_schema().
+            settings -- dict: label by setting. Empty labels are not resolved.
+        """
+        self.narrativeFolderTypes = set()
+        self.unresolved = []
+        for (section, attributes), entries in zip(self.SECTIONS, fingerprint):
+            uidsByLabel = {}
+            for uid, label, isNarrativeFolder in entries:
+                if isNarrativeFolder:
+                    self.narrativeFolderTypes.add(uid)
+                else:
+                    uidsByLabel[label] = uid
+            if section == 'types':
+                self.typeUidsByLabel = uidsByLabel
+            for setting, attribute in attributes:
+                label = settings.get(setting, '')
+                uid = uidsByLabel.get(label, None)
+                setattr(self, attribute, uid)
+                if label and uid is None:
+                    self.unresolved.append((setting, label))
+
+    def report(self):
+        """Return a message listing the unresolved labels, or an empty string."""
+        if not self.unresolved:
+            return ''
+
+        labels = ', '.join(f'"{label}" ({setting})' for setting, label in self.unresolved)
+        return f'Unresolved labels: {labels}.'
+
+
+@lru_cache(maxsize=16)
+def _compile(fingerprint, settings):
+    return LabelSchema(fingerprint, dict(settings))
+
+
+def get_schema(definitions, settings):
+    """Return a LabelSchema instance for the definitions of an Aeon 3 project.
+
+    Positional arguments:
+        definitions -- dict: the decoded "definitions" section of the project.
+        settings -- iterable of (setting, label) tuples.
+
+    Schemas are cached by a fingerprint of the definitions' uids and labels,
+    so projects created from the same template share one schema.
+    Raise KeyError if the definitions are incomplete.
+    """
+    fingerprint = tuple(
+        tuple((uid, entry['label'], entry.get('isNarrativeFolder', False))
+              for uid, entry in definitions[section]['byId'].items())
+        for section, __ in LabelSchema.SECTIONS)
+    return _compile(fingerprint, tuple(settings))
@@ -0,0 +1,51 @@
+"""Provide a mapping class for novel elements built on first access.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/aeon3yw
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+from collections.abc import Mapping
+
+
+class LazyElements(Mapping):
+    """Read-only mapping of element IDs to novel elements, backed by raw records.
+
+    Public instance variables:
+        built -- int: number of elements built so far.
+
+    Iteration, len(), and the "in" operator only use the record IDs.
+    An element is built when its ID is first looked up, and then memoized.
+    """
+
+    def __init__(self, records, build):
+        """Set the records and the element factory.
+
+        Positional arguments:
+            records -- dict: raw record by element ID, in element order.
+            build -- callable(elemId, record) returning the element.
+        """
+        self._records = records
+        self._build = build
+        self._elements = {}
+
+    @property
+    def built(self):
+        return len(self._elements)
+
+    def __getitem__(self, elemId):
+        try:
+            return self._elements[elemId]
+
+        except(KeyError):
+            element = self._build(elemId, self._records[elemId])
+            self._elements[elemId] = element
+            return element
+
+    def __contains__(self, elemId):
+        return elemId in self._records
+
+    def __iter__(self):
+        return iter(self._records)
+
+    def __len__(self):
+        return len(self._records)
@@ -0,0 +1,140 @@
+"""Provide a class for merging the fields of novel elements by a table, and a list merging function.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/aeon3yw
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+from operator import attrgetter
+
+SOURCE_IF_NOT_NONE = 'source wins if not None'
+SOURCE_IF_NOT_EMPTY = 'keep target if source empty'
+UNION = 'union lists'
+
+
+def merge_lists(srcLst, tgtLst):
+    """Insert srcLst items to tgtLst, if missing.
+
+    Each missing item is inserted after its predecessor in srcLst,
+    or at the beginning of tgtLst, if it has no predecessor.
+    tgtLst is updated in place.
+    """
+    if len(set(srcLst)) != len(srcLst):
+        # A repeated item moves the insertion point backwards; insert item by item.
+        j = 0
+        for i in range(len(srcLst)):
+            if not srcLst[i] in tgtLst:
+                tgtLst.insert(j, srcLst[i])
+                j += 1
+            else:
+                j = tgtLst.index(srcLst[i]) + 1
+        return
+
+    positions = {}
+    for i, item in enumerate(tgtLst):
+        positions.setdefault(item, i)
+    insertions = {}
+    # Missing items by position of their predecessor in tgtLst; -1 stands for the beginning.
+    j = -1
+    for item in srcLst:
+        if item in positions:
+            j = positions[item]
+        else:
+            insertions.setdefault(j, []).append(item)
+    if not insertions:
+        return
+
+    mergedLst = insertions.get(-1, [])
+    for i, item in enumerate(tgtLst):
+        mergedLst.append(item)
+        if i in insertions:
+            mergedLst.extend(insertions[i])
+    tgtLst[:] = mergedLst
+
+
+def union(srcValue, tgtValue):
+    """Return the target list with the missing source list items inserted, if changed; otherwise return None."""
+    mergedValue = list(tgtValue or [])
+    merge_lists(srcValue, mergedValue)
+    if mergedValue != tgtValue:
+        return mergedValue
+
+    return None
+
+
+class MergePlan:
+    """Fields to be merged from a source element into a target element.
+
+    Public methods:
+        merge(source, target) -- update the target's fields from the source.
+
+    Per-field policies:
+        SOURCE_IF_NOT_NONE -- the source value wins, if not None.
+        SOURCE_IF_NOT_EMPTY -- the target value is kept, if the source value is empty, e.g. for titles.
+        UNION -- source list items missing in the target list are inserted after their predecessor.
+
+    The source and target values are fetched at once. If they are equal, nothing is to be merged.
+    Otherwise, empty source values are skipped before comparing, and only list unions call a function.
+    """
+
+    def __init__(self, fields):
+        """Build the getter of all field values, and specialize the fields by policy.
+
+        Positional arguments:
+            fields -- iterable of (attribute, policy) tuples.
+
+        Raise ValueError in case of an unknown policy.
+        """
+        self._fields = []
+        # (attribute, keepIfNone, list merging function or None) tuple per field
+        for attribute, policy in fields:
+            if policy == SOURCE_IF_NOT_NONE:
+                self._fields.append((attribute, True, None))
+            elif policy == SOURCE_IF_NOT_EMPTY:
+                self._fields.append((attribute, False, None))
+            elif policy == UNION:
+                self._fields.append((attribute, False, union))
+            else:
+                raise ValueError(f'Cannot merge "{attribute}" by "{policy}".')
+
+        self._fields = tuple(self._fields)
+        attributes = [field[0] for field in self._fields]
+        if len(attributes) == 1:
+            getValue = attrgetter(attributes[0])
+            self._get_values = lambda element: (getValue(element),)
+        else:
+            self._get_values = attrgetter(*attributes)
+
+    def merge(self, source, target):
+        """Update the target's fields from the source.
+
+        Positional arguments:
+            source -- the novel element to merge.
+            target -- the novel element to update.
+
+        Return the number of changed fields.
+        """
+        srcValues = self._get_values(source)
+        tgtValues = self._get_values(target)
+        if srcValues == tgtValues:
+            return 0
+
+        changed = 0
+        for (attribute, keepIfNone, merge_values), value, tgtValue in zip(self._fields, srcValues, tgtValues):
+            if keepIfNone:
+                if value is None:
+                    continue
+
+            elif not value:
+                continue
+
+            if value == tgtValue:
+                continue
+
+            if merge_values is not None:
+                value = merge_values(value, tgtValue)
+                if value is None:
+                    continue
+
+            setattr(target, attribute, value)
+            changed += 1
+        return changed
@@ -7,7 +7,7 @@ Published under the MIT License (https://opensource.org/licenses/mit-license.php
 import os
 from pywriter.pywriter_globals import ERROR
 from pywriter.converter.file_factory import FileFactory
-from pywriter.yw.yw7_file import Yw7File
+from aeon3ywlib.yw7_target import Yw7Target
 
 
 class NewProjectFactory(FileFactory):
@@ -37,7 +37,7 @@ class NewProjectFactory(FileFactory):
             return f'{ERROR}This document is not meant to be written back.', None, None
 
         fileName, __ = os.path.splitext(sourcePath)
-        targetFile = Yw7File(f'{fileName}{Yw7File.EXTENSION}', **kwargs)
+        targetFile = Yw7Target(f'{fileName}{Yw7Target.EXTENSION}', **kwargs)
         for fileClass in self._fileClasses:
             if fileClass.SUFFIX is not None:
                 if sourcePath.endswith(f'{fileClass.SUFFIX}{fileClass.EXTENSION}'):
@@ -0,0 +1,204 @@
+"""Provide a persistent cache for novel structures built from timeline files.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/aeon3yw
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+import os
+import zlib
+import pickle
+import hashlib
+from pywriter.model.scene import Scene
+from pywriter.model.chapter import Chapter
+from pywriter.model.world_element import WorldElement
+from pywriter.model.character import Character
+
+
+class ParseCache:
+    """Persistent on-disk cache of novel structures.
+
+    Public methods:
+        get_key(filePath, settings) -- return the cache key for a project file.
+        load(key, novel) -- restore the novel structure from the cache; return the stored report.
+        store(key, novel, report) -- add the novel structure and a report to the cache.
+        clear() -- remove all cache entries.
+
+    Public instance variables:
+        cacheDir -- str: path to the cache directory.
+        maxSize -- int: maximum total size of the cache entries in bytes.
+
+    Each entry holds the elements and sort orders of a novel, and the report of its conversion,
+    as compressed pickle of plain dictionaries and lists.
+    The entries are keyed by the project file's content hash
+    and the settings used for conversion.
+    When the cache exceeds maxSize, the least recently used entries are removed.
+    The cache is an optimization only: all errors on access are treated as cache misses.
+    """
+    MAX_SIZE = 100000000
+    # Default maximum total size of the cache entries in bytes.
+
+    EXTENSION = '.cache'
+
+    FORMAT = 3
+    # Part of the key; increment when the entry format or the conversion rules change.
+
+    _COLLECTIONS = (
+        ('chapters', 'srtChapters', Chapter),
+        ('scenes', None, Scene),
+        ('characters', 'srtCharacters', Character),
+        ('locations', 'srtLocations', WorldElement),
+        ('items', 'srtItems', WorldElement),
+    )
+    _CHUNK_SIZE = 1 << 20
+    _ERRORS = (OSError, EOFError, ValueError, TypeError, KeyError, AttributeError, pickle.UnpicklingError, zlib.error)
+
+    def __init__(self, cacheDir, maxSize=None):
+        """Set the cache location and size limit.
+
+        Positional arguments:
+            cacheDir -- str: path to the cache directory. It is created when storing the first entry.
+
+        Optional arguments:
+            maxSize -- int: maximum total size of the cache entries in bytes.
+        """
+        self.cacheDir = cacheDir
+        if maxSize is not None:
+            self.maxSize = maxSize
+        else:
+            self.maxSize = self.MAX_SIZE
+
+    def get_key(self, filePath, settings):
+        """Return the cache key for a project file as a hex string.
+
+        Positional arguments:
+            filePath -- str: path to the project file.
+            settings -- sequence of (name, value) tuples affecting the conversion result.
+
+        Raise OSError if the file cannot be read.
+        """
+        keyHash = hashlib.sha256()
+        with open(filePath, 'rb') as f:
+            for chunk in iter(lambda: f.read(self._CHUNK_SIZE), b''):
+                keyHash.update(chunk)
+        keyHash.update(repr((self.FORMAT, os.path.splitext(filePath)[1].lower(), tuple(settings))).encode('utf-8'))
+        return keyHash.hexdigest()
+
+    def load(self, key, novel):
+        """Restore the novel structure from the cache.
+
+        Positional arguments:
+            key -- str: cache key as returned by get_key().
+            novel -- Novel instance whose elements and sort orders are set.
+
+        Return the report stored with the entry on a cache hit, otherwise None.
+        """
+        entryPath = self._entry_path(key)
+        try:
+            with open(entryPath, 'rb') as f:
+                data = pickle.loads(zlib.decompress(f.read()))
+            collections = {}
+            for attr, srtAttr, elementClass in self._COLLECTIONS:
+                elements = {}
+                for elemId, elemVars in data[attr].items():
+                    element = elementClass()
+                    element.__dict__.update(elemVars)
+                    elements[elemId] = element
+                collections[attr] = elements
+            srtLists = {srtAttr: data[srtAttr] for __, srtAttr, __ in self._COLLECTIONS if srtAttr}
+            report = str(data['report'])
+        except self._ERRORS:
+            return None
+
+        # Mark the entry as recently used.
+        try:
+            os.utime(entryPath)
+        except(OSError):
+            pass
+
+        for attr, elements in collections.items():
+            setattr(novel, attr, elements)
+        for srtAttr, srtList in srtLists.items():
+            setattr(novel, srtAttr, srtList)
+        return report
+
+    def store(self, key, novel, report=''):
+        """Add the novel structure to the cache, and evict entries exceeding the size limit.
+
+        Positional arguments:
+            key -- str: cache key as returned by get_key().
+            novel -- Novel instance whose elements and sort orders are stored.
+
+        Optional arguments:
+            report -- str: message about the conversion, returned by load() on a cache hit.
+        """
+        data = {'report': report}
+        for attr, srtAttr, __ in self._COLLECTIONS:
+            elements = getattr(novel, attr)
+            data[attr] = {elemId: vars(elements[elemId]) for elemId in elements}
+            if srtAttr:
+                data[srtAttr] = getattr(novel, srtAttr)
+        entryPath = self._entry_path(key)
+        tempPath = f'{entryPath}.{os.getpid()}.tmp'
+        try:
+            entry = zlib.compress(pickle.dumps(data, pickle.HIGHEST_PROTOCOL))
+            os.makedirs(self.cacheDir, exist_ok=True)
+            with open(tempPath, 'wb') as f:
+                f.write(entry)
+
+            # Replace atomically, so that concurrent readers never see a partial entry.
+            os.replace(tempPath, entryPath)
+        except self._ERRORS:
+            try:
+                os.remove(tempPath)
+            except(OSError):
+                pass
+            return
+
+        self._evict()
+
+    def clear(self):
+        """Remove all cache entries."""
+        for entryPath, __, __ in self._list_entries():
+            try:
+                os.remove(entryPath)
+            except(OSError):
+                pass
+
+    def _entry_path(self, key):
+        return os.path.join(self.cacheDir, f'{key}{self.EXTENSION}')
+
+    def _list_entries(self):
+        """Return a list of (path, size, access time) tuples of the cache entries."""
+        entries = []
+        try:
+            with os.scandir(self.cacheDir) as dirEntries:
+                for dirEntry in dirEntries:
+                    if dirEntry.name.endswith(self.EXTENSION):
+                        try:
+                            stat = dirEntry.stat()
+                        except(OSError):
+                            continue
+
+                        entries.append((dirEntry.path, stat.st_size, stat.st_mtime))
+        except(OSError):
+            pass
+        return entries
+
+    def _evict(self):
+        """Remove the least recently used entries until the total size is within the limit."""
+        entries = self._list_entries()
+        totalSize = sum(size for __, size, __ in entries)
+        if totalSize <= self.maxSize:
+            return
+
+        entries.sort(key=lambda entry: entry[2])
+        for entryPath, size, __ in entries:
+            if totalSize <= self.maxSize:
+                break
+
+            try:
+                os.remove(entryPath)
+            except(OSError):
+                continue
+
+            totalSize -= size
@@ -4,18 +4,26 @@ Copyright (c) 2022 Peter Triesberger
 For further information see https://github.com/peter88213/aeon3yw
 Published under the MIT License (https://opensource.org/licenses/mit-license.php)
 """
+import os
+from pywriter.pywriter_globals import ERROR
 from pywriter.converter.yw_cnv_ff import YwCnvFf
+from aeon3ywlib.yw7_target import Yw7Target
 from aeon3ywlib.new_project_factory import NewProjectFactory
 from aeon3ywlib.json_timeline3 import JsonTimeline3
+from aeon3ywlib.zip_timeline3 import ZipTimeline3
 from aeon3ywlib.csv_timeline3 import CsvTimeline3
+from aeon3ywlib.csv_combiner import find_csv_files
 
 
 class Pywaeon3Converter(YwCnvFf):
     """A converter for yWriter project generation from Aeon Timeline 3.
 
+    Public methods:
+        run(sourcePath, **kwargs) -- create source and target objects and run conversion.
+
     Overrides the superclass constant CREATE_SOURCE_CLASSES.
     """
-    CREATE_SOURCE_CLASSES = [JsonTimeline3, CsvTimeline3]
+    CREATE_SOURCE_CLASSES = [JsonTimeline3, ZipTimeline3, CsvTimeline3]
 
     def __init__(self):
         """Create a strategy class instance.
@@ -24,3 +32,32 @@ class Pywaeon3Converter(YwCnvFf):
         """
         super().__init__()
         self.newProjectFactory = NewProjectFactory(self.CREATE_SOURCE_CLASSES)
+
+    def run(self, sourcePath, **kwargs):
+        """Create source and target objects and run conversion.
+
+        Positional arguments: 
+            sourcePath -- str: the source file path, or a directory or glob pattern referring to csv files.
+
+        If sourcePath refers to several csv files, they are read as one Aeon Timeline csv export.
+        The new yWriter project is named after the directory containing the csv files.
+        Extends the superclass method.
+        """
+        csvFiles = find_csv_files(sourcePath)
+        if csvFiles is None:
+            super().run(sourcePath, **kwargs)
+            return
+
+        self.newFile = None
+        if not csvFiles:
+            self.ui.set_info_how(f'{ERROR}No csv file found at "{os.path.normpath(sourcePath)}".')
+            return
+
+        if os.path.isdir(sourcePath):
+            sourceDir = sourcePath
+        else:
+            sourceDir = os.path.dirname(sourcePath) or '.'
+        projectName = os.path.basename(os.path.abspath(sourceDir))
+        source = CsvTimeline3(csvFiles[0], csv_files=csvFiles, **kwargs)
+        target = Yw7Target(os.path.join(sourceDir, f'{projectName}{Yw7Target.EXTENSION}'), **kwargs)
+        self.create_yw7(source, target)
@@ -1,14 +1,9 @@
 """Provide a GUID generator for Aeon Timeline.
 """
+import os
 import random
 
-guidChars = list('ABCDEF0123456789')
-
-
-def get_substring(size):
-    """Return a randomized pseudo-hash.
-    """
-    return ''.join(random.choice(guidChars) for _ in range(size))
+GUID_BYTES = 16
 
 
 def get_uid():
@@ -16,8 +11,41 @@ def get_uid():
 
     Form: aaaaaaaa-bbbb-cccc-dddd-eeeeeeeeeeee
     """
-    sizes = [8, 4, 4, 4, 12]
-    guid = []
-    for size in sizes:
-        guid.append(get_substring(size))
-    return '-'.join(guid)
+    return get_uids(1)[0]
+
+
+def get_uids(count, existing=None, seed=None):
+    """Return a list of unique random GUIDs for Aeon Timeline.
+
+    Positional arguments:
+        count -- int: number of GUIDs.
+
+    Optional arguments:
+        existing -- set of GUIDs not to be returned, e.g. the GUIDs of a project.
+        seed -- int, str, or bytes: seed for a reproducible sequence of GUIDs.
+                If None, the GUIDs are drawn from os.urandom().
+
+    Form: aaaaaaaa-bbbb-cccc-dddd-eeeeeeeeeeee, with upper case hex digits.
+    The random bytes of all GUIDs are drawn at once, and converted to hex digits at once.
+    """
+    if seed is None:
+        draw = os.urandom
+    else:
+        generator = random.Random(seed)
+
+        def draw(size):
+            return generator.getrandbits(size * 8).to_bytes(size, 'big')
+
+    if existing is None:
+        existing = set()
+    guids = []
+    used = set()
+    while len(guids) < count:
+        missing = count - len(guids)
+        digits = draw(missing * GUID_BYTES).hex().upper()
+        for i in range(0, missing * GUID_BYTES * 2, GUID_BYTES * 2):
+            guid = f'{digits[i:i + 8]}-{digits[i + 8:i + 12]}-{digits[i + 12:i + 16]}-{digits[i + 16:i + 20]}-{digits[i + 20:i + 32]}'
+            if not guid in used and not guid in existing:
+                used.add(guid)
+                guids.append(guid)
+    return guids
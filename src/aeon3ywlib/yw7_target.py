@@ -0,0 +1,986 @@
+"""Provide a class for yWriter 7 project files created or updated by the converter.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/aeon3yw
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+import os
+import re
+from html import unescape
+import xml.etree.ElementTree as ET
+from pywriter.pywriter_globals import ERROR
+from pywriter.model.splitter import Splitter
+from pywriter.yw.yw7_file import Yw7File
+from aeon3ywlib.merge_plan import MergePlan
+from aeon3ywlib.merge_plan import merge_lists
+from aeon3ywlib.merge_plan import SOURCE_IF_NOT_NONE
+from aeon3ywlib.merge_plan import SOURCE_IF_NOT_EMPTY
+from aeon3ywlib.merge_plan import UNION
+from aeon3ywlib.io_account import IoAccount
+
+
+def split_tags(text):
+    """Return a list of the tags in a semicolon-separated string, with leading and trailing spaces removed."""
+    return [tag.strip() for tag in text.split(';')]
+
+
+class Yw7Target(Yw7File):
+    """yWriter 7 project file representation, written in one pass.
+
+    Public instance variables:
+        lowMemory -- bool: if True, read the project without keeping the xml element tree.
+        ioAccount -- IoAccount instance: files accessed, and bytes read and written, by phase:
+                     "read", "merge" (reading the existing project), "backup", and "write".
+        fieldsChanged -- int: number of fields changed by the last merge.
+
+    A new project is streamed to disk element by element, directly from the novel's instance variables.
+    The xml element tree of an existing project is serialized in memory,
+    and post-processed before being written to disk at once.
+    In low memory mode, the project is parsed incrementally, and each element is discarded when read.
+    Since xml elements and fields not represented by the novel's instance variables are not kept,
+    an existing project is read-only in low memory mode: it is neither merged into, nor overwritten.
+    When merging into an existing project, the scene contents are not read.
+    They are passed through unchanged with the xml element tree.
+    A conversion is one session: the lock is checked once, the project file is read at most once,
+    and written once.
+    """
+    XML_HEADER = '<?xml version="1.0" encoding="utf-8"?>\n'
+    INDENT = '  '
+
+    _PRJ_ATTRIBUTES = {
+        'Title': ('title', None),
+        'AuthorName': ('authorName', None),
+        'Bio': ('authorBio', None),
+        'Desc': ('desc', None),
+        'FieldTitle1': ('fieldTitle1', None),
+        'FieldTitle2': ('fieldTitle2', None),
+        'FieldTitle3': ('fieldTitle3', None),
+        'FieldTitle4': ('fieldTitle4', None),
+    }
+    _WE_ATTRIBUTES = {
+        'Title': ('title', None),
+        'ImageFile': ('image', None),
+        'Desc': ('desc', None),
+        'AKA': ('aka', None),
+        'Tags': ('tags', split_tags),
+    }
+    _CRT_ATTRIBUTES = {
+        **_WE_ATTRIBUTES,
+        'Notes': ('notes', None),
+        'Bio': ('bio', None),
+        'Goals': ('goals', None),
+        'FullName': ('fullName', None),
+    }
+    _CHP_ATTRIBUTES = {
+        'Title': ('title', None),
+        'Desc': ('desc', None),
+        'Type': ('oldType', int),
+        'ChapterType': ('chType', int),
+    }
+    _SCN_ATTRIBUTES = {
+        'Title': ('title', None),
+        'Desc': ('desc', None),
+        'RTFFile': ('rtfFile', None),
+        'WordCount': ('wordCount', int),
+        'LetterCount': ('letterCount', int),
+        'Status': ('status', int),
+        'Notes': ('sceneNotes', None),
+        'Tags': ('tags', split_tags),
+        'Field1': ('field1', None),
+        'Field2': ('field2', None),
+        'Field3': ('field3', None),
+        'Field4': ('field4', None),
+        'LastsDays': ('lastsDays', None),
+        'LastsHours': ('lastsHours', None),
+        'LastsMinutes': ('lastsMinutes', None),
+        'Goal': ('goal', None),
+        'Conflict': ('conflict', None),
+        'Outcome': ('outcome', None),
+        'ImageFile': ('image', None),
+    }
+    # (attribute, conversion) by xml tag, for each attribute read from a child element's text.
+    # Without conversion, the text is read as it is; otherwise, missing text is not read.
+
+    _SCN_DAY_ATTRIBUTES = (
+        ('Day', 'day'),
+        ('Hour', 'hour'),
+        ('Minute', 'minute'),
+    )
+    # (xml tag, attribute) for each scene attribute read if there is no specific date.
+
+    _CRT_FLAGS = (
+        ('Major', 'isMajor'),
+    )
+    _CHP_FLAGS = (
+        ('Unused', 'isUnused'),
+    )
+    _SCN_FLAGS = (
+        ('Unused', 'isUnused'),
+        ('AppendToPrev', 'appendToPrev'),
+        ('ReactionScene', 'isReactionScene'),
+        ('SubPlot', 'isSubPlot'),
+    )
+    # (xml tag, attribute) for each boolean attribute that is True if a child element exists.
+
+    _SCN_RELATIONS = (
+        ('Characters', 'characters', 'CharID'),
+        ('Locations', 'locations', 'LocID'),
+        ('Items', 'items', 'ItemID'),
+    )
+    # (xml tag, attribute, ID tag) for each list of IDs of related elements.
+
+    _PRJ_MERGE = MergePlan((
+        ('title', SOURCE_IF_NOT_EMPTY),
+        ('desc', SOURCE_IF_NOT_NONE),
+        ('authorName', SOURCE_IF_NOT_NONE),
+        ('authorBio', SOURCE_IF_NOT_NONE),
+        ('fieldTitle1', SOURCE_IF_NOT_NONE),
+        ('fieldTitle2', SOURCE_IF_NOT_NONE),
+        ('fieldTitle3', SOURCE_IF_NOT_NONE),
+        ('fieldTitle4', SOURCE_IF_NOT_NONE),
+        ('srtChapters', UNION),
+    ))
+    _WE_FIELDS = (
+        ('title', SOURCE_IF_NOT_EMPTY),
+        ('image', SOURCE_IF_NOT_NONE),
+        ('desc', SOURCE_IF_NOT_NONE),
+        ('aka', SOURCE_IF_NOT_NONE),
+        ('tags', SOURCE_IF_NOT_NONE),
+    )
+    _WE_MERGE = MergePlan(_WE_FIELDS)
+    _CRT_MERGE = MergePlan(_WE_FIELDS + (
+        ('notes', SOURCE_IF_NOT_NONE),
+        ('bio', SOURCE_IF_NOT_NONE),
+        ('goals', SOURCE_IF_NOT_NONE),
+        ('fullName', SOURCE_IF_NOT_NONE),
+        ('isMajor', SOURCE_IF_NOT_NONE),
+    ))
+    _CHP_MERGE = MergePlan((
+        ('title', SOURCE_IF_NOT_EMPTY),
+        ('desc', SOURCE_IF_NOT_NONE),
+        ('chLevel', SOURCE_IF_NOT_NONE),
+        ('oldType', SOURCE_IF_NOT_NONE),
+        ('chType', SOURCE_IF_NOT_NONE),
+        ('isUnused', SOURCE_IF_NOT_NONE),
+        ('suppressChapterTitle', SOURCE_IF_NOT_NONE),
+        ('suppressChapterBreak', SOURCE_IF_NOT_NONE),
+        ('isTrash', SOURCE_IF_NOT_NONE),
+    ))
+    _SCN_MERGE = MergePlan((
+        ('title', SOURCE_IF_NOT_EMPTY),
+        ('desc', SOURCE_IF_NOT_NONE),
+        ('isUnused', SOURCE_IF_NOT_NONE),
+        ('isNotesScene', SOURCE_IF_NOT_NONE),
+        ('isTodoScene', SOURCE_IF_NOT_NONE),
+        ('status', SOURCE_IF_NOT_NONE),
+        ('sceneNotes', SOURCE_IF_NOT_NONE),
+        ('tags', SOURCE_IF_NOT_NONE),
+        ('field1', SOURCE_IF_NOT_NONE),
+        ('field2', SOURCE_IF_NOT_NONE),
+        ('field3', SOURCE_IF_NOT_NONE),
+        ('field4', SOURCE_IF_NOT_NONE),
+        ('appendToPrev', SOURCE_IF_NOT_NONE),
+        ('minute', SOURCE_IF_NOT_NONE),
+        ('hour', SOURCE_IF_NOT_NONE),
+        ('day', SOURCE_IF_NOT_NONE),
+        ('lastsMinutes', SOURCE_IF_NOT_NONE),
+        ('lastsHours', SOURCE_IF_NOT_NONE),
+        ('lastsDays', SOURCE_IF_NOT_NONE),
+        ('isReactionScene', SOURCE_IF_NOT_NONE),
+        ('isSubPlot', SOURCE_IF_NOT_NONE),
+        ('goal', SOURCE_IF_NOT_NONE),
+        ('conflict', SOURCE_IF_NOT_NONE),
+        ('outcome', SOURCE_IF_NOT_NONE),
+    ))
+    _SCN_DATE_MERGE = MergePlan((
+        ('date', SOURCE_IF_NOT_NONE),
+        ('time', SOURCE_IF_NOT_NONE),
+    ))
+    # Fields merged from the source, with their merge policies, by element type.
+
+    def __init__(self, filePath, **kwargs):
+        """Compile the CDATA tag pattern.
+
+        Positional arguments:
+            filePath -- str: path to the yw7 file.
+
+        Optional keyword arguments:
+            low_memory -- bool: if True, read the project without keeping the xml element tree.
+                                An existing project can then not be updated.
+                                Default: keep the tree for writing.
+
+        Extends the superclass constructor.
+        """
+        super().__init__(filePath, **kwargs)
+        self.lowMemory = kwargs.get('low_memory', False)
+        self._readSceneContent = True
+        self._readPhase = 'read'
+        # I/O accounting phase of the project reading.
+        self._locked = None
+        # Result of the session's lock check.
+        self.ioAccount = IoAccount()
+        self.fieldsChanged = 0
+        tags = '|'.join(self._CDATA_TAGS)
+        self._cdataTags = re.compile(f'<(/?)({tags})>')
+        self._cdataTagSet = set(self._CDATA_TAGS)
+
+    def merge(self, source):
+        """Update instance variables from a source instance.
+
+        Positional arguments:
+            source -- Novel subclass instance to merge.
+
+        Merge the fields as specified by the merge plans, counting the changed fields.
+        Read the existing project without the scene contents.
+        Return a message beginning with the ERROR constant in case of error,
+        e.g. if the project exists, and is to be read in low memory mode.
+        Overrides the superclass method.
+        """
+        if os.path.isfile(self.filePath):
+            if self.lowMemory:
+                return f'{ERROR}Can not update "{os.path.normpath(self.filePath)}" in low memory mode.'
+
+            self._readSceneContent = False
+            self._readPhase = 'merge'
+            message = self.read()
+            self._readSceneContent = True
+            self._readPhase = 'read'
+            if message.startswith(ERROR):
+                return message
+
+        self.fieldsChanged = 0
+
+        #--- Merge and re-order locations, items, and characters.
+        if source.srtLocations:
+            self.srtLocations = source.srtLocations
+            self.locations = self._merge_world_elements(
+                source.locations, self.locations, source.srtLocations, self.WE_CLASS, self._WE_MERGE, self._LOC_KWVAR)
+        if source.srtItems:
+            self.srtItems = source.srtItems
+            self.items = self._merge_world_elements(
+                source.items, self.items, source.srtItems, self.WE_CLASS, self._WE_MERGE, self._ITM_KWVAR)
+        if source.srtCharacters:
+            self.srtCharacters = source.srtCharacters
+            self.characters = self._merge_world_elements(
+                source.characters, self.characters, source.srtCharacters, self.CHARACTER_CLASS, self._CRT_MERGE,
+                self._CRT_KWVAR)
+
+        #--- Merge scenes.
+        sourceHasSceneContent = False
+        changed = 0
+        merge_scene = self._SCN_MERGE.merge
+        relations = (('characters', self.characters), ('locations', self.locations), ('items', self.items))
+        for scId, srcScene in source.scenes.items():
+            scene = self.scenes.get(scId, None)
+            if scene is None:
+                scene = self.SCENE_CLASS()
+                self.scenes[scId] = scene
+            changed += merge_scene(srcScene, scene)
+            sceneContent = srcScene.sceneContent
+            if sceneContent is not None:
+                if sceneContent != scene.sceneContent:
+                    changed += 1
+                # The word count and letter count are updated.
+                scene.sceneContent = sceneContent
+                sourceHasSceneContent = True
+            if srcScene.date or srcScene.time:
+                changed += self._SCN_DATE_MERGE.merge(srcScene, scene)
+            elif srcScene.minute or srcScene.hour or srcScene.day:
+                changed += (scene.date is not None) + (scene.time is not None)
+                scene.date = None
+                scene.time = None
+            for attribute, elements in relations:
+                elemIds = getattr(srcScene, attribute)
+                if elemIds is not None:
+                    elemIds = [elemId for elemId in elemIds if elemId in elements]
+                    if elemIds != getattr(scene, attribute):
+                        setattr(scene, attribute, elemIds)
+                        changed += 1
+            if self._SCN_KWVAR:
+                changed += self._merge_custom_fields(srcScene.kwVar, scene.kwVar, self._SCN_KWVAR)
+        self.fieldsChanged += changed
+
+        #--- Merge chapters.
+        for chId, srcChapter in source.chapters.items():
+            chapter = self.chapters.get(chId, None)
+            if chapter is None:
+                chapter = self.CHAPTER_CLASS()
+                self.chapters[chId] = chapter
+            self.fieldsChanged += self._CHP_MERGE.merge(srcChapter, chapter)
+            self.fieldsChanged += self._merge_custom_fields(srcChapter.kwVar, chapter.kwVar, self._CHP_KWVAR)
+
+            # Remove scenes that have been moved to another chapter from the scene list,
+            # then add new or moved scenes. Deletion of scenes is not considered.
+            srcScIds = set(srcChapter.srtScenes)
+            srtScenes = [scId for scId in chapter.srtScenes if scId in srcScIds or not scId in source.scenes]
+            merge_lists(srcChapter.srtScenes, srtScenes)
+            if srtScenes != chapter.srtScenes:
+                chapter.srtScenes = srtScenes
+                self.fieldsChanged += 1
+
+        #--- Merge project attributes and the chapter list.
+        self.fieldsChanged += self._PRJ_MERGE.merge(source, self)
+        self.fieldsChanged += self._merge_custom_fields(source.kwVar, self.kwVar, self._PRJ_KWVAR)
+
+        # Split scenes by inserted part/chapter/scene dividers.
+        # This must be done after regular merging
+        # in order to avoid creating duplicate IDs.
+        if sourceHasSceneContent:
+            sceneSplitter = Splitter()
+            self.scenesSplit = sceneSplitter.split_scenes(self)
+        return 'yWriter project data updated or created.'
+
+    def _merge_world_elements(self, srcElements, tgtElements, srtIds, elementClass, mergePlan, kwVarFields):
+        """Return a dictionary of merged locations, items, or characters, sorted like the source.
+
+        Positional arguments:
+            srcElements -- dict: the source's elements by ID.
+            tgtElements -- dict: the target's elements by ID.
+            srtIds -- list of the source's element IDs, sorted.
+            elementClass -- class of a new element.
+            mergePlan -- MergePlan instance for the element type.
+            kwVarFields -- tuple of the names of the element type's custom fields.
+
+        Elements missing in the source are not kept.
+        """
+        elements = {}
+        for elemId in srtIds:
+            element = tgtElements.get(elemId, None)
+            if element is None:
+                element = elementClass()
+            self.fieldsChanged += mergePlan.merge(srcElements[elemId], element)
+            self.fieldsChanged += self._merge_custom_fields(srcElements[elemId].kwVar, element.kwVar, kwVarFields)
+            elements[elemId] = element
+        return elements
+
+    def _merge_custom_fields(self, srcKwVar, tgtKwVar, kwVarFields):
+        """Update an element's custom keyword variables, if set in the source.
+
+        Positional arguments:
+            srcKwVar -- dict: the source element's custom keyword variables.
+            tgtKwVar -- dict: the target element's custom keyword variables.
+            kwVarFields -- tuple of the names of the element type's custom fields.
+
+        Return the number of changed fields.
+        """
+        changed = 0
+        for fieldName in kwVarFields:
+            if fieldName in srcKwVar:
+                if srcKwVar[fieldName] != tgtKwVar.get(fieldName, None):
+                    changed += 1
+                tgtKwVar[fieldName] = srcKwVar[fieldName]
+        return changed
+
+    def read(self):
+        """Parse the yWriter xml file and get the instance variables.
+
+        Each xml element is read with a single pass over its children.
+        In low memory mode, parse the file incrementally, and discard each element when read.
+        Return a message beginning with the ERROR constant in case of error.
+        Overrides the superclass method.
+        """
+        if self.is_locked():
+            return f'{ERROR}yWriter seems to be open. Please close first.'
+
+        self.srtLocations = []
+        self.srtItems = []
+        self.srtCharacters = []
+        self.srtChapters = []
+        # This is necessary for re-reading.
+        readers = {
+            'LOCATION': self._read_location,
+            'ITEM': self._read_item,
+            'CHARACTER': self._read_character,
+            'PROJECT': self._read_project,
+            'CHAPTER': self._read_chapter,
+            'SCENE': self._read_scene,
+        }
+        try:
+            with open(self.filePath, 'rb') as f:
+                if self.lowMemory:
+                    self.tree = None
+                    self._read_incrementally(f, readers)
+                else:
+                    self.tree = ET.parse(f)
+                self.ioAccount.add(self._readPhase, 1, f.tell(), 0)
+            if self.tree is not None:
+                for xmlSection in self.tree.getroot():
+                    if xmlSection.tag in readers:
+                        readers[xmlSection.tag](xmlSection)
+                        continue
+
+                    for xmlElement in xmlSection:
+                        if xmlElement.tag in readers:
+                            readers[xmlElement.tag](xmlElement)
+        except(ET.ParseError, OSError):
+            return f'{ERROR}Can not process "{os.path.normpath(self.filePath)}".'
+
+        self._inherit_scene_types()
+        return 'yWriter project data read in.'
+
+    def write(self):
+        """Write instance variables to the yWriter xml file.
+
+        Return a message beginning with the ERROR constant in case of error,
+        e.g. if an existing project is to be overwritten in low memory mode.
+        Overrides the superclass method.
+        """
+        if self.is_locked():
+            return f'{ERROR}yWriter seems to be open. Please close first.'
+
+        if self.tree is None:
+            if self.lowMemory and os.path.isfile(self.filePath):
+                return f'{ERROR}Can not update "{os.path.normpath(self.filePath)}" in low memory mode.'
+
+            # There is no existing project to be updated.
+            return self._write_xml(self._stream_xml())
+
+        self._build_element_tree()
+        text = ET.tostring(self.tree.getroot(), encoding='unicode')
+        return self._write_xml((self._postprocess_xml(text),))
+
+    def is_locked(self):
+        """Check whether the yw7 file is locked by yWriter.
+
+        Check for the .lock file once per session, i.e. until the project is written.
+        Overrides the superclass method.
+        """
+        if self._locked is None:
+            self._locked = super().is_locked()
+        return self._locked
+
+    def _read_incrementally(self, f, readers):
+        """Parse the yWriter xml file, reading and discarding each element when its end arrives.
+
+        Positional arguments:
+            f -- binary file object of the yWriter xml file.
+            readers -- dict: method reading an xml element, by tag.
+
+        Raise ET.ParseError or OSError if the file cannot be parsed.
+        """
+        path = []
+        # The open elements, beginning with the root.
+        for event, xmlElement in ET.iterparse(f, events=('start', 'end')):
+            if event == 'start':
+                path.append(xmlElement)
+                continue
+
+            path.pop()
+            if len(path) > 2 or not xmlElement.tag in readers:
+                continue
+
+            readers[xmlElement.tag](xmlElement)
+            if path:
+                path[-1].remove(xmlElement)
+
+    def _read_children(self, element, xmlElement, attributes, flags):
+        """Set an element's attributes in a single pass over the children of its xml element.
+
+        Positional arguments:
+            element -- the novel element to read.
+            xmlElement -- the element's xml element.
+            attributes -- dict: (attribute, conversion) by tag, see _SCN_ATTRIBUTES.
+            flags -- tuple of (tag, attribute) tuples, see _SCN_FLAGS.
+
+        Return a tuple with two elements:
+        - children -- dict: the first child element by tag.
+        - fields -- list of dicts: the first child element by tag, for each "Fields" child.
+        """
+        children = {}
+        fields = []
+        for child in xmlElement:
+            tag = child.tag
+            if tag == 'Fields':
+                fieldChildren = {}
+                for field in child:
+                    if not field.tag in fieldChildren:
+                        fieldChildren[field.tag] = field
+                fields.append(fieldChildren)
+            if tag in children:
+                continue
+
+            children[tag] = child
+            if tag in attributes:
+                attribute, convert = attributes[tag]
+                if convert is None:
+                    setattr(element, attribute, child.text)
+                elif child.text is not None:
+                    setattr(element, attribute, convert(child.text))
+        for tag, attribute in flags:
+            setattr(element, attribute, tag in children)
+        return children, fields
+
+    def _read_custom_fields(self, kwVar, fields, kwVarFields):
+        """Get an element's custom keyword variables.
+
+        Positional arguments:
+            kwVar -- dict: the element's custom keyword variables.
+            fields -- list of dicts: the first child element by tag, for each "Fields" child.
+            kwVarFields -- tuple of the names of the element type's custom fields.
+        """
+        for fieldName in kwVarFields:
+            kwVar[fieldName] = None
+            for fieldChildren in fields:
+                if fieldName in fieldChildren:
+                    kwVar[fieldName] = fieldChildren[fieldName].text
+
+    def _read_project(self, prj):
+        """Get the attributes at novel level from the PROJECT xml element."""
+        __, fields = self._read_children(self, prj, self._PRJ_ATTRIBUTES, ())
+        self._read_custom_fields(self.kwVar, fields, self._PRJ_KWVAR)
+
+    def _read_location(self, loc):
+        """Get a location from its LOCATION xml element."""
+        location = self.WE_CLASS()
+        children, fields = self._read_children(location, loc, self._WE_ATTRIBUTES, ())
+        self._read_custom_fields(location.kwVar, fields, self._LOC_KWVAR)
+        lcId = children['ID'].text
+        self.srtLocations.append(lcId)
+        self.locations[lcId] = location
+
+    def _read_item(self, itm):
+        """Get an item from its ITEM xml element."""
+        item = self.WE_CLASS()
+        children, fields = self._read_children(item, itm, self._WE_ATTRIBUTES, ())
+        self._read_custom_fields(item.kwVar, fields, self._ITM_KWVAR)
+        itId = children['ID'].text
+        self.srtItems.append(itId)
+        self.items[itId] = item
+
+    def _read_character(self, crt):
+        """Get a character from its CHARACTER xml element."""
+        character = self.CHARACTER_CLASS()
+        children, fields = self._read_children(character, crt, self._CRT_ATTRIBUTES, self._CRT_FLAGS)
+        self._read_custom_fields(character.kwVar, fields, self._CRT_KWVAR)
+        crId = children['ID'].text
+        self.srtCharacters.append(crId)
+        self.characters[crId] = character
+
+    def _read_chapter(self, chp):
+        """Get a chapter from its CHAPTER xml element."""
+        chapter = self.CHAPTER_CLASS()
+        children, fields = self._read_children(chapter, chp, self._CHP_ATTRIBUTES, self._CHP_FLAGS)
+        chId = children['ID'].text
+        self.chapters[chId] = chapter
+        self.srtChapters.append(chId)
+        if 'SectionStart' in children:
+            chapter.chLevel = 1
+        else:
+            chapter.chLevel = 0
+        chapter.suppressChapterTitle = False
+        if chapter.title is not None:
+            if chapter.title.startswith('@'):
+                chapter.suppressChapterTitle = True
+
+        #--- Read chapter fields.
+        for fieldChildren in fields:
+            if self._get_field(fieldChildren, 'Field_SuppressChapterTitle') == '1':
+                chapter.suppressChapterTitle = True
+            chapter.isTrash = self._get_field(fieldChildren, 'Field_IsTrash') == '1'
+            chapter.suppressChapterBreak = self._get_field(fieldChildren, 'Field_SuppressChapterBreak') == '1'
+        self._read_custom_fields(chapter.kwVar, fields, self._CHP_KWVAR)
+
+        chapter.srtScenes = []
+        if 'Scenes' in children:
+            for scn in children['Scenes']:
+                if scn.tag == 'ScID':
+                    chapter.srtScenes.append(scn.text)
+
+    def _read_scene(self, scn):
+        """Get a scene from its SCENE xml element."""
+        scene = self.SCENE_CLASS()
+        children, fields = self._read_children(scene, scn, self._SCN_ATTRIBUTES, self._SCN_FLAGS)
+        scId = children['ID'].text
+        self.scenes[scId] = scene
+        if self._readSceneContent and 'SceneContent' in children:
+            sceneContent = children['SceneContent'].text
+            if sceneContent is not None:
+                # The word count and letter count are updated.
+                scene.sceneContent = sceneContent
+
+        #--- Read scene fields.
+        scene.isNotesScene = False
+        scene.isTodoScene = False
+        for fieldChildren in fields:
+            sceneType = self._get_field(fieldChildren, 'Field_SceneType')
+            if sceneType == '1':
+                scene.isNotesScene = True
+            scene.isTodoScene = sceneType == '2'
+        self._read_custom_fields(scene.kwVar, fields, self._SCN_KWVAR)
+
+        if not 'ExportCondSpecific' in children:
+            scene.doNotExport = False
+        else:
+            scene.doNotExport = not 'ExportWhenRTF' in children
+
+        if 'SpecificDateTime' in children:
+            dateTime = children['SpecificDateTime'].text.split(' ')
+            for dt in dateTime:
+                if '-' in dt:
+                    scene.date = dt
+                elif ':' in dt:
+                    scene.time = dt
+        else:
+            for tag, attribute in self._SCN_DAY_ATTRIBUTES:
+                if tag in children:
+                    setattr(scene, attribute, children[tag].text)
+
+        for tag, attribute, idTag in self._SCN_RELATIONS:
+            if tag in children:
+                setattr(scene, attribute, [elemId.text for elemId in children[tag].iter(idTag)] or None)
+
+    def _get_field(self, fieldChildren, fieldName):
+        """Return the text of a field, or None if the field is missing."""
+        field = fieldChildren.get(fieldName, None)
+        if field is None:
+            return None
+
+        return field.text
+
+    def _inherit_scene_types(self):
+        """Make sure that ToDo, Notes, and Unused type is inherited from the chapter."""
+        for chId in self.chapters:
+            if self.chapters[chId].chType == 2:
+                # Chapter is "ToDo" type.
+                for scId in self.chapters[chId].srtScenes:
+                    self.scenes[scId].isTodoScene = True
+                    self.scenes[scId].isUnused = True
+            elif self.chapters[chId].chType == 1:
+                # Chapter is "Notes" type.
+                for scId in self.chapters[chId].srtScenes:
+                    self.scenes[scId].isNotesScene = True
+                    self.scenes[scId].isUnused = True
+            elif self.chapters[chId].isUnused:
+                for scId in self.chapters[chId].srtScenes:
+                    self.scenes[scId].isUnused = True
+
+    def _postprocess_xml(self, text):
+        """Return the serialized xml tree, post-processed like a file by _postprocess_xml_file().
+
+        Positional arguments:
+            text -- str: xml tree serialized by ElementTree, without declaration.
+
+        Put a header on top, insert the missing CDATA tags,
+        and replace xml entities by plain text (unescape).
+        """
+        # Line breaks are converted as when reading a written file.
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+        text = self._cdataTags.sub(self._insert_cdata, text)
+        text = text.replace('[CDATA[ \n', '[CDATA[')
+        text = text.replace('\n]]', ']]')
+        return f'{self.XML_HEADER}{unescape(text)}'
+
+    def _insert_cdata(self, match):
+        """Return the CDATA tag matched, with the CDATA section opened or closed."""
+        if match.group(1):
+            return f']]></{match.group(2)}>'
+
+        return f'<{match.group(2)}><![CDATA['
+
+    def _stream_xml(self):
+        """Iterate over the parts of a new project's xml document.
+
+        The document is the same as written by Yw7File for a new project:
+        the parts are built like by ElementTree and post-processed like by _postprocess_xml().
+        Each location, item, character, scene, and chapter is a part of its own.
+        """
+        level = self.INDENT
+        yield f'{self.XML_HEADER}<YWRITER7>\n{level}'
+        yield self._project_xml()
+        yield f'\n{level}'
+        yield from self._section_xml('LOCATIONS', self._location_xml, self.srtLocations)
+        yield f'\n{level}'
+        yield from self._section_xml('ITEMS', self._item_xml, self.srtItems)
+        yield f'\n{level}'
+        yield from self._section_xml('CHARACTERS', self._character_xml, self.srtCharacters)
+        yield f'\n{level}'
+        chIdsByScId = {}
+        for chId in self.chapters:
+            for scId in self.chapters[chId].srtScenes:
+                chIdsByScId.setdefault(scId, chId)
+        yield from self._section_xml('SCENES', self._scene_xml, self.scenes, chIdsByScId)
+        yield f'\n{level}'
+        yield from self._section_xml('CHAPTERS', self._chapter_xml, self.srtChapters)
+        yield '\n</YWRITER7>\n'
+
+    def _section_xml(self, tag, element_xml, elemIds, *args):
+        """Iterate over the parts of a section of the root element, with a part per element.
+
+        Positional arguments:
+            tag -- str: the section's tag.
+            element_xml -- method returning an element's xml, given the element ID, sort order, and args.
+            elemIds -- iterable of the IDs of the elements in the section.
+        """
+        empty = True
+        level = self.INDENT * 2
+        for sortOrder, elemId in enumerate(elemIds, 1):
+            if empty:
+                yield f'<{tag}>'
+                empty = False
+            yield f'\n{level}{element_xml(elemId, sortOrder, *args)}'
+        if empty:
+            yield f'<{tag} />'
+        else:
+            yield f'\n{self.INDENT}</{tag}>'
+
+    def _leaf_xml(self, tag, text):
+        """Return an xml element without children, as written by Yw7File."""
+        if not text:
+            return f'<{tag} />'
+
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+        if tag in self._cdataTagSet:
+            text = f'<![CDATA[{text}]]>'
+        text = text.replace('[CDATA[ \n', '[CDATA[')
+        text = text.replace('\n]]', ']]')
+        return f'<{tag}>{text}</{tag}>'
+
+    def _parent_xml(self, tag, children, depth):
+        """Return an xml element with children, indented as written by Yw7File.
+
+        Positional arguments:
+            tag -- str: the element's tag.
+            children -- list of the children's xml.
+            depth -- int: nesting level of the element, beginning with 0 for the root.
+        """
+        if not children:
+            return f'<{tag} />'
+
+        childLevel = f'\n{self.INDENT * (depth + 1)}'
+        return f'<{tag}>{childLevel}{childLevel.join(children)}\n{self.INDENT * depth}</{tag}>'
+
+    def _fields_xml(self, children, kwVar, kwVarFields, fields, depth):
+        """Append the "Fields" element to an element's children, if there are fields to write.
+
+        Positional arguments:
+            children -- list of the element's children's xml.
+            kwVar -- dict: the element's custom keyword variables.
+            kwVarFields -- tuple of the names of the element type's custom fields.
+            fields -- list of the xml of the fields preceding the custom fields.
+            depth -- int: nesting level of the element.
+        """
+        for field in kwVarFields:
+            if kwVar.get(field, None):
+                fields.append(self._leaf_xml(field, kwVar[field]))
+        if fields:
+            children.append(self._parent_xml('Fields', fields, depth + 1))
+
+    def _project_xml(self):
+        """Return the xml of the project attributes."""
+        leaf_xml = self._leaf_xml
+        children = [leaf_xml('Ver', '7')]
+        for tag, text in (
+            ('Title', self.title),
+            ('Desc', self.desc),
+            ('AuthorName', self.authorName),
+            ('Bio', self.authorBio),
+            ('FieldTitle1', self.fieldTitle1),
+            ('FieldTitle2', self.fieldTitle2),
+            ('FieldTitle3', self.fieldTitle3),
+            ('FieldTitle4', self.fieldTitle4),
+        ):
+            if text is not None:
+                children.append(leaf_xml(tag, text))
+        self._fields_xml(children, self.kwVar, self._PRJ_KWVAR, [], 1)
+        return self._parent_xml('PROJECT', children, 1)
+
+    def _world_element_xml(self, tag, elemId, element, sortOrder, kwVarFields):
+        """Return the xml of a location or an item."""
+        leaf_xml = self._leaf_xml
+        children = [leaf_xml('ID', elemId)]
+        for childTag, text in (
+            ('Title', element.title),
+            ('ImageFile', element.image),
+            ('Desc', element.desc),
+            ('AKA', element.aka),
+        ):
+            if text is not None:
+                children.append(leaf_xml(childTag, text))
+        if element.tags is not None:
+            children.append(leaf_xml('Tags', ';'.join(element.tags)))
+        children.append(leaf_xml('SortOrder', str(sortOrder)))
+        self._fields_xml(children, element.kwVar, kwVarFields, [], 2)
+        return self._parent_xml(tag, children, 2)
+
+    def _location_xml(self, lcId, sortOrder):
+        """Return the xml of a location."""
+        return self._world_element_xml('LOCATION', lcId, self.locations[lcId], sortOrder, self._LOC_KWVAR)
+
+    def _item_xml(self, itId, sortOrder):
+        """Return the xml of an item."""
+        return self._world_element_xml('ITEM', itId, self.items[itId], sortOrder, self._ITM_KWVAR)
+
+    def _character_xml(self, crId, sortOrder):
+        """Return the xml of a character."""
+        leaf_xml = self._leaf_xml
+        character = self.characters[crId]
+        children = [leaf_xml('ID', crId)]
+        for tag, text in (
+            ('Title', character.title),
+            ('Desc', character.desc),
+            ('ImageFile', character.image),
+            ('SortOrder', str(sortOrder)),
+            ('Notes', character.notes),
+            ('AKA', character.aka),
+        ):
+            if text is not None:
+                children.append(leaf_xml(tag, text))
+        if character.tags is not None:
+            children.append(leaf_xml('Tags', ';'.join(character.tags)))
+        for tag, text in (
+            ('Bio', character.bio),
+            ('Goals', character.goals),
+            ('FullName', character.fullName),
+        ):
+            if text is not None:
+                children.append(leaf_xml(tag, text))
+        if character.isMajor:
+            children.append(leaf_xml('Major', '-1'))
+        self._fields_xml(children, character.kwVar, self._CRT_KWVAR, [], 2)
+        return self._parent_xml('CHARACTER', children, 2)
+
+    def _scene_xml(self, scId, sortOrder, chIdsByScId):
+        """Return the xml of a scene.
+
+        Positional arguments:
+            scId -- str: scene ID.
+            sortOrder -- int: not written for scenes.
+            chIdsByScId -- dict: ID of the first chapter listing the scene, by scene ID.
+        """
+        leaf_xml = self._leaf_xml
+        scene = self.scenes[scId]
+        children = [leaf_xml('ID', scId)]
+        if scene.title is not None:
+            children.append(leaf_xml('Title', scene.title))
+        if scId in chIdsByScId:
+            children.append(leaf_xml('BelongsToChID', chIdsByScId[scId]))
+        if scene.desc is not None:
+            children.append(leaf_xml('Desc', scene.desc))
+        children.append(leaf_xml('SceneContent', scene.sceneContent))
+        children.append(leaf_xml('WordCount', str(scene.wordCount)))
+        children.append(leaf_xml('LetterCount', str(scene.letterCount)))
+        if scene.isUnused:
+            children.append(leaf_xml('Unused', '-1'))
+        fields = []
+        if scene.isTodoScene:
+            fields.append(leaf_xml('Field_SceneType', '2'))
+        elif scene.isNotesScene:
+            fields.append(leaf_xml('Field_SceneType', '1'))
+        self._fields_xml(children, scene.kwVar, self._SCN_KWVAR, fields, 2)
+        if scene.status is not None:
+            children.append(leaf_xml('Status', str(scene.status)))
+        if scene.sceneNotes is not None:
+            children.append(leaf_xml('Notes', scene.sceneNotes))
+        if scene.tags is not None:
+            children.append(leaf_xml('Tags', ';'.join(scene.tags)))
+        for tag, text in (
+            ('Field1', scene.field1),
+            ('Field2', scene.field2),
+            ('Field3', scene.field3),
+            ('Field4', scene.field4),
+        ):
+            if text is not None:
+                children.append(leaf_xml(tag, text))
+        if scene.appendToPrev:
+            children.append(leaf_xml('AppendToPrev', '-1'))
+
+        # Date/time information
+        if (scene.date is not None) and (scene.time is not None):
+            children.append(leaf_xml('SpecificDateTime', f'{scene.date} {scene.time}'))
+            children.append(leaf_xml('SpecificDateMode', '-1'))
+        else:
+            for tag, text in (('Day', scene.day), ('Hour', scene.hour), ('Minute', scene.minute)):
+                if text is not None:
+                    children.append(leaf_xml(tag, text))
+        for tag, text in (
+            ('LastsDays', scene.lastsDays),
+            ('LastsHours', scene.lastsHours),
+            ('LastsMinutes', scene.lastsMinutes),
+        ):
+            if text is not None:
+                children.append(leaf_xml(tag, text))
+
+        # Plot related information
+        if scene.isReactionScene:
+            children.append(leaf_xml('ReactionScene', '-1'))
+        if scene.isSubPlot:
+            children.append(leaf_xml('SubPlot', '-1'))
+        for tag, text in (
+            ('Goal', scene.goal),
+            ('Conflict', scene.conflict),
+            ('Outcome', scene.outcome),
+            ('ImageFile', scene.image),
+        ):
+            if text is not None:
+                children.append(leaf_xml(tag, text))
+
+        # Characters/locations/items
+        for tag, childTag, elemIds in (
+            ('Characters', 'CharID', scene.characters),
+            ('Locations', 'LocID', scene.locations),
+            ('Items', 'ItemID', scene.items),
+        ):
+            if elemIds is not None:
+                children.append(self._parent_xml(tag, [leaf_xml(childTag, elemId) for elemId in elemIds], 3))
+        return self._parent_xml('SCENE', children, 2)
+
+    def _chapter_xml(self, chId, sortOrder):
+        """Return the xml of a chapter."""
+        leaf_xml = self._leaf_xml
+        chapter = self.chapters[chId]
+        children = [
+            leaf_xml('ID', chId),
+            leaf_xml('SortOrder', str(sortOrder)),
+            leaf_xml('Title', chapter.title),
+        ]
+        if chapter.desc is not None:
+            children.append(leaf_xml('Desc', chapter.desc))
+        if chapter.chLevel == 1:
+            children.append(leaf_xml('SectionStart', '-1'))
+        if chapter.oldType is not None:
+            children.append(leaf_xml('Type', str(chapter.oldType)))
+        if chapter.chType is not None:
+            children.append(leaf_xml('ChapterType', str(chapter.chType)))
+        if chapter.isUnused:
+            children.append(leaf_xml('Unused', '-1'))
+        fields = []
+        if chapter.suppressChapterTitle:
+            fields.append(leaf_xml('Field_SuppressChapterTitle', '1'))
+        if chapter.suppressChapterBreak:
+            fields.append(leaf_xml('Field_SuppressChapterBreak', '1'))
+        if chapter.isTrash:
+            fields.append(leaf_xml('Field_IsTrash', '1'))
+        self._fields_xml(children, chapter.kwVar, self._CHP_KWVAR, fields, 2)
+        if chapter.srtScenes:
+            children.append(self._parent_xml('Scenes', [leaf_xml('ScID', scId) for scId in chapter.srtScenes], 3))
+        return self._parent_xml('CHAPTER', children, 2)
+
+    def _write_xml(self, parts):
+        """Write an xml document to the .yw7 file, keeping the former file as backup.
+
+        Positional arguments:
+            parts -- iterable of str: the parts of the xml document, written one by one.
+
+        The backup is made by renaming the former file.
+        Return a message beginning with the ERROR constant in case of error,
+        otherwise a message including the I/O account of the session.
+        """
+        if os.path.isfile(self.filePath):
+            os.replace(self.filePath, f'{self.filePath}.bak')
+            self.ioAccount.add('backup', 1)
+            backedUp = True
+        else:
+            backedUp = False
+        self._locked = None
+        # The session ends.
+        try:
+            with open(self.filePath, 'w', encoding='utf-8') as f:
+                f.writelines(parts)
+                self.ioAccount.add('write', 1, 0, f.tell())
+        except:
+            if backedUp:
+                os.replace(f'{self.filePath}.bak', self.filePath)
+                self.ioAccount.add('backup', 1)
+            return f'{ERROR}Cannot write "{os.path.normpath(self.filePath)}".'
+
+        return f'"{os.path.normpath(self.filePath)}" written. {self.ioAccount.report()}'
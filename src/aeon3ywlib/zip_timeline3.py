@@ -0,0 +1,120 @@
+"""Provide a class for zipped Aeon Timeline 3 project representation.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/aeon3yw
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+import os
+import zipfile
+from pywriter.pywriter_globals import ERROR
+from aeon3ywlib.json_timeline3 import JsonTimeline3
+from aeon3ywlib.aeon3_fop import locate_json
+
+
+class ZipTimeline3(JsonTimeline3):
+    """File representation of a zipped Aeon Timeline 3 project.
+
+    Represents the .aeonzip file format.
+    The project is read directly from the archive; nothing is extracted to disk.
+    """
+    EXTENSION = '.aeonzip'
+    DESCRIPTION = 'Zipped Aeon Timeline 3 project'
+    SUFFIX = ''
+
+    PROJECT_EXTENSIONS = ('.aeon', '.json')
+    # Archive members with these extensions are considered as project.
+
+    def read(self):
+        """Parse the archived project and get the instance variables.
+
+        Return a message beginning with the ERROR constant in case of error.
+        Extends the superclass method.
+        """
+        try:
+            return super().read()
+
+        except(zipfile.BadZipFile):
+            # Raised by the streaming reader in case of a CRC error.
+            return f'{ERROR}Cannot read "{os.path.normpath(self.filePath)}".'
+
+    def _open_archive(self):
+        """Open the archive and determine the project member.
+
+        Return a tuple with three elements:
+        - A message beginning with the ERROR constant in case of error
+        - archive: zipfile.ZipFile instance, or None in case of error
+        - memberName: str: name of the project member, or None in case of error
+        """
+        try:
+            archive = zipfile.ZipFile(self.filePath)
+        except(FileNotFoundError):
+            return f'{ERROR}"{os.path.normpath(self.filePath)}" not found.', None, None
+
+        except(zipfile.BadZipFile, OSError):
+            return f'{ERROR}Cannot read "{os.path.normpath(self.filePath)}".', None, None
+
+        for memberName in archive.namelist():
+            if memberName.lower().endswith(self.PROJECT_EXTENSIONS):
+                return 'Archive opened.', archive, memberName
+
+        archive.close()
+        return f'{ERROR}No Aeon Timeline 3 project found in "{os.path.normpath(self.filePath)}".', None, None
+
+    def _get_project_size(self):
+        """Return the uncompressed size of the archived project in bytes.
+
+        Return 0 if the archive cannot be read, so the error is reported by the reader.
+        Overrides the superclass method.
+        """
+        message, archive, memberName = self._open_archive()
+        if message.startswith(ERROR):
+            return 0
+
+        with archive:
+            return archive.getinfo(memberName).file_size
+
+    def _read_json(self):
+        """Read the archived project and decode its JSON part.
+
+        Return a tuple with two elements:
+        - A message beginning with the ERROR constant in case of error
+        - jsonData: the decoded JSON object, or None in case of error
+        Overrides the superclass method.
+        """
+        message, archive, memberName = self._open_archive()
+        if message.startswith(ERROR):
+            return message, None
+
+        try:
+            with archive:
+                jsonData, __ = locate_json(archive.read(memberName))
+        except(UnicodeError):
+            return f'{ERROR}Cannot decode "{os.path.normpath(self.filePath)}".', None
+
+        except(ValueError):
+            return f'{ERROR}Corrupted data.', None
+
+        except(zipfile.BadZipFile, OSError):
+            return f'{ERROR}Cannot read "{os.path.normpath(self.filePath)}".', None
+
+        return 'JSON part found.', jsonData
+
+    def _open_stream(self):
+        """Open the archived project for streaming.
+
+        Return a tuple with two elements:
+        - A message beginning with the ERROR constant in case of error
+        - stream: binary file object decompressing the project member, or None in case of error
+        Overrides the superclass method.
+        """
+        message, archive, memberName = self._open_archive()
+        if message.startswith(ERROR):
+            return message, None
+
+        # The member stream keeps the archive file open until it is closed.
+        with archive:
+            try:
+                return 'Project opened.', archive.open(memberName)
+
+            except(zipfile.BadZipFile, OSError):
+                return f'{ERROR}Cannot read "{os.path.normpath(self.filePath)}".', None
@@ -8,10 +8,12 @@ import unittest
 import os
 import json
 import stat
+import tracemalloc
 from shutil import copyfile
 
 from pywriter.pywriter_globals import ERROR
 from aeon3ywlib.aeon3_fop import scan_file
+from aeon3ywlib.aeon3_fop import locate_json
 
 TEST_DATA_REF = 'data/fop/normal.aeon'
 TEST_JSON_REF = 'data/fop/normal.json'
@@ -59,6 +61,47 @@ class NormalOperation(unittest.TestCase):
         self.assertEqual(result, read_file(TEST_JSON_REF))
 
 
+class BracesInStrings(unittest.TestCase):
+    """Operation under normal condition, i.e.:
+    * JSON strings contain curly brackets 
+    * The JSON part is followed by binary data
+    """
+    JSON_PART = '{"label":"}{ {","summary":"\\"}","data":{"items":["{"]}}'
+
+    def setUp(self):
+        """Create an example project file with a binary header and trailer.
+        """
+        with open(TEST_DATA, 'wb') as f:
+            f.write(b'\x02\x00(\x00HDJDJZWQ')
+            f.write(self.JSON_PART.encode('utf-8'))
+            f.write(b'\x00\xff\xfe}}\x00')
+
+    def tearDown(self):
+
+        try:
+            os.remove(TEST_DATA)
+        except:
+            pass
+
+    def test_scan(self):
+        result = scan_file(TEST_DATA)
+        self.assertEqual(result, self.JSON_PART)
+        self.assertEqual(json.loads(result)['label'], '}{ {')
+
+    def test_binary_tail(self):
+        # Only a bounded span of a large binary trailer is decoded.
+        buffer = b'\x02\x00' + self.JSON_PART.encode('utf-8') + b'\xff\x00' * 10000000
+        tracemalloc.start()
+        try:
+            jsonData, jsonStr = locate_json(buffer)
+            __, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        self.assertEqual(jsonStr, self.JSON_PART)
+        self.assertEqual(jsonData['label'], '}{ {')
+        self.assertLess(peak, 10000000)
+
+
 class CorruptedData(unittest.TestCase):
     """Operation under error condition, i.e.:
     * Test data is corrupted 
@@ -5,7 +5,10 @@ For further information see https://github.com/peter88213/aeon3yw
 Published under the MIT License (https://opensource.org/licenses/mit-license.php)
 """
 from shutil import copyfile
+from shutil import rmtree
 import os
+import csv
+import zipfile
 import unittest
 import aeon3yw_
 
@@ -23,11 +26,21 @@ NORMAL_YW7 = TEST_DATA_PATH + 'normal.yw7'
 NORMAL_CSV = TEST_DATA_PATH + 'normal.csv'
 DATE_LIMITS_YW7 = TEST_DATA_PATH + 'date_limits.yw7'
 DATE_LIMITS_CSV = TEST_DATA_PATH + 'date_limits.csv'
+NORMAL_AEON = TEST_DATA_PATH + 'normal.aeon'
+NORMAL_AEON_YW7 = TEST_DATA_PATH + 'normal_aeon.yw7'
+DATE_LIMITS_AEON = TEST_DATA_PATH + 'date_limits.aeon'
+DATE_LIMITS_AEON_YW7 = TEST_DATA_PATH + 'date_limits_aeon.yw7'
 
 # Test data
 INI_FILE = TEST_EXEC_PATH + 'aeon3yw.ini'
 TEST_YW7 = TEST_EXEC_PATH + 'yw7 Sample Project.yw7'
 TEST_CSV = TEST_EXEC_PATH + 'yw7 Sample Project.csv'
+TEST_AEON = TEST_EXEC_PATH + 'yw7 Sample Project.aeon'
+TEST_AEONZIP = TEST_EXEC_PATH + 'yw7 Sample Project.aeonzip'
+TEST_CSV_DIR = TEST_EXEC_PATH + 'yw7 Sample Project/'
+TEST_CSV_DIR_YW7 = TEST_CSV_DIR + 'yw7 Sample Project.yw7'
+TEST_BRACKETS_AEON = TEST_EXEC_PATH + 'My [draft].aeon'
+TEST_BRACKETS_YW7 = TEST_EXEC_PATH + 'My [draft].yw7'
 
 
 def read_file(inputFile):
@@ -40,6 +53,19 @@ def read_file(inputFile):
             return f.read()
 
 
+def split_csv(sourceFile, targetDir):
+    """Split a csv file into two files with different column order."""
+    with open(sourceFile, newline='', encoding='utf-8') as f:
+        rows = [row for row in csv.reader(f) if row]
+    header = rows[0]
+    with open(f'{targetDir}part1.csv', 'w', newline='', encoding='utf-8') as f:
+        csv.writer(f).writerows(rows[:150])
+    columns = list(range(len(header)))
+    columns.reverse()
+    with open(f'{targetDir}part2.csv', 'w', newline='', encoding='utf-8') as f:
+        csv.writer(f).writerows([[row[i] for i in columns] for row in [header] + rows[150:]])
+
+
 def remove_all_testfiles():
 
     try:
@@ -53,11 +79,32 @@ def remove_all_testfiles():
     except:
         pass
 
+    try:
+        os.remove(TEST_AEON)
+    except:
+        pass
+
+    try:
+        os.remove(TEST_AEONZIP)
+    except:
+        pass
+
     try:
         os.remove(INI_FILE)
     except:
         pass
 
+    try:
+        rmtree(TEST_CSV_DIR)
+    except:
+        pass
+
+    for filePath in (TEST_BRACKETS_AEON, TEST_BRACKETS_YW7):
+        try:
+            os.remove(filePath)
+        except:
+            pass
+
 
 class NormalOperation(unittest.TestCase):
     """Test case: Normal operation."""
@@ -84,6 +131,48 @@ class NormalOperation(unittest.TestCase):
         aeon3yw_.run(TEST_CSV, silentMode=True)
         self.assertEqual(read_file(TEST_YW7), read_file(DATE_LIMITS_YW7))
 
+    def test_aeon3_json(self):
+        copyfile(NORMAL_AEON, TEST_AEON)
+        os.chdir(TEST_EXEC_PATH)
+        aeon3yw_.run(TEST_AEON, silentMode=True)
+        self.assertEqual(read_file(TEST_YW7), read_file(NORMAL_AEON_YW7))
+
+    def test_date_limits_json(self):
+        copyfile(DATE_LIMITS_AEON, TEST_AEON)
+        os.chdir(TEST_EXEC_PATH)
+        aeon3yw_.run(TEST_AEON, silentMode=True)
+        self.assertEqual(read_file(TEST_YW7), read_file(DATE_LIMITS_AEON_YW7))
+
+    def test_aeon3_zip(self):
+        with zipfile.ZipFile(TEST_AEONZIP, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+            archive.write(NORMAL_AEON, 'normal.aeon')
+        os.chdir(TEST_EXEC_PATH)
+        aeon3yw_.run(TEST_AEONZIP, silentMode=True)
+        self.assertEqual(read_file(TEST_YW7), read_file(NORMAL_AEON_YW7))
+
+    def test_csv_files(self):
+        os.mkdir(TEST_CSV_DIR)
+        split_csv(NORMAL_CSV, TEST_CSV_DIR)
+        os.chdir(TEST_EXEC_PATH)
+        aeon3yw_.run(TEST_CSV_DIR, silentMode=True)
+        self.assertEqual(read_file(TEST_CSV_DIR_YW7), read_file(NORMAL_YW7))
+        os.remove(TEST_CSV_DIR_YW7)
+        aeon3yw_.run(f'{TEST_CSV_DIR}part*.csv', silentMode=True)
+        self.assertEqual(read_file(TEST_CSV_DIR_YW7), read_file(NORMAL_YW7))
+
+        # A combined csv file written before is not read again.
+        os.remove(TEST_CSV_DIR_YW7)
+        copyfile(NORMAL_CSV, f'{TEST_CSV_DIR}combined.csv')
+        aeon3yw_.run(TEST_CSV_DIR, silentMode=True)
+        self.assertEqual(read_file(TEST_CSV_DIR_YW7), read_file(NORMAL_YW7))
+
+    def test_glob_characters_in_file_name(self):
+        # An existing file is converted, even if its name looks like a glob pattern.
+        copyfile(NORMAL_AEON, TEST_BRACKETS_AEON)
+        os.chdir(TEST_EXEC_PATH)
+        aeon3yw_.run(TEST_BRACKETS_AEON, silentMode=True)
+        self.assertEqual(read_file(TEST_BRACKETS_YW7), read_file(NORMAL_AEON_YW7))
+
     def tearDown(self):
         remove_all_testfiles()
 
@@ -0,0 +1,250 @@
+"""Unit tests for csv_timeline3
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/aeon3yw
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+import os
+import csv
+import time
+import tracemalloc
+import unittest
+from shutil import copyfile
+from aeon3ywlib.csv_timeline3 import CsvTimeline3
+from aeon3ywlib.csv_chunks import find_record_offsets
+from aeon3ywlib.csv_combiner import CsvCombiner
+from aeon3yw_ import SETTINGS
+from pywriter.pywriter_globals import ERROR
+from test_json_timeline import novel_data
+
+TEST_PATH = os.getcwd() + '/../test'
+TEST_DATA_PATH = TEST_PATH + '/data/'
+TEST_EXEC_PATH = TEST_PATH + '/yw7/'
+
+NORMAL_CSV = TEST_DATA_PATH + 'normal.csv'
+
+TEST_CSV = TEST_EXEC_PATH + 'project.csv'
+TEST_CSV_PARTS = [TEST_EXEC_PATH + 'part1.csv', TEST_EXEC_PATH + 'part2.csv']
+
+HEADER = ['Type', 'Label', 'Summary', 'Narrative Position', 'Start Date', 'End Date', 'Tags', 'Participant',
+          'Location', 'Viewpoint']
+
+
+def make_csv(filePath, positions, otherEvents=0, summary='Summary {}'):
+    """Write a synthetic Aeon 3 csv export.
+
+    Positional arguments:
+        filePath -- str: path to the csv file.
+        positions -- list of narrative positions, e.g. "Chapter 1", or "Scene 1.2".
+
+    Optional arguments:
+        otherEvents -- int: number of events not assigned to the narrative.
+        summary -- str: format string for the event summaries, with the event number as argument.
+
+    There are ten characters and ten locations.
+    Each event has two participants, with the second one as viewpoint character, and a location.
+    """
+    with open(filePath, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(HEADER)
+        for i in range(10):
+            writer.writerow(['Character', f'Character {i}', f'Bio {i}', '', '', '', '', '', '', ''])
+            writer.writerow(['Location', f'Location {i}', f'Place {i}', '', '', '', '', '', '', ''])
+        for i, position in enumerate(positions + [''] * otherEvents):
+            if position.startswith('Scene') or not position:
+                writer.writerow(['Event', f'Event {i}', summary.format(i), position,
+                                 f'1933-02-{i % 28 + 1:02} 01:17:00', f'1933-02-{i % 28 + 1:02} 02:25:00', 'Tag',
+                                 f'Character {i % 10},Character {(i + 1) % 10}', f'Location {i % 10}',
+                                 f'Character {(i + 1) % 10}'])
+            else:
+                writer.writerow(['Narrative Folder', f'Folder {i}', '', position, '', '', '', '', '', ''])
+
+
+def make_positions(chapters, scenesPerChapter):
+    """Return narrative positions of chapters and scenes, in reverse order."""
+    positions = []
+    for chapter in range(1, chapters + 1):
+        positions.append(f'Chapter {chapter}')
+        for scene in range(1, scenesPerChapter + 1):
+            positions.append(f'Scene {chapter}.{scene}')
+    positions.reverse()
+    return positions
+
+
+class NormalOperation(unittest.TestCase):
+    """Operation under normal condition, i.e.:
+    * Test data is present and readable
+    * test data integrity is o.k.
+    """
+
+    def tearDown(self):
+        for filePath in [TEST_CSV] + TEST_CSV_PARTS:
+            try:
+                os.remove(filePath)
+            except:
+                pass
+
+    def read_timeline(self, **kwargs):
+        timeline = CsvTimeline3(TEST_CSV, **SETTINGS, **kwargs)
+        self.assertTrue(timeline.read().startswith('Timeline data converted to novel structure.'))
+        return timeline
+
+    def get_structure(self, timeline):
+        """Return a list of (chapter title, list of scene titles) tuples in narrative order."""
+        structure = []
+        for chId in timeline.srtChapters:
+            chapter = timeline.chapters[chId]
+            structure.append((chapter.title, [timeline.scenes[scId].title for scId in chapter.srtScenes]))
+        return structure
+
+    def test_narrative_positions(self):
+        # Numbers are compared as integers, without digit limit.
+        make_csv(TEST_CSV, ['Scene 10000.1', 'Scene 1000.1', 'Scene 9999.10', 'Scene 9999.2', 'Part 2',
+                            'Chapter 10000', 'Chapter 1000', 'Chapter 2.1', 'Scene 2.1.1', 'Chapter 9999'],
+                 otherEvents=1)
+        timeline = self.read_timeline()
+        self.assertEqual(self.get_structure(timeline), [
+            ('Part 1', []),
+            ('Chapter 1', ['Event 8']),
+            ('Chapter 2', ['Event 1']),
+            ('Chapter 3', ['Event 3', 'Event 2']),
+            ('Chapter 4', ['Event 0']),
+            ('Other events', ['Event 10']),
+        ])
+
+    def test_columns(self):
+        make_csv(TEST_CSV, ['Chapter 1', 'Scene 1.1'])
+        timeline = CsvTimeline3(TEST_CSV, **SETTINGS)
+        self.assertEqual(timeline.read(), 'Timeline data converted to novel structure. Columns not found: '
+                         '"Notes" (notes_label), "Item" (item_label), '
+                         '"Characteristics" (character_desc_label1), "Traits" (character_desc_label2), '
+                         '"Nickname" (character_aka_label).')
+        self.assertEqual(timeline.characters['1'].bio, 'Bio 0')
+        self.assertEqual(timeline.locations['1'].desc, 'Place 0')
+        self.assertEqual(timeline.scenes['1'].desc, 'Summary 1')
+        self.assertEqual(timeline.scenes['1'].characters, ['3', '2'])
+        self.assertEqual(timeline.scenes['1'].locations, ['2'])
+
+        # Missing required columns are reported before reading the rows.
+        settings = dict(SETTINGS)
+        settings['scene_title_label'] = 'Title'
+        timeline = CsvTimeline3(TEST_CSV, **settings)
+        self.assertEqual(timeline.read(), f'{ERROR}Label "Title" is missing.')
+        with open(TEST_CSV, 'w', encoding='utf-8') as f:
+            f.write('Label,Narrative Position,End Date\nEvent,"unterminated\n')
+        timeline = CsvTimeline3(TEST_CSV, **settings)
+        self.assertEqual(timeline.read(), f'{ERROR}Labels "Type", "Start Date", "Title" are missing.')
+
+    def test_streaming(self):
+        copyfile(NORMAL_CSV, TEST_CSV)
+        self.assertEqual(novel_data(self.read_timeline(streaming=True)), novel_data(self.read_timeline(streaming=False)))
+        make_csv(TEST_CSV, make_positions(10, 10), otherEvents=10)
+        self.assertEqual(novel_data(self.read_timeline(streaming=True)), novel_data(self.read_timeline(streaming=False)))
+
+    def test_parallel(self):
+        # Quoted fields may contain line breaks, quotes, and delimiters.
+        make_csv(TEST_CSV, make_positions(20, 20), otherEvents=10, summary='"Summary" {}\n\n, \r\n"')
+        with open(TEST_CSV, 'rb') as f:
+            data = f.read()
+        records = list(csv.reader(data.decode('utf-8').splitlines(True)))
+        offsets = find_record_offsets(TEST_CSV, 50)
+        self.assertEqual(offsets[0], 0)
+        self.assertEqual(offsets[-1], len(data))
+        self.assertGreater(len(offsets), 40)
+        chunkRecords = []
+        for start, end in zip(offsets, offsets[1:]):
+            chunkRecords.extend(csv.reader(data[start:end].decode('utf-8').splitlines(True)))
+        self.assertEqual(chunkRecords, records)
+
+        serial = CsvTimeline3(TEST_CSV, **SETTINGS)
+        message = serial.read()
+        for processes in (1, 2, 3):
+            timeline = CsvTimeline3(TEST_CSV, **SETTINGS, processes=processes)
+            timeline.CHUNK_SIZE = 1000
+            self.assertEqual(timeline.read(), message)
+            self.assertEqual(novel_data(timeline), novel_data(serial))
+        self.assertEqual(serial.scenes['1'].desc, '"Summary" 0\n\n, \r\n"')
+
+        copyfile(NORMAL_CSV, TEST_CSV)
+        self.assertEqual(novel_data(self.read_timeline(processes=2)), novel_data(self.read_timeline()))
+
+        # Errors are reported as with serial parsing.
+        make_csv(TEST_CSV, ['Scene 1.1', 'Chapter 1'])
+        with open(TEST_CSV, 'a', encoding='utf-8') as f:
+            f.write('Event,Event 3,,,1900-13-01,,,,,\n')
+        timeline = CsvTimeline3(TEST_CSV, **SETTINGS, processes=2)
+        timeline.CHUNK_SIZE = 100
+        self.assertEqual(timeline.read(), f'{ERROR}Wrong date/time format.')
+
+    def test_csv_files(self):
+        # Both parts contain all characters and locations, and half of the events.
+        make_csv(TEST_CSV, make_positions(10, 10), otherEvents=10)
+        with open(TEST_CSV, newline='', encoding='utf-8') as f:
+            rows = list(csv.reader(f))
+        elements = rows[:21]
+        events = rows[21:]
+        for filePath, eventRows in zip(TEST_CSV_PARTS, (events[:50], events[50:])):
+            with open(filePath, 'w', newline='', encoding='utf-8') as f:
+                csv.writer(f).writerows(elements + eventRows)
+        expected = novel_data(self.read_timeline())
+        for streaming in (False, True):
+            timeline = self.read_timeline(csv_files=TEST_CSV_PARTS, deduplicate=True, streaming=streaming)
+            self.assertEqual(novel_data(timeline), expected)
+        timeline = self.read_timeline(csv_files=TEST_CSV_PARTS)
+        self.assertEqual(len(timeline.characters), 20)
+
+        # Rows are de-duplicated within a single file, too.
+        with open(TEST_CSV, 'w', newline='', encoding='utf-8') as f:
+            csv.writer(f).writerows(rows[:21] + rows[1:])
+        for processes in (None, 2):
+            timeline = self.read_timeline(deduplicate=True, processes=processes)
+            self.assertEqual(novel_data(timeline), expected)
+
+        # The header is the union of the files' headers.
+        with open(TEST_CSV_PARTS[1], 'w', newline='', encoding='utf-8') as f:
+            csv.writer(f).writerows([['Notes', 'Label', 'Type', 'Label'], ['Note', 'Event 1', 'Event', 'Other'],
+                                     ['Note', 'Event X', 'Event']])
+        combiner = CsvCombiner(TEST_CSV_PARTS, ('Label', 'Type'))
+        combinedRows = list(combiner.iter_rows())
+        self.assertEqual(combinedRows[0], HEADER + ['Notes'])
+        self.assertEqual(combinedRows[-1], ['Event', 'Event X', '', '', '', '', '', '', '', '', 'Note'])
+        self.assertEqual(len(combinedRows), 1 + 20 + 50 + 1)
+        self.assertEqual(combiner.duplicates, 1)
+        combiner.write(TEST_CSV)
+        with open(TEST_CSV, newline='', encoding='utf-8') as f:
+            self.assertEqual(list(csv.reader(f)), combinedRows)
+
+    def test_streaming_memory(self):
+        # Apart from the novel, the memory held while reading does not grow with the number of rows.
+        make_csv(TEST_CSV, make_positions(200, 50))
+        overhead = {}
+        for streaming in (False, True):
+            tracemalloc.start()
+            timeline = self.read_timeline(streaming=streaming)
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            self.assertEqual(len(timeline.scenes), 10000)
+            overhead[streaming] = peak - current
+        self.assertLess(overhead[True], overhead[False] / 4)
+
+    def test_scaling(self):
+        # Assigning scenes to chapters takes linear time.
+        seconds = []
+        for chapters in (125, 1000):
+            make_csv(TEST_CSV, make_positions(chapters, 20))
+            start = time.perf_counter()
+            timeline = self.read_timeline()
+            seconds.append(time.perf_counter() - start)
+            self.assertEqual(len(timeline.srtChapters), chapters + 1)
+            self.assertEqual(timeline.chapters[timeline.srtChapters[-2]].srtScenes, [str(i) for i in range(20, 0, -1)])
+
+        # Eight times the size would take 64 times as long with quadratic growth.
+        self.assertLess(seconds[1], seconds[0] * 20)
+
+
+def main():
+    unittest.main()
+
+
+if __name__ == '__main__':
+    main()
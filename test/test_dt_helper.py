@@ -5,8 +5,15 @@ Copyright (c) 2021 Peter Triesberger
 Published under the MIT License (https://opensource.org/licenses/mit-license.php)
 """
 import unittest
+from datetime import datetime
 
 from aeon3ywlib.dt_helper import fix_iso_dt
+from aeon3ywlib.dt_helper import normalize_iso_dates
+from aeon3ywlib import dt_helper
+from aeon3ywlib.dt_helper import convert_aeon_dates
+from aeon3ywlib.dt_helper import civil_from_days
+from aeon3ywlib.dt_helper import days_from_civil
+from aeon3ywlib.dt_helper import np
 
 TEST_DT = [
     ['BC 333-04-05', None],
@@ -20,6 +27,32 @@ TEST_DT = [
 ]
 
 
+def aeon_timestamp(*args):
+    return int((datetime(*args) - datetime.min).total_seconds())
+
+
+def aeon_duration(years=0, months=0, weeks=0, days=0, hours=0, minutes=0, seconds=0):
+    return dict(years=years, months=months, weeks=weeks, days=days, hours=hours, minutes=minutes, seconds=seconds)
+
+
+TEST_EVENTS = [
+    [aeon_timestamp(1910, 4, 5, 21, 23), aeon_duration(), ('1910-04-05', '21:23:00', '0', '0', '0')],
+    [aeon_timestamp(100, 1, 1), aeon_duration(hours=25, minutes=61, seconds=59), ('0100-01-01', '00:00:00', '1', '2', '1')],
+    [aeon_timestamp(1, 1, 1), aeon_duration(weeks=2, days=1), ('0001-01-01', '00:00:00', '15', '0', '0')],
+    [aeon_timestamp(9999, 12, 31, 23, 59, 59), aeon_duration(), ('9999-12-31', '23:59:59', '0', '0', '0')],
+    [aeon_timestamp(2023, 1, 15), aeon_duration(years=1, months=2), ('2023-01-15', '00:00:00', '425', '0', '0')],
+    [aeon_timestamp(2023, 11, 15), aeon_duration(months=3), ('2023-11-15', '00:00:00', '92', '0', '0')],
+    [aeon_timestamp(2023, 1, 15), aeon_duration(years=1, months=-1), ('2023-01-15', '00:00:00', '365', '0', '0')],
+    [aeon_timestamp(2023, 1, 15), aeon_duration(years=-1, days=1), ('2023-01-15', '00:00:00', '1', '0', '0')],
+    [aeon_timestamp(2023, 1, 31), aeon_duration(months=1), ('2023-01-31', '00:00:00', '28', '0', '0')],
+    [aeon_timestamp(2024, 2, 29), aeon_duration(years=1), ('2024-02-29', '00:00:00', '365', '0', '0')],
+    [-1, aeon_duration(), ('0000-12-31', '23:59:59', '0', '0', '0')],
+    [-86400 * 366, aeon_duration(months=2), ('0000-01-01', '00:00:00', '60', '0', '0')],
+    [-86400 * (366 + 365), aeon_duration(years=1), ('-0001-01-01', '00:00:00', '365', '0', '0')],
+    [-86400 * (366 + 3 * 365 + 307), aeon_duration(years=4), ('-0004-02-29', '00:00:00', '1461', '0', '0')],
+]
+
+
 class NormalOperation(unittest.TestCase):
     """Operation under normal condition, i.e.:
     * Test data is present and readable 
@@ -30,3 +63,62 @@ class NormalOperation(unittest.TestCase):
 
         for dt in TEST_DT:
             self.assertEqual(fix_iso_dt(dt[0]), dt[1])
+
+    def test_normalize(self):
+        dateTimeStrs = [dt[0] for dt in TEST_DT]
+        results = []
+        for dt in TEST_DT:
+            if dt[1] is None:
+                results.append(None)
+            else:
+                results.append((dt[1], int((datetime.fromisoformat(dt[1]) - datetime.min).total_seconds())))
+        self.assertEqual(normalize_iso_dates(dateTimeStrs, useNumpy=False), results)
+        memo = {}
+        self.assertEqual(normalize_iso_dates(dateTimeStrs, memo), results)
+        self.assertEqual(normalize_iso_dates(dateTimeStrs, memo), results)
+        self.assertRaises(ValueError, normalize_iso_dates, ['1910-13-01'], useNumpy=False)
+
+    def test_normalize_memo(self):
+        memoSize = dt_helper.DATE_MEMO_SIZE
+        dt_helper.DATE_MEMO_SIZE = 10
+        try:
+            memo = {}
+            dateTimeStrs = [f'1910-04-{day:02}' for day in range(1, 31)]
+            normalize_iso_dates(dateTimeStrs, memo)
+            self.assertEqual(list(memo), dateTimeStrs[-10:])
+        finally:
+            dt_helper.DATE_MEMO_SIZE = memoSize
+
+    @unittest.skipIf(np is None, 'NumPy is not installed')
+    def test_normalize_numpy(self):
+        dateTimeStrs = [dt[0] for dt in TEST_DT]
+        self.assertEqual(normalize_iso_dates(dateTimeStrs, useNumpy=True),
+                         normalize_iso_dates(dateTimeStrs, useNumpy=False))
+        dateTimeStrs = [f'{year}-{month:02}-{day:02} 0{hour}:59:01'
+                        for year in range(100, 9999, 97) for month in (1, 2, 12) for day in (1, 28) for hour in (0, 9)]
+        self.assertEqual(normalize_iso_dates(dateTimeStrs, useNumpy=True),
+                         normalize_iso_dates(dateTimeStrs, useNumpy=False))
+        self.assertRaises(ValueError, normalize_iso_dates, ['1910-13-01'], useNumpy=True)
+
+    def test_civil_days(self):
+        for dayNumber in range(-800000, 800000, 97):
+            self.assertEqual(days_from_civil(*civil_from_days(dayNumber)), dayNumber)
+        self.assertEqual(civil_from_days(days_from_civil(2000, 2, 29) + 1), (2000, 3, 1))
+        self.assertEqual(civil_from_days(days_from_civil(1900, 2, 28) + 1), (1900, 3, 1))
+
+    def test_convert_aeon_dates(self):
+        timestamps = [event[0] for event in TEST_EVENTS]
+        durations = [event[1] for event in TEST_EVENTS]
+        results = [event[2] for event in TEST_EVENTS]
+        self.assertEqual(convert_aeon_dates(timestamps, durations, useNumpy=False), results)
+
+    @unittest.skipIf(np is None, 'NumPy is not installed')
+    def test_convert_aeon_dates_numpy(self):
+        timestamps = [event[0] for event in TEST_EVENTS]
+        durations = [event[1] for event in TEST_EVENTS]
+        results = [event[2] for event in TEST_EVENTS]
+        self.assertEqual(convert_aeon_dates(timestamps, durations, useNumpy=True), results)
+        timestamps = list(range(-10 ** 12, 10 ** 12, 10 ** 8 + 7))
+        durations = [aeon_duration(years=i % 3, months=i % 13, days=i % 5) for i in range(len(timestamps))]
+        self.assertEqual(convert_aeon_dates(timestamps, durations, useNumpy=True),
+                         convert_aeon_dates(timestamps, durations, useNumpy=False))
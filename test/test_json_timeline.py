@@ -1,11 +1,22 @@
-"""Unit tests for json_timeline2/3
+"""Unit tests for json_timeline3
 Part of the paeon project (https://github.com/peter88213/paeon)
 Copyright (c) 2021 Peter Triesberger
 Published under the MIT License (https://opensource.org/licenses/mit-license.php)
 """
 import os
+import json
 import unittest
+import tracemalloc
+import zipfile
+import copy
 from aeon3ywlib.json_timeline3 import JsonTimeline3
+from aeon3ywlib.zip_timeline3 import ZipTimeline3
+from aeon3ywlib.json_stream import JsonStream
+from aeon3ywlib.aeon3_fop import read_json
+from aeon3ywlib.label_schema import get_schema
+from pywriter.yw.yw7_file import Yw7File
+from aeon3yw_ import SETTINGS
+from pywriter.pywriter_globals import ERROR
 from shutil import copyfile
 
 TEST_PATH = os.getcwd() + '/../test'
@@ -13,9 +24,12 @@ TEST_DATA_PATH = TEST_PATH + '/data/'
 TEST_EXEC_PATH = TEST_PATH + '/yw7/'
 
 AEON3 = TEST_DATA_PATH + 'normal.aeon'
-REF_JSON3 = TEST_DATA_PATH + 'extract_json/normal.aeon.json'
+DATE_LIMITS_AEON3 = TEST_DATA_PATH + 'date_limits.aeon'
+AEON2_ZIP = TEST_DATA_PATH + 'date_limits.aeonzip'
 TEST_AEON3 = TEST_EXEC_PATH + 'project.aeon'
 TEST_JSON3 = TEST_EXEC_PATH + 'project.aeon.json'
+TEST_AEONZIP = TEST_EXEC_PATH + 'project.aeonzip'
+TEST_YW7 = TEST_EXEC_PATH + 'project.yw7'
 
 
 def read_file(inputFile):
@@ -28,9 +42,105 @@ def read_file(inputFile):
             return f.read()
 
 
+def novel_data(novel):
+    """Return the instance variables of a Novel instance and its elements as a dictionary."""
+    data = {}
+    for attr in ('srtChapters', 'srtCharacters', 'srtLocations', 'srtItems'):
+        data[attr] = getattr(novel, attr)
+    for attr in ('chapters', 'scenes', 'characters', 'locations', 'items'):
+        elements = getattr(novel, attr)
+        data[attr] = {elemId: vars(elements[elemId]) for elemId in elements}
+    return data
+
+
+def make_timeline(filePath, events, payload=0, narrative=None):
+    """Write a synthetic Aeon 3 project file.
+
+    Positional arguments:
+        filePath -- str: path to the project file.
+        events -- int: number of events.
+
+    Optional arguments:
+        payload -- int: number of strings not relevant for conversion, added to each event.
+        narrative -- list of the top-level narrative nodes: a folder is a list of nodes, an event is its number.
+
+    By default, there are two chapters with a third of the events each,
+    a character per ten events, and a location and an item per twenty events.
+    Each event has a participant, given twice, a location, and an item.
+    Every other event has the participant's successor as viewpoint character.
+    """
+    types = {
+        'evt': {'label': 'Event', 'isNarrativeFolder': False},
+        'chr': {'label': 'Character', 'isNarrativeFolder': False},
+        'loc': {'label': 'Location', 'isNarrativeFolder': False},
+        'itm': {'label': 'Item', 'isNarrativeFolder': False},
+        'fld': {'label': 'Narrative Folder', 'isNarrativeFolder': True},
+    }
+    properties = {'notesProp': {'label': 'Notes'}, 'vpProp': {'label': 'Viewpoint'}}
+    references = {'partRef': {'label': 'Participant'}, 'locRef': {'label': 'Location'}, 'itmRef': {'label': 'Item'}}
+    items = {}
+    relationships = {}
+    timestamp = 60971188620
+    for i in range(events // 10 + 1):
+        items[f'chr{i}'] = dict(type='chr', label=f'Character {i}', shortLabel=None, summary='',
+                                tags=['tag1'], propertyValues={})
+    for i in range(events // 20 + 1):
+        items[f'loc{i}'] = dict(type='loc', label=f'Location {i}', summary='', tags=[], propertyValues={})
+        items[f'itm{i}'] = dict(type='itm', label=f'Item {i}', summary='', tags=[], propertyValues={})
+    for i in range(events):
+        items[f'evt{i}'] = dict(
+            type='evt', label=f'Event {i}', summary=f'Summary of event {i}', tags=['tag0'],
+            propertyValues={'notesProp': f'Notes on event {i}', 'vpProp': f'chr{i // 10 + i % 2}'},
+            startDate=dict(timestamp=timestamp + i * 3600),
+            duration=dict(years=i % 2, months=0, weeks=0, days=1, hours=2, minutes=30, seconds=0),
+            payload=[f'Irrelevant data {j} of event {i}' for j in range(payload)],
+        )
+        relationships[f'rel{i}'] = dict(subject=f'evt{i}', reference='partRef', object=f'chr{i // 10}')
+        relationships[f'lrel{i}'] = dict(subject=f'evt{i}', reference='locRef', object=f'loc{i // 20}')
+        relationships[f'irel{i}'] = dict(subject=f'evt{i}', reference='itmRef', object=f'itm{i // 20}')
+        relationships[f'drel{i}'] = dict(subject=f'evt{i}', reference='partRef', object=f'chr{i // 10}')
+    if narrative is None:
+        third = events // 3
+        narrative = [list(range(third)), list(range(third, 2 * third))]
+    folders = []
+
+    def add_nodes(nodes):
+        children = []
+        for node in nodes:
+            if isinstance(node, list):
+                fldId = f'fld{len(folders)}'
+                folders.append(fldId)
+                items[fldId] = dict(type='fld', label=f'Chapter {len(folders)}', summary='', tags=[],
+                                    propertyValues={})
+                children.append({'id': fldId, 'children': add_nodes(node)})
+            else:
+                children.append({'id': f'evt{node}', 'children': []})
+        return children
+
+    narrative = {'id': 'root', 'children': add_nodes(narrative)}
+    jsonData = {
+        'definitions': {
+            'types': {'byId': types},
+            'properties': {'byId': properties},
+            'references': {'byId': references},
+        },
+        'data': {
+            'items': {'byId': items, 'allIds': list(items)},
+            'relationships': {'byId': relationships, 'allIds': list(relationships)},
+            'narrative': narrative,
+            'tags': {'tag0': 'Tag zero', 'tag1': 'Tag one'},
+        },
+        'appState': {},
+    }
+    with open(filePath, 'wb') as f:
+        f.write(b'\x02\x00\x00\x00(\x00\x00\x00HDJDJZWQ')
+        f.write(json.dumps(jsonData).encode('utf-8'))
+        f.write(b'\x00' * 64)
+
+
 class NormalOperation(unittest.TestCase):
     """Operation under normal condition, i.e.:
-    * Test data is present and readable 
+    * Test data is present and readable
     * test data integrity is o.k.
     """
 
@@ -46,10 +156,220 @@ class NormalOperation(unittest.TestCase):
         except:
             pass
 
+        try:
+            os.remove(TEST_AEONZIP)
+        except:
+            pass
+
+        try:
+            os.remove(TEST_YW7)
+        except:
+            pass
+
+    def read_timeline(self, streaming):
+        return self.read_timeline_instance(JsonTimeline3(TEST_AEON3, streaming=streaming, **SETTINGS))
+
+    def read_timeline_instance(self, timeline):
+        message = timeline.read()
+        self.assertTrue(message.startswith('Timeline data converted to novel structure.'))
+        return timeline
+
     def test_aeon3(self):
         copyfile(AEON3, TEST_AEON3)
-        timeline = JsonTimeline3(TEST_AEON3)
-        self.assertEqual()
+        self.assertEqual(novel_data(self.read_timeline(True)), novel_data(self.read_timeline(False)))
+
+    def test_date_limits(self):
+        copyfile(DATE_LIMITS_AEON3, TEST_AEON3)
+        self.assertEqual(novel_data(self.read_timeline(True)), novel_data(self.read_timeline(False)))
+
+    def test_aeon3_zip(self):
+        copyfile(DATE_LIMITS_AEON3, TEST_AEON3)
+        with zipfile.ZipFile(TEST_AEONZIP, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+            archive.write(DATE_LIMITS_AEON3, 'project.aeon')
+        expected = novel_data(self.read_timeline(False))
+        for streaming in (True, False):
+            timeline = ZipTimeline3(TEST_AEONZIP, streaming=streaming, **SETTINGS)
+            self.assertTrue(timeline.read().startswith('Timeline data converted to novel structure.'))
+            self.assertEqual(novel_data(timeline), expected)
+
+    def test_aeon3_zip_size(self):
+        # The streaming threshold applies to the uncompressed project size.
+        with zipfile.ZipFile(TEST_AEONZIP, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+            archive.write(DATE_LIMITS_AEON3, 'project.aeon')
+        timeline = ZipTimeline3(TEST_AEONZIP, **SETTINGS)
+        self.assertEqual(timeline._get_project_size(), os.path.getsize(DATE_LIMITS_AEON3))
+        self.assertLess(os.path.getsize(TEST_AEONZIP), os.path.getsize(DATE_LIMITS_AEON3))
+
+    def test_aeon2_zip(self):
+        # Aeon Timeline 2 archives are rejected.
+        for streaming in (True, False):
+            timeline = ZipTimeline3(AEON2_ZIP, streaming=streaming, **SETTINGS)
+            self.assertEqual(timeline.read(), f'{ERROR}Wrong JSON structure.')
+
+    def test_wrong_structure(self):
+        # Valid JSON with missing or wrongly typed sections is rejected by both readers.
+        for damage in (
+            lambda jsonData: jsonData['data'].pop('items'),
+            lambda jsonData: jsonData['data'].update(narrative=[]),
+        ):
+            make_timeline(TEST_AEON3, 10)
+            with open(TEST_AEON3, 'rb') as f:
+                data = f.read()
+            jsonData = json.loads(data[16:].rstrip(b'\x00'))
+            damage(jsonData)
+            with open(TEST_AEON3, 'wb') as f:
+                f.write(data[:16])
+                f.write(json.dumps(jsonData).encode('utf-8'))
+            for streaming in (True, False):
+                timeline = JsonTimeline3(TEST_AEON3, streaming=streaming, **SETTINGS)
+                self.assertEqual(timeline.read(), f'{ERROR}Wrong JSON structure.')
+
+    def test_unresolved_labels(self):
+        copyfile(AEON3, TEST_AEON3)
+        timeline = JsonTimeline3(TEST_AEON3, **SETTINGS)
+        self.assertEqual(timeline.read(), 'Timeline data converted to novel structure. '
+                         'Unresolved labels: "Item" (type_item), "Notes" (notes_label), '
+                         '"Traits" (character_desc_label2), "Viewpoint" (viewpoint_label), "Item" (item_label).')
+
+        # Without the event type, no scenes can be created.
+        settings = dict(SETTINGS)
+        settings['type_event'] = 'Scene'
+        settings['type_item'] = ''
+        timeline = JsonTimeline3(TEST_AEON3, **settings)
+        self.assertEqual(timeline.read(), f'{ERROR}Unresolved labels: "Scene" (type_event), "Notes" (notes_label), '
+                         '"Traits" (character_desc_label2), "Viewpoint" (viewpoint_label), "Item" (item_label).')
+
+    def test_notes_property(self):
+        make_timeline(TEST_AEON3, 10)
+        timeline = self.read_timeline(False)
+        self.assertEqual([scene.sceneNotes for scene in timeline.scenes.values()],
+                         [f'Notes on event {i}' for i in range(10)])
+
+    def test_relationships(self):
+        make_timeline(TEST_AEON3, 40)
+        timeline = self.read_timeline(False)
+        crIds = {timeline.characters[crId].title: crId for crId in timeline.characters}
+        lcIds = {timeline.locations[lcId].title: lcId for lcId in timeline.locations}
+        itIds = {timeline.items[itId].title: itId for itId in timeline.items}
+        for scene in timeline.scenes.values():
+            i = int(scene.title.split()[-1])
+            participant = crIds[f'Character {i // 10}']
+            if i % 2:
+                self.assertEqual(scene.characters, [crIds[f'Character {i // 10 + 1}'], participant])
+            else:
+                self.assertEqual(scene.characters, [participant])
+            self.assertEqual(scene.locations, [lcIds[f'Location {i // 20}']])
+            self.assertEqual(scene.items, [itIds[f'Item {i // 20}']])
+
+    def test_custom_builder(self):
+        copyfile(AEON3, TEST_AEON3)
+        message, jsonData = read_json(AEON3)
+        types = jsonData['definitions']['types']['byId']
+        clues = [uid for uid, item in jsonData['data']['items']['byId'].items()
+                 if types[item['type']]['label'] == 'Clue']
+        timeline = JsonTimeline3(TEST_AEON3, **SETTINGS)
+        timeline.register_builder('Clue', timeline.build_item)
+        self.read_timeline_instance(timeline)
+        self.assertEqual([timeline.items[itId].title for itId in timeline.srtItems],
+                         [jsonData['data']['items']['byId'][uid]['label'] for uid in clues])
+
+        # A custom builder overrides the default one.
+        built = []
+        timeline = JsonTimeline3(TEST_AEON3, **SETTINGS)
+        timeline.register_builder('Character', lambda uid, dataItem: built.append(uid))
+        self.read_timeline_instance(timeline)
+        self.assertEqual(timeline.characters, {})
+        self.assertEqual(len(built), len([uid for uid, item in jsonData['data']['items']['byId'].items()
+                                          if types[item['type']]['label'] == 'Character']))
+
+    def test_narrative_policies(self):
+        # Folders 1 to 6, and events 0 to 6 as scenes 1 to 7.
+        make_timeline(TEST_AEON3, 7, narrative=[[0, [1, [2, [3]], 4]], 5, [[6]]])
+        for policy, srtChapters, srtScenes, chLevels in (
+                ('outline', ['1', '2', '5', '6', '7'],
+                 [['1'], ['2', '3', '4', '5'], [], ['7'], ['6']],
+                 [1, 0, 1, 0, None]),
+                ('nested', ['1', '2', '3', '4', '5', '6', '7'],
+                 [['1'], ['2', '5'], ['3'], ['4'], [], ['7'], ['6']],
+                 [1, 1, 1, 0, 1, 0, None]),
+                ):
+            settings = dict(SETTINGS)
+            settings['narrative_policy'] = policy
+            timeline = self.read_timeline_instance(JsonTimeline3(TEST_AEON3, **settings))
+            self.assertEqual(timeline.srtChapters, srtChapters)
+            self.assertEqual([timeline.chapters[chId].srtScenes for chId in srtChapters], srtScenes)
+            self.assertEqual([timeline.chapters[chId].chLevel for chId in srtChapters], chLevels)
+            self.assertEqual(timeline.chapters['7'].title, 'Other events')
+            self.assertFalse(timeline.scenes['1'].isNotesScene)
+            self.assertTrue(timeline.scenes['6'].isNotesScene)
+
+        settings['narrative_policy'] = 'flat'
+        timeline = JsonTimeline3(TEST_AEON3, **settings)
+        self.assertEqual(timeline.read(), f'{ERROR}Unknown narrative policy: "flat".')
+
+    def test_lazy(self):
+        make_timeline(TEST_AEON3, 100)
+        expected = self.read_timeline(False)
+        timeline = self.read_timeline_instance(JsonTimeline3(TEST_AEON3, lazy=True, **SETTINGS))
+
+        # Counts and the chapter outline are available without building any element.
+        self.assertEqual(len(timeline.scenes), len(expected.scenes))
+        self.assertEqual(len(timeline.characters), len(expected.characters))
+        self.assertEqual(timeline.srtChapters, expected.srtChapters)
+        for chId in timeline.chapters:
+            self.assertEqual(vars(timeline.chapters[chId]), vars(expected.chapters[chId]))
+        self.assertIn('1', timeline.scenes)
+        self.assertNotIn('0', timeline.scenes)
+        self.assertEqual(timeline.scenes.built, 0)
+        self.assertEqual(timeline.characters.built, 0)
+
+        # Elements are built on first access, and then memoized.
+        scene = timeline.scenes['42']
+        self.assertEqual(vars(scene), vars(expected.scenes['42']))
+        self.assertIs(timeline.scenes['42'], scene)
+        self.assertEqual(timeline.scenes.built, 1)
+        self.assertEqual(timeline.characters.built, 0)
+        self.assertEqual(novel_data(timeline), novel_data(expected))
+
+    def test_lazy_merge(self):
+        make_timeline(TEST_AEON3, 100)
+        for lazy in (False, True):
+            source = self.read_timeline_instance(JsonTimeline3(TEST_AEON3, lazy=lazy, **SETTINGS))
+            if os.path.isfile(TEST_YW7):
+                os.remove(TEST_YW7)
+            target = Yw7File(TEST_YW7)
+            self.assertFalse(target.merge(source).startswith(ERROR))
+            self.assertFalse(target.write().startswith(ERROR))
+            if lazy:
+                self.assertEqual(read_file(TEST_YW7), expected)
+            else:
+                expected = read_file(TEST_YW7)
+
+    def test_schema_reuse(self):
+        message, jsonData = read_json(AEON3)
+        settings = [('type_event', 'Event'), ('notes_label', 'Notes')]
+        schema = get_schema(jsonData['definitions'], settings)
+        self.assertIs(get_schema(copy.deepcopy(jsonData['definitions']), settings), schema)
+        self.assertIsNot(get_schema(jsonData['definitions'], settings[:1]), schema)
+
+    def test_stream_chunks(self):
+        # Values split across chunk boundaries are read completely.
+        message, jsonData = read_json(AEON3)
+        with open(AEON3, 'rb') as f:
+            stream = JsonStream(f, chunkSize=5)
+            self.assertEqual(stream.value(), jsonData)
+
+    def test_streaming_memory(self):
+        # The project file is about 11 MB; decoding it at once takes about 50 MB.
+        make_timeline(TEST_AEON3, 1000, payload=300)
+        tracemalloc.start()
+        timeline = self.read_timeline(True)
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        self.assertEqual(len(timeline.scenes), 1000)
+
+        # Apart from the novel, only the read buffer and the current item are held in memory.
+        self.assertLess(peak - current, 6 * JsonStream.CHUNK_SIZE)
 
 
 def main():
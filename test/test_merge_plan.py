@@ -0,0 +1,42 @@
+"""Unit tests for the list merging of merge_plan
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/aeon3yw
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+import time
+import unittest
+from aeon3ywlib.merge_plan import merge_lists
+
+
+class NormalOperation(unittest.TestCase):
+    """Operation under normal condition."""
+
+    def test_merge_lists(self):
+        for srcLst, tgtLst, mergedLst in (
+            (['a', 'b', 'c'], [], ['a', 'b', 'c']),
+            ([], ['a', 'b'], ['a', 'b']),
+            (['x', 'a', 'y', 'b', 'z'], ['a', 'b'], ['x', 'a', 'y', 'b', 'z']),
+            (['b', 'x'], ['a', 'b', 'c'], ['a', 'b', 'x', 'c']),
+            (['c', 'x', 'a', 'y'], ['a', 'b', 'c'], ['a', 'y', 'b', 'c', 'x']),
+            (['a', 'x', 'b', 'a', 'y'], ['a', 'b'], ['a', 'y', 'x', 'b']),
+        ):
+            merge_lists(srcLst, tgtLst)
+            self.assertEqual(tgtLst, mergedLst)
+
+    def test_merge_lists_scaling(self):
+        # 100k IDs, every other one missing in the target.
+        srcLst = [str(i) for i in range(100000)]
+        tgtLst = srcLst[::2]
+        startTime = time.perf_counter()
+        merge_lists(srcLst, tgtLst)
+        self.assertLess(time.perf_counter() - startTime, 1)
+        self.assertEqual(tgtLst, srcLst)
+
+
+def main():
+    unittest.main()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+"""Unit tests for parse_cache
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/aeon3yw
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+import os
+import unittest
+from shutil import copyfile
+from shutil import rmtree
+from aeon3ywlib.json_timeline3 import JsonTimeline3
+from aeon3ywlib.parse_cache import ParseCache
+from aeon3yw_ import SETTINGS
+from test_json_timeline import novel_data
+
+TEST_PATH = os.getcwd() + '/../test'
+TEST_DATA_PATH = TEST_PATH + '/data/'
+TEST_EXEC_PATH = TEST_PATH + '/yw7/'
+
+AEON3 = TEST_DATA_PATH + 'normal.aeon'
+DATE_LIMITS_AEON3 = TEST_DATA_PATH + 'date_limits.aeon'
+TEST_AEON3 = TEST_EXEC_PATH + 'project.aeon'
+CACHE_DIR = TEST_EXEC_PATH + 'cache'
+
+CONVERTED = 'Timeline data converted to novel structure.'
+CACHED = 'Timeline data read from cache.'
+
+
+class NormalOperation(unittest.TestCase):
+    """Operation under normal condition, i.e.:
+    * Test data is present and readable
+    * test data integrity is o.k.
+    """
+
+    def setUp(self):
+        copyfile(AEON3, TEST_AEON3)
+
+    def tearDown(self):
+        rmtree(CACHE_DIR, ignore_errors=True)
+        try:
+            os.remove(TEST_AEON3)
+        except:
+            pass
+
+    def read_timeline(self, expectedMessage, **kwargs):
+        settings = dict(SETTINGS)
+        settings.update(kwargs)
+        timeline = JsonTimeline3(TEST_AEON3, cache_dir=CACHE_DIR, **settings)
+        self.assertTrue(timeline.read().startswith(expectedMessage))
+        return timeline
+
+    def test_hit(self):
+        converted = self.read_timeline(CONVERTED)
+        cached = self.read_timeline(CACHED)
+        self.assertEqual(novel_data(cached), novel_data(converted))
+
+    def test_hit_report(self):
+        # The unresolved labels are reported on a cache hit as well.
+        message = JsonTimeline3(TEST_AEON3, cache_dir=CACHE_DIR, **SETTINGS).read()
+        self.assertIn('Unresolved labels:', message)
+        cachedMessage = JsonTimeline3(TEST_AEON3, cache_dir=CACHE_DIR, **SETTINGS).read()
+        self.assertEqual(cachedMessage, message.replace(CONVERTED, CACHED))
+
+    def test_settings_changed(self):
+        self.read_timeline(CONVERTED)
+        self.read_timeline(CONVERTED, chapter_number_prefix='Kapitel')
+        self.read_timeline(CACHED, chapter_number_prefix='Kapitel')
+        self.read_timeline(CACHED)
+
+    def test_content_changed(self):
+        self.read_timeline(CONVERTED)
+        copyfile(DATE_LIMITS_AEON3, TEST_AEON3)
+        converted = self.read_timeline(CONVERTED)
+        expected = JsonTimeline3(DATE_LIMITS_AEON3, **SETTINGS)
+        expected.read()
+        self.assertEqual(novel_data(converted), novel_data(expected))
+
+    def test_clear(self):
+        self.read_timeline(CONVERTED)
+        ParseCache(CACHE_DIR).clear()
+        self.read_timeline(CONVERTED)
+
+    def test_corrupted_entry(self):
+        self.read_timeline(CONVERTED)
+        for entry in os.listdir(CACHE_DIR):
+            with open(os.path.join(CACHE_DIR, entry), 'wb') as f:
+                f.write(b'garbage')
+        self.read_timeline(CONVERTED)
+        self.read_timeline(CACHED)
+
+    def test_lru_eviction(self):
+        timeline = self.read_timeline(CONVERTED)
+        cache = ParseCache(CACHE_DIR)
+        entrySize = sum(entry.stat().st_size for entry in os.scandir(CACHE_DIR))
+        cache.clear()
+
+        # Store three entries with increasing access times, and read the first one again.
+        cache.maxSize = 3 * entrySize
+        for i, key in enumerate(('a', 'b', 'c')):
+            cache.store(key, timeline)
+            os.utime(os.path.join(CACHE_DIR, f'{key}{ParseCache.EXTENSION}'), (i, 1000 + i))
+        self.assertIsNotNone(cache.load('a', JsonTimeline3(TEST_AEON3, **SETTINGS)))
+
+        # Storing a fourth entry evicts the least recently used ones.
+        cache.store('d', timeline)
+        self.assertEqual(sorted(os.listdir(CACHE_DIR)), [f'{key}{ParseCache.EXTENSION}' for key in ('a', 'c', 'd')])
+
+
+def main():
+    unittest.main()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,45 @@
+"""Unit tests for uid_helper
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/aeon3yw
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+import re
+import unittest
+from aeon3ywlib.uid_helper import get_uid
+from aeon3ywlib.uid_helper import get_uids
+
+GUID_PATTERN = re.compile('[0-9A-F]{8}-[0-9A-F]{4}-[0-9A-F]{4}-[0-9A-F]{4}-[0-9A-F]{12}')
+
+
+class NormalOperation(unittest.TestCase):
+    """Operation under normal condition."""
+
+    def test_get_uid(self):
+        self.assertTrue(GUID_PATTERN.fullmatch(get_uid()))
+
+    def test_get_uids(self):
+        guids = get_uids(10000)
+        self.assertEqual(len(guids), 10000)
+        self.assertEqual(len(set(guids)), 10000)
+        for guid in guids:
+            self.assertTrue(GUID_PATTERN.fullmatch(guid))
+        self.assertEqual(get_uids(0), [])
+
+    def test_seed(self):
+        guids = get_uids(100, seed=42)
+        self.assertEqual(get_uids(100, seed=42), guids)
+        self.assertNotEqual(get_uids(100, seed=43), guids)
+
+        # Existing GUIDs are replaced by the next ones of the sequence.
+        newGuids = get_uids(100, existing=set(guids[:10]), seed=42)
+        self.assertEqual(newGuids[:90], guids[10:])
+        self.assertTrue(set(newGuids).isdisjoint(guids[:10]))
+
+
+def main():
+    unittest.main()
+
+
+if __name__ == '__main__':
+    main()
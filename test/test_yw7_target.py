@@ -0,0 +1,292 @@
+"""Unit tests for yw7_target
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/aeon3yw
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+import os
+import unittest
+import tracemalloc
+from shutil import copyfile
+from pywriter.pywriter_globals import ERROR
+from pywriter.model.chapter import Chapter
+from pywriter.model.scene import Scene
+from pywriter.yw.yw7_file import Yw7File
+from aeon3ywlib.yw7_target import Yw7Target
+from aeon3ywlib.merge_plan import MergePlan
+from aeon3ywlib.merge_plan import SOURCE_IF_NOT_NONE
+from aeon3ywlib.merge_plan import SOURCE_IF_NOT_EMPTY
+from aeon3ywlib.merge_plan import UNION
+
+TEST_PATH = os.getcwd() + '/../test'
+TEST_DATA_PATH = TEST_PATH + '/data/'
+TEST_EXEC_PATH = TEST_PATH + '/yw7/'
+
+NORMAL_YW7 = TEST_DATA_PATH + 'normal.yw7'
+DATE_LIMITS_YW7 = TEST_DATA_PATH + 'date_limits.yw7'
+REFERENCE_YW7 = TEST_EXEC_PATH + 'reference.yw7'
+TEST_YW7 = TEST_EXEC_PATH + 'project.yw7'
+
+
+def read_bytes(filePath):
+    with open(filePath, 'rb') as f:
+        return f.read()
+
+
+def novel_data(novel):
+    """Return the instance variables of a Novel instance and its elements as a dictionary."""
+    data = {}
+    for attr in ('title', 'desc', 'authorName', 'authorBio', 'kwVar',
+                 'srtChapters', 'srtCharacters', 'srtLocations', 'srtItems'):
+        data[attr] = getattr(novel, attr)
+    for attr in ('chapters', 'scenes', 'characters', 'locations', 'items'):
+        elements = getattr(novel, attr)
+        data[attr] = [(elemId, vars(elements[elemId])) for elemId in elements]
+    return data
+
+
+def make_novel(novel, chapters, scenes, words):
+    """Fill a novel with chapters, and scenes with content.
+
+    Positional arguments:
+        novel -- Novel instance.
+        chapters -- int: number of chapters.
+        scenes -- int: number of scenes per chapter.
+        words -- int: number of words per scene.
+    """
+    content = ' '.join(['Lorem'] * words)
+    for i in range(chapters):
+        chId = str(i + 1)
+        novel.chapters[chId] = Chapter()
+        novel.chapters[chId].title = f'Chapter {chId}'
+        novel.srtChapters.append(chId)
+        for j in range(scenes):
+            scId = str(i * scenes + j + 1)
+            novel.scenes[scId] = Scene()
+            novel.scenes[scId].title = f'Scene {scId}'
+            novel.scenes[scId].sceneContent = content
+            novel.chapters[chId].srtScenes.append(scId)
+
+
+def remove_all_testfiles():
+    for filePath in (REFERENCE_YW7, TEST_YW7):
+        for suffix in ('', '.bak', '.lock'):
+            try:
+                os.remove(f'{filePath}{suffix}')
+            except:
+                pass
+
+
+class NormalOperation(unittest.TestCase):
+    """Operation under normal condition."""
+
+    def setUp(self):
+        os.makedirs(TEST_EXEC_PATH, exist_ok=True)
+        remove_all_testfiles()
+
+    def write_both(self, modify=None):
+        """Write a copy of the test project with Yw7File and Yw7Target; return the bytes written."""
+        written = []
+        for fileClass, filePath in ((Yw7File, REFERENCE_YW7), (Yw7Target, TEST_YW7)):
+            copyfile(NORMAL_YW7, filePath)
+            ywFile = fileClass(filePath)
+            self.assertFalse(ywFile.read().startswith(ERROR))
+            if modify is not None:
+                modify(ywFile)
+            self.assertTrue(ywFile.write().startswith(f'"{os.path.normpath(filePath)}" written.'))
+            written.append(read_bytes(filePath))
+            self.assertEqual(read_bytes(f'{filePath}.bak'), read_bytes(NORMAL_YW7))
+        return written
+
+    def test_write(self):
+        reference, written = self.write_both()
+        self.assertEqual(written, reference)
+
+    def test_write_special_characters(self):
+
+        def modify(ywFile):
+            ywFile.title = 'Title & <Title>'
+            scene = ywFile.scenes[list(ywFile.scenes)[0]]
+            scene.sceneContent = 'Line\r\nbreaks\r &amp; "quotes"\n]] [CDATA[ \nend'
+            scene.title = 'Title\n]]'
+
+        reference, written = self.write_both(modify)
+        self.assertEqual(written, reference)
+
+    def merge_both(self, modify):
+        """Merge a modified copy of the test project with Yw7File and Yw7Target; return the bytes written."""
+        written = []
+        for fileClass, filePath in ((Yw7File, REFERENCE_YW7), (Yw7Target, TEST_YW7)):
+            copyfile(NORMAL_YW7, filePath)
+            source = Yw7File(NORMAL_YW7)
+            self.assertFalse(source.read().startswith(ERROR))
+            modify(source)
+            ywFile = fileClass(filePath)
+            self.assertEqual(ywFile.merge(source), 'yWriter project data updated or created.')
+            self.assertTrue(ywFile.write().startswith(f'"{os.path.normpath(filePath)}" written.'))
+            written.append(read_bytes(filePath))
+        return written
+
+    def test_merge(self):
+
+        def modify(source):
+            # The source has no scene contents, like a timeline.
+            for scId in source.scenes:
+                source.scenes[scId]._sceneContent = None
+                source.scenes[scId].title = f'New {source.scenes[scId].title}'
+
+        reference, written = self.merge_both(modify)
+        self.assertEqual(written, reference)
+
+        # The scene contents are not read.
+        ywFile = Yw7Target(TEST_YW7)
+        self.assertFalse(ywFile.merge(Yw7File(NORMAL_YW7)).startswith(ERROR))
+        for scId in ywFile.scenes:
+            self.assertIsNone(ywFile.scenes[scId].sceneContent)
+
+    def test_merge_scene_content(self):
+
+        def modify(source):
+            scene = source.scenes[list(source.scenes)[0]]
+            scene.sceneContent = f'{scene.sceneContent}\n# New chapter\nNew content'
+
+        reference, written = self.merge_both(modify)
+        self.assertEqual(written, reference)
+
+    def test_merge_fields_changed(self):
+        copyfile(NORMAL_YW7, TEST_YW7)
+        source = Yw7File(NORMAL_YW7)
+        self.assertFalse(source.read().startswith(ERROR))
+        ywFile = Yw7Target(TEST_YW7)
+        self.assertFalse(ywFile.merge(source).startswith(ERROR))
+        self.assertEqual(ywFile.fieldsChanged, 0)
+
+        scId = list(source.scenes)[0]
+        desc = source.scenes[scId].desc
+        source.scenes[scId].title = 'New title'
+        source.scenes[scId].desc = None
+        source.chapters[source.srtChapters[0]].srtScenes.append('999')
+        source.scenes['999'] = Scene()
+        ywFile = Yw7Target(TEST_YW7)
+        self.assertFalse(ywFile.merge(source).startswith(ERROR))
+        self.assertEqual(ywFile.fieldsChanged, 2)
+        self.assertEqual(ywFile.scenes[scId].title, 'New title')
+        self.assertEqual(ywFile.scenes[scId].desc, desc)
+
+    def test_merge_plan(self):
+        mergePlan = MergePlan((
+            ('title', SOURCE_IF_NOT_EMPTY),
+            ('desc', SOURCE_IF_NOT_NONE),
+            ('isUnused', SOURCE_IF_NOT_NONE),
+            ('srtScenes', UNION),
+        ))
+        source = Chapter()
+        target = Chapter()
+        target.title = 'Title'
+        target.desc = 'Description'
+        target.srtScenes = ['1', '3']
+        source.title = ''
+        source.isUnused = False
+        source.srtScenes = ['1', '2', '3', '4']
+        self.assertEqual(mergePlan.merge(source, target), 2)
+        self.assertEqual(target.title, 'Title')
+        self.assertEqual(target.desc, 'Description')
+        self.assertFalse(target.isUnused)
+        self.assertEqual(target.srtScenes, ['1', '2', '3', '4'])
+        self.assertEqual(mergePlan.merge(source, target), 0)
+        with self.assertRaises(ValueError):
+            MergePlan((('title', 'source wins always'),))
+
+    def test_session(self):
+        copyfile(NORMAL_YW7, TEST_YW7)
+        source = Yw7File(NORMAL_YW7)
+        self.assertFalse(source.read().startswith(ERROR))
+        ywFile = Yw7Target(TEST_YW7)
+        self.assertFalse(ywFile.merge(source).startswith(ERROR))
+
+        # The lock is checked once per session.
+        open(f'{TEST_YW7}.lock', 'w').close()
+        message = ywFile.write()
+        self.assertFalse(message.startswith(ERROR))
+        self.assertTrue(ywFile.write().startswith(ERROR))
+        os.remove(f'{TEST_YW7}.lock')
+
+        # The project file is read once, backed up, and written once.
+        self.assertEqual(ywFile.ioAccount.phases, {
+            'merge': [1, os.path.getsize(NORMAL_YW7), 0],
+            'backup': [1, 0, 0],
+            'write': [1, 0, os.path.getsize(TEST_YW7)],
+        })
+        self.assertEqual(message, f'"{os.path.normpath(TEST_YW7)}" written. {ywFile.ioAccount.report()}')
+        self.assertTrue(message.endswith(f'File I/O -- merge: 1 file(s), {os.path.getsize(NORMAL_YW7)} bytes read, '
+                                         f'0 bytes written; backup: 1 file(s), 0 bytes read, 0 bytes written; '
+                                         f'write: 1 file(s), 0 bytes read, {os.path.getsize(TEST_YW7)} bytes written.'))
+
+    def test_write_new(self):
+        written = []
+        for fileClass, filePath in ((Yw7File, REFERENCE_YW7), (Yw7Target, TEST_YW7)):
+            ywFile = fileClass(NORMAL_YW7)
+            self.assertFalse(ywFile.read().startswith(ERROR))
+            # Write the project as a new one.
+            ywFile.filePath = filePath
+            ywFile.tree = None
+            self.assertTrue(ywFile.write().startswith(f'"{os.path.normpath(filePath)}" written.'))
+            written.append(read_bytes(filePath))
+        self.assertEqual(written[1], written[0])
+
+    def test_write_new_memory(self):
+        # A new project is written scene by scene.
+        ywFile = Yw7Target(TEST_YW7)
+        make_novel(ywFile, 10, 100, 2000)
+        tracemalloc.start()
+        try:
+            self.assertFalse(ywFile.write().startswith(ERROR))
+            __, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        self.assertGreater(os.path.getsize(TEST_YW7), 10000000)
+        self.assertLess(peak, 1000000)
+
+    def test_read(self):
+        for filePath in (NORMAL_YW7, DATE_LIMITS_YW7):
+            reference = Yw7File(filePath)
+            self.assertFalse(reference.read().startswith(ERROR))
+            for lowMemory in (False, True):
+                ywFile = Yw7Target(filePath, low_memory=lowMemory)
+                self.assertEqual(ywFile.read(), 'yWriter project data read in.')
+                self.assertEqual(ywFile.tree is None, lowMemory)
+                self.assertEqual(novel_data(ywFile), novel_data(reference))
+
+    def test_read_low_memory_error(self):
+        with open(TEST_YW7, 'w', encoding='utf-8') as f:
+            f.write('<YWRITER7><PROJECT>')
+        ywFile = Yw7Target(TEST_YW7, low_memory=True)
+        self.assertTrue(ywFile.read().startswith(ERROR))
+
+    def test_write_low_memory_error(self):
+        copyfile(NORMAL_YW7, TEST_YW7)
+        ywFile = Yw7Target(TEST_YW7, low_memory=True)
+        self.assertFalse(ywFile.read().startswith(ERROR))
+        ywFile.title = 'Changed'
+        self.assertTrue(ywFile.write().startswith(ERROR))
+        self.assertEqual(read_bytes(TEST_YW7), read_bytes(NORMAL_YW7))
+
+        # Merging fails before the project is read.
+        source = Yw7File(NORMAL_YW7)
+        self.assertFalse(source.read().startswith(ERROR))
+        ywFile = Yw7Target(TEST_YW7, low_memory=True)
+        self.assertEqual(ywFile.merge(source), f'{ERROR}Can not update "{os.path.normpath(TEST_YW7)}" in low memory mode.')
+        self.assertEqual(ywFile.ioAccount.phases, {})
+        self.assertTrue(ywFile.write().startswith(ERROR))
+        self.assertEqual(read_bytes(TEST_YW7), read_bytes(NORMAL_YW7))
+
+    def tearDown(self):
+        remove_all_testfiles()
+
+
+def main():
+    unittest.main()
+
+
+if __name__ == '__main__':
+    main()
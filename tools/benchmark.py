@@ -0,0 +1,622 @@
+"""Benchmarks for the aeon3yw library.
+
+Usage: benchmark.py [name ...]
+Run the benchmarks given by name, or all benchmarks.
+The script is meant to be executed in the "tools" directory.
+
+Copyright (c) 2023 Peter Triesberger
+For further information see https://github.com/peter88213/aeon3yw
+Published under the MIT License (https://opensource.org/licenses/mit-license.php)
+"""
+import sys
+import runpy
+import timeit
+
+sys.path.insert(0, '../src')
+TEST_DATA_PATH = '../test/data/'
+
+
+def report(name, seconds):
+    print(f'{name:<40}{seconds * 1000:10.2f} ms')
+
+
+def get_settings():
+    """Return the converter's default settings."""
+    return runpy.run_path('../src/aeon3yw_.pyw')['SETTINGS']
+
+
+def make_project(events, participants=1):
+    """Return the JSON data of a synthetic Aeon 3 project.
+
+    Positional arguments:
+        events -- int: number of events.
+
+    Optional arguments:
+        participants -- int: number of participants per event.
+
+    There is a character, a location, and an item per ten events, and a chapter per hundred events.
+    Events and characters have property values; each event has participants, a location, and an item.
+    """
+    types = {
+        'evt': {'label': 'Event', 'isNarrativeFolder': False},
+        'chr': {'label': 'Character', 'isNarrativeFolder': False},
+        'loc': {'label': 'Location', 'isNarrativeFolder': False},
+        'itm': {'label': 'Item', 'isNarrativeFolder': False},
+        'fld': {'label': 'Narrative Folder', 'isNarrativeFolder': True},
+    }
+    properties = {
+        'notes': {'label': 'Notes'},
+        'nick': {'label': 'Nickname'},
+        'chars': {'label': 'Characteristics'},
+        'other': {'label': 'Other'},
+    }
+    references = {
+        'part': {'label': 'Participant'},
+        'loc': {'label': 'Location'},
+        'item': {'label': 'Item'},
+    }
+    items = {}
+    relationships = {}
+    narrative = {'id': 'root', 'children': []}
+    characters = max(events // 10, participants)
+    for i in range(characters):
+        items[f'chr{i}'] = dict(type='chr', label=f'Character {i}', shortLabel='', summary='', tags=['tag0'],
+                                propertyValues={'notes': 'Notes', 'nick': 'Nick', 'chars': 'Tall', 'other': 'x'})
+    for i in range(events // 10):
+        items[f'loc{i}'] = dict(type='loc', label=f'Location {i}', summary='', tags=[], propertyValues={})
+        items[f'itm{i}'] = dict(type='itm', label=f'Item {i}', summary='', tags=[], propertyValues={})
+    for i in range(events):
+        if i % 100 == 0:
+            items[f'fld{i}'] = dict(type='fld', label=f'Chapter {i}', summary='', tags=[], propertyValues={})
+            chapter = {'id': f'fld{i}', 'children': []}
+            narrative['children'].append(chapter)
+        items[f'evt{i}'] = dict(
+            type='evt', label=f'Event {i}', summary='Summary', tags=['tag0'],
+            propertyValues={'notes': f'Notes {i}', 'other': 'x'},
+            startDate=dict(timestamp=60971188620 + i * 3600),
+            duration=dict(years=0, months=0, weeks=0, days=1, hours=2, minutes=30, seconds=0),
+        )
+        chapter['children'].append({'id': f'evt{i}', 'children': []})
+        for ref, obj in (('loc', 'loc'), ('item', 'itm')):
+            relationships[f'{ref}{i}'] = dict(subject=f'evt{i}', reference=ref, object=f'{obj}{i // 10}')
+        for j in range(participants):
+            relationships[f'part{i}.{j}'] = dict(subject=f'evt{i}', reference='part',
+                                                 object=f'chr{(i // 10 + j) % characters}')
+    return {
+        'definitions': {
+            'types': {'byId': types},
+            'properties': {'byId': properties},
+            'references': {'byId': references},
+        },
+        'data': {
+            'items': {'byId': items, 'allIds': list(items)},
+            'relationships': {'byId': relationships, 'allIds': list(relationships)},
+            'narrative': narrative,
+            'tags': {'tag0': 'Tag zero'},
+        },
+    }
+
+
+def build_novel(jsonData, **kwargs):
+    """Build a novel from decoded Aeon 3 JSON data, and return the JsonTimeline3 instance."""
+    from aeon3ywlib.json_timeline3 import JsonTimeline3
+    settings = get_settings()
+    settings.update(kwargs)
+    timeline = JsonTimeline3('', **settings)
+    message = timeline._read_sections(timeline._iter_json_data(jsonData))
+    assert not message.startswith('!'), message
+    return timeline
+
+
+def scan_bytewise(filePath):
+    """Reference: the former per-byte JSON extraction."""
+    with open(filePath, 'rb') as f:
+        binInput = f.read()
+    chrData = []
+    level = 0
+    for c in binInput:
+        if c == 123:
+            level += 1
+        if level > 0:
+            chrData.append(c)
+            if c == 125:
+                level -= 1
+                if level == 0:
+                    break
+    return bytes(chrData).decode('utf-8')
+
+
+def bench_scan_file():
+    """Extract the JSON part of a 1.1 MB Aeon 3 project file."""
+    from aeon3ywlib.aeon3_fop import scan_file
+    filePath = f'{TEST_DATA_PATH}normal.aeon'
+    assert scan_file(filePath) == scan_bytewise(filePath)
+    report('per-byte loop', min(timeit.repeat(lambda: scan_bytewise(filePath), number=1, repeat=5)))
+    report('scan_file', min(timeit.repeat(lambda: scan_file(filePath), number=1, repeat=5)))
+
+
+def bench_parse_cache():
+    """Read a 1.1 MB Aeon 3 project with and without parse cache hit."""
+    import tempfile
+    from aeon3ywlib.json_timeline3 import JsonTimeline3
+    settings = get_settings()
+    filePath = f'{TEST_DATA_PATH}normal.aeon'
+    with tempfile.TemporaryDirectory() as cacheDir:
+        JsonTimeline3(filePath, cache_dir=cacheDir, **settings).read()
+        report('parsing', min(timeit.repeat(lambda: JsonTimeline3(filePath, **settings).read(),
+                                            number=1, repeat=5)))
+        report('cache hit', min(timeit.repeat(lambda: JsonTimeline3(filePath, cache_dir=cacheDir, **settings).read(),
+                                              number=1, repeat=5)))
+
+
+def convert_date_per_event(timestamp, duration):
+    """Reference: the former per-event date and duration computation."""
+    from datetime import datetime
+    from datetime import timedelta
+    sceneStart = datetime.min + timedelta(seconds=timestamp)
+    date, time = sceneStart.isoformat().split('T')
+    if duration['years'] > 0 or duration['months'] > 0:
+        endYear = sceneStart.year + duration['years']
+        endMonth = sceneStart.month
+        if duration['months'] > 0:
+            endMonth += duration['months']
+            while endMonth > 12:
+                endMonth -= 12
+                endYear += 1
+        sceneDuration = datetime(endYear, endMonth, sceneStart.day) - \
+                datetime(sceneStart.year, sceneStart.month, sceneStart.day)
+        lastsDays = sceneDuration.days
+        lastsHours = sceneDuration.seconds // 3600
+        lastsMinutes = (sceneDuration.seconds % 3600) // 60
+    else:
+        lastsDays = 0
+        lastsHours = 0
+        lastsMinutes = 0
+    lastsDays += duration['weeks'] * 7
+    lastsDays += duration['days']
+    lastsDays += duration['hours'] // 24
+    lastsHours += duration['hours'] % 24
+    lastsHours += duration['minutes'] // 60
+    lastsMinutes += duration['minutes'] % 60
+    lastsMinutes += duration['seconds'] // 60
+    lastsHours += lastsMinutes // 60
+    lastsMinutes %= 60
+    lastsDays += lastsHours // 24
+    lastsHours %= 24
+    return date, time, str(lastsDays), str(lastsHours), str(lastsMinutes)
+
+
+def bench_dates():
+    """Compute date, time, and duration of 100k events."""
+    from aeon3ywlib.dt_helper import convert_aeon_dates
+    from aeon3ywlib.dt_helper import np
+    from datetime import datetime
+    # The former computation fails on days that do not exist in the target month.
+    timestamps = [int((datetime(1900 + i % 100, 1 + i % 12, 1 + i % 28, i % 24, i % 60) - datetime.min).total_seconds())
+                  for i in range(100000)]
+    durations = [dict(years=i % 2, months=i % 3, weeks=0, days=i % 4, hours=i % 30, minutes=i % 70, seconds=0)
+                 for i in range(100000)]
+    reference = [convert_date_per_event(*event) for event in zip(timestamps, durations)]
+    assert convert_aeon_dates(timestamps, durations, useNumpy=False) == reference
+    report('per event', min(timeit.repeat(
+        lambda: [convert_date_per_event(*event) for event in zip(timestamps, durations)], number=1, repeat=5)))
+    report('batch', min(timeit.repeat(
+        lambda: convert_aeon_dates(timestamps, durations, useNumpy=False), number=1, repeat=5)))
+    if np is not None:
+        assert convert_aeon_dates(timestamps, durations, useNumpy=True) == reference
+        report('batch, NumPy', min(timeit.repeat(
+            lambda: convert_aeon_dates(timestamps, durations, useNumpy=True), number=1, repeat=5)))
+
+
+def bench_csv_dates():
+    """Normalize the start and end dates of 100k csv events."""
+    from aeon3ywlib.dt_helper import fix_iso_dt
+    from aeon3ywlib.dt_helper import normalize_iso_dates
+    from aeon3ywlib.dt_helper import np
+    from datetime import datetime
+    # Exports repeat the same dates many times.
+    starts = [f'19{i % 100:02}-{1 + i % 12:02}-{1 + i % 28:02} {i % 24:02}:00:00' for i in range(100000)]
+    ends = [f'19{i % 100:02}-{1 + i % 12:02}-{1 + i % 28:02} {i % 24:02}:{i % 60:02}:00' for i in range(100000)]
+
+    def per_event():
+        for start, end in zip(starts, ends):
+            datetime.fromisoformat(fix_iso_dt(end)) - datetime.fromisoformat(fix_iso_dt(start))
+
+    def batch(useNumpy):
+        memo = {}
+        for i in range(0, len(starts), 1000):
+            normalize_iso_dates(starts[i:i + 1000], memo, useNumpy)
+            normalize_iso_dates(ends[i:i + 1000], memo, useNumpy)
+
+    report('per event', min(timeit.repeat(per_event, number=1, repeat=5)))
+    report('batch, memoized', min(timeit.repeat(lambda: batch(False), number=1, repeat=5)))
+    if np is not None:
+        report('batch, memoized, NumPy', min(timeit.repeat(lambda: batch(True), number=1, repeat=5)))
+
+
+def make_csv_export(filePath, rows):
+    """Write a synthetic Aeon 3 csv export with the given number of rows.
+
+    There are 100 characters, 100 locations, and 100 chapters;
+    the other rows are events with multi-line summaries.
+    """
+    import csv
+    with open(filePath, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Type', 'Label', 'Summary', 'Narrative Position', 'Start Date', 'End Date', 'Tags',
+                         'Participant', 'Location', 'Viewpoint'])
+        for i in range(100):
+            writer.writerow(['Character', f'Character {i}', f'Bio {i}', '', '', '', '', '', '', ''])
+            writer.writerow(['Location', f'Location {i}', f'Place {i}', '', '', '', '', '', '', ''])
+            writer.writerow(['Narrative Folder', f'Chapter {i}', '', f'Chapter {i + 1}', '', '', '', '', '', ''])
+        for i in range(rows - 300):
+            writer.writerow(['Event', f'Event {i}', f'Summary of event {i},\nwith a "quote".',
+                             f'Scene {i % 100 + 1}.{i // 100 + 1}',
+                             f'19{i % 100:02}-{1 + i % 12:02}-{1 + i % 28:02} {i % 24:02}:00:00',
+                             f'19{i % 100:02}-{1 + i % 12:02}-{1 + i % 28:02} {i % 24:02}:{i % 60:02}:00', 'Tag',
+                             f'Character {i % 100},Character {(i + 1) % 100}', f'Location {i % 100}',
+                             f'Character {(i + 1) % 100}'])
+
+
+def bench_csv_parallel():
+    """Read a synthetic csv export with 1M rows, serial and with a worker process per core (at least two)."""
+    import os
+    import tempfile
+    from aeon3ywlib.csv_timeline3 import CsvTimeline3
+    settings = get_settings()
+    processes = max(os.cpu_count() or 1, 2)
+    with tempfile.TemporaryDirectory() as tempDir:
+        filePath = f'{tempDir}/export.csv'
+        make_csv_export(filePath, 1000000)
+
+        def read(**kwargs):
+            timeline = CsvTimeline3(filePath, **settings, **kwargs)
+            message = timeline.read()
+            assert message.startswith('Timeline data converted'), message
+            return timeline
+
+        serial = read()
+        parallel = read(processes=processes)
+        assert list(serial.scenes) == list(parallel.scenes)
+        assert [scene.__dict__ for scene in serial.scenes.values()] == [scene.__dict__ for scene in parallel.scenes.values()]
+        del serial, parallel
+        report('serial', min(timeit.repeat(lambda: read(), number=1, repeat=3)))
+        report(f'{processes} processes', min(timeit.repeat(lambda: read(processes=processes), number=1, repeat=3)))
+
+
+def bench_uids():
+    """Generate 100k GUIDs."""
+    import random
+    from aeon3ywlib.uid_helper import get_uids
+
+    def get_uid_per_character():
+        # The former generator, drawing each hex digit separately.
+        return '-'.join(''.join(random.choice('ABCDEF0123456789') for __ in range(size)) for size in (8, 4, 4, 4, 12))
+
+    report('per GUID and character', min(timeit.repeat(
+        lambda: [get_uid_per_character() for __ in range(100000)], number=1, repeat=3)))
+    report('bulk', min(timeit.repeat(lambda: get_uids(100000), number=1, repeat=3)))
+    report('bulk, seeded', min(timeit.repeat(lambda: get_uids(100000, seed=1), number=1, repeat=3)))
+
+
+def bench_item_builders():
+    """Build novels from synthetic projects with 10k and 100k events (about 13k and 130k items)."""
+    for events in (10000, 100000):
+        jsonData = make_project(events)
+        items = len(jsonData['data']['items']['byId'])
+        seconds = min(timeit.repeat(lambda: build_novel(jsonData), number=1, repeat=3))
+        report(f'{items} items', seconds)
+        report(f'{items} items, per 1000 items', seconds / items * 1000)
+
+
+def bench_relationships():
+    """Build novels from synthetic projects with crowd scenes (100k and 1M participant relationships)."""
+    for events, participants in ((100, 1000), (1000, 1000)):
+        jsonData = make_project(events, participants)
+        relationships = len(jsonData['data']['relationships']['byId'])
+        report(f'{relationships} relationships', min(timeit.repeat(lambda: build_novel(jsonData), number=1, repeat=3)))
+
+
+def bench_lazy():
+    """Read the counts and the chapter outline of a synthetic project with 100k events, eager and lazy."""
+    jsonData = make_project(100000)
+
+    def outline(**kwargs):
+        timeline = build_novel(jsonData, **kwargs)
+        return len(timeline.scenes), [timeline.chapters[chId].title for chId in timeline.srtChapters]
+
+    report('eager', min(timeit.repeat(lambda: outline(), number=1, repeat=3)))
+    report('lazy', min(timeit.repeat(lambda: outline(lazy=True), number=1, repeat=3)))
+    report('lazy, all scenes accessed', min(timeit.repeat(
+        lambda: [scene.date for scene in build_novel(jsonData, lazy=True).scenes.values()], number=1, repeat=3)))
+
+
+def make_deep_narrative(jsonData, depth, fanout=2):
+    """Replace the narrative of synthetic JSON data by a tree of folders, with the events in the deepest folders.
+
+    Positional arguments:
+        jsonData -- dict: JSON data as returned by make_project().
+        depth -- int: number of folder levels.
+
+    Optional arguments:
+        fanout -- int: number of subfolders per folder.
+    """
+    items = jsonData['data']['items']['byId']
+    events = [uid for uid in items if items[uid]['type'] == 'evt']
+    for uid in [uid for uid in items if items[uid]['type'] == 'fld']:
+        del items[uid]
+    root = {'id': 'root', 'children': []}
+    level = [root]
+    for i in range(depth):
+        nextLevel = []
+        for parent in level:
+            for j in range(fanout):
+                uid = f'fld{i}.{len(nextLevel)}'
+                items[uid] = dict(type='fld', label=f'Folder {uid}', summary='', tags=[], propertyValues={})
+                folder = {'id': uid, 'children': []}
+                parent['children'].append(folder)
+                nextLevel.append(folder)
+        level = nextLevel
+    for i, uid in enumerate(events):
+        level[i * len(level) // len(events)]['children'].append({'id': uid, 'children': []})
+    jsonData['data']['narrative'] = root
+
+
+def bench_narrative():
+    """Build the narrative structure of synthetic projects with 50k events, 2 and 10 levels deep."""
+    jsonData = make_project(50000)
+    for depth in (1, 9):
+        if depth > 1:
+            make_deep_narrative(jsonData, depth)
+        for policy in ('outline', 'nested'):
+            timeline = build_novel(jsonData, narrative_policy=policy)
+
+            def build_narrative():
+                timeline.srtChapters = []
+                timeline._narrativeScIds = set()
+                for chapter in timeline.chapters.values():
+                    chapter.srtScenes = []
+                    chapter.chLevel = None
+                timeline._build_narrative(jsonData['data']['narrative'])
+
+            seconds = min(timeit.repeat(build_narrative, number=1, repeat=5))
+            report(f'{depth + 1} levels, {policy}, {len(timeline.srtChapters)} chapters', seconds)
+
+
+def bench_yw7_write():
+    """Serialize and post-process test/data/normal.yw7, as written by Yw7File and Yw7Target."""
+    import os
+    import shutil
+    import tempfile
+    import xml.etree.ElementTree as ET
+    from pywriter.yw.yw7_file import Yw7File
+    from aeon3ywlib.yw7_target import Yw7Target
+
+    with tempfile.TemporaryDirectory() as tempDir:
+        filePath = os.path.join(tempDir, 'normal.yw7')
+        shutil.copyfile(f'{TEST_DATA_PATH}normal.yw7', filePath)
+        ywFile = Yw7Target(filePath)
+        ywFile.read()
+        ywFile._build_element_tree()
+
+        def write_and_postprocess():
+            # The former way: write the tree, then read, process line by line, and write the file again.
+            ywFile._write_element_tree(ywFile)
+            Yw7File._postprocess_xml_file(ywFile, filePath)
+
+        def write_in_memory():
+            ywFile._write_xml(ywFile._postprocess_xml(ET.tostring(ywFile.tree.getroot(), encoding='unicode')))
+
+        written = []
+        for write in (write_and_postprocess, write_in_memory):
+            write()
+            with open(filePath, 'rb') as f:
+                written.append(f.read())
+        assert written[0] == written[1]
+        report('write, read, post-process by line', min(timeit.repeat(write_and_postprocess, number=20, repeat=5)) / 20)
+        report('post-process in memory, write once', min(timeit.repeat(write_in_memory, number=20, repeat=5)) / 20)
+
+
+def make_yw7(filePath, chapters, scenes, words):
+    """Write a synthetic yWriter project.
+
+    Positional arguments:
+        filePath -- str: path to the yw7 file.
+        chapters -- int: number of chapters.
+        scenes -- int: number of scenes per chapter.
+        words -- int: number of words per scene.
+    """
+    from pywriter.model.chapter import Chapter
+    from pywriter.model.scene import Scene
+    from aeon3ywlib.yw7_target import Yw7Target
+
+    ywFile = Yw7Target(filePath)
+    content = ' '.join(['Lorem'] * words)
+    for i in range(chapters):
+        chId = str(i + 1)
+        ywFile.chapters[chId] = Chapter()
+        ywFile.chapters[chId].title = f'Chapter {chId}'
+        ywFile.srtChapters.append(chId)
+        for j in range(scenes):
+            scId = str(i * scenes + j + 1)
+            ywFile.scenes[scId] = Scene()
+            ywFile.scenes[scId].title = f'Scene {scId}'
+            ywFile.scenes[scId].desc = 'Summary'
+            ywFile.scenes[scId].sceneContent = content
+            ywFile.scenes[scId].tags = ['tag0', 'tag1']
+            ywFile.chapters[chId].srtScenes.append(scId)
+    ywFile.write()
+
+
+def bench_yw7_read():
+    """Read synthetic yWriter projects with 1000 scenes of 2000 words, and 50k scenes of 20 words."""
+    import os
+    import tempfile
+    import tracemalloc
+    from pywriter.yw.yw7_file import Yw7File
+    from aeon3ywlib.yw7_target import Yw7Target
+
+    with tempfile.TemporaryDirectory() as tempDir:
+        filePath = os.path.join(tempDir, 'project.yw7')
+        for chapters, scenes, words in ((10, 100, 2000), (500, 100, 20)):
+            make_yw7(filePath, chapters, scenes, words)
+            print(f'{chapters * scenes} scenes, {os.path.getsize(filePath) / 1000000:.1f} MB')
+            for name, make_file in (
+                ('Yw7File', lambda: Yw7File(filePath)),
+                ('Yw7Target, low memory', lambda: Yw7Target(filePath, low_memory=True)),
+            ):
+                tracemalloc.start()
+                ywFile = make_file()
+                ywFile.read()
+                current, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                del ywFile
+                print(f'{name:<40}{current / 1000000:10.2f} MB kept, {peak / 1000000:.2f} MB peak')
+                report(name, min(timeit.repeat(lambda: make_file().read(), number=1, repeat=3)))
+
+
+def scale_yw7(sourcePath, filePath, factor):
+    """Write a yWriter project with the elements of a source project repeated.
+
+    Positional arguments:
+        sourcePath -- str: path to the source yw7 file.
+        filePath -- str: path to the yw7 file to write.
+        factor -- int: number of copies of each location, item, character, scene, and chapter.
+
+    The IDs of the copies, and their references, are offset by a million per copy.
+    """
+    import copy
+    import xml.etree.ElementTree as ET
+
+    ID_TAGS = ('ID', 'BelongsToChID', 'ScID', 'CharID', 'LocID', 'ItemID')
+    tree = ET.parse(sourcePath)
+    root = tree.getroot()
+    for section in ('LOCATIONS', 'ITEMS', 'CHARACTERS', 'SCENES', 'CHAPTERS'):
+        xmlSection = root.find(section)
+        elements = list(xmlSection)
+        for i in range(1, factor):
+            for xmlElement in elements:
+                xmlCopy = copy.deepcopy(xmlElement)
+                for xmlId in xmlCopy.iter():
+                    if xmlId.tag in ID_TAGS:
+                        xmlId.text = str(int(xmlId.text) + i * 1000000)
+                xmlSection.append(xmlCopy)
+    tree.write(filePath, encoding='utf-8')
+
+
+def bench_yw7_parser():
+    """Read test/data/normal.yw7 scaled up 100x, with find() calls and with a child index per element."""
+    import os
+    import tempfile
+    import xml.etree.ElementTree as ET
+    from pywriter.yw.yw7_file import Yw7File
+    from aeon3ywlib.yw7_target import Yw7Target
+
+    with tempfile.TemporaryDirectory() as tempDir:
+        filePath = os.path.join(tempDir, 'project.yw7')
+        scale_yw7(f'{TEST_DATA_PATH}normal.yw7', filePath, 100)
+        ywFile = Yw7File(filePath)
+        ywFile.read()
+        print(f'{len(ywFile.scenes)} scenes, {len(ywFile.chapters)} chapters, {len(ywFile.characters)} characters')
+        del ywFile
+        report('ET.parse', min(timeit.repeat(lambda: ET.parse(filePath), number=1, repeat=3)))
+        report('Yw7File', min(timeit.repeat(lambda: Yw7File(filePath).read(), number=1, repeat=3)))
+        report('Yw7Target', min(timeit.repeat(lambda: Yw7Target(filePath).read(), number=1, repeat=3)))
+        report('Yw7Target, low memory', min(timeit.repeat(
+            lambda: Yw7Target(filePath, low_memory=True).read(), number=1, repeat=3)))
+
+
+def bench_yw7_merge():
+    """Merge scene metadata into a synthetic yWriter project with 1000 scenes of 2000 words."""
+    import os
+    import tempfile
+    from pywriter.yw.yw7_file import Yw7File
+    from aeon3ywlib.yw7_target import Yw7Target
+
+    with tempfile.TemporaryDirectory() as tempDir:
+        filePath = os.path.join(tempDir, 'project.yw7')
+        make_yw7(filePath, 10, 100, 2000)
+        print(f'{os.path.getsize(filePath) / 1000000:.1f} MB')
+        source = Yw7File(filePath)
+        source.read()
+        for scId in source.scenes:
+            # Like a timeline, the source has no scene contents.
+            source.scenes[scId]._sceneContent = None
+            source.scenes[scId].desc = 'New description'
+
+        def merge(fileClass):
+            fileClass(filePath).merge(source)
+
+        def merge_write(fileClass):
+            ywFile = fileClass(filePath)
+            ywFile.merge(source)
+            ywFile.write()
+
+        for fileClass in (Yw7File, Yw7Target):
+            report(f'{fileClass.__name__}.merge', min(timeit.repeat(lambda: merge(fileClass), number=1, repeat=3)))
+            report(f'{fileClass.__name__}.merge + write', min(timeit.repeat(
+                lambda: merge_write(fileClass), number=1, repeat=3)))
+        ywFile = Yw7Target(filePath)
+        ywFile.merge(source)
+        ywFile.write()
+        print(ywFile.ioAccount.report())
+
+
+def bench_merge_plan():
+    """Merge a source with changed scene metadata into a synthetic yWriter project with 50k scenes."""
+    import os
+    import tempfile
+    import time
+    from pywriter.yw.yw7_file import Yw7File
+    from aeon3ywlib.yw7_target import Yw7Target
+
+    with tempfile.TemporaryDirectory() as tempDir:
+        filePath = os.path.join(tempDir, 'project.yw7')
+        make_yw7(filePath, 500, 100, 20)
+        source = Yw7File(filePath)
+        source.read()
+        for i, scId in enumerate(source.scenes):
+            source.scenes[scId]._sceneContent = None
+            if i % 2:
+                source.scenes[scId].desc = 'New description'
+        for fileClass in (Yw7File, Yw7Target):
+            times = []
+            for __ in range(3):
+                # Merge into a project read before, without reading it again.
+                ywFile = fileClass(filePath)
+                ywFile.read()
+                ywFile.filePath = os.path.join(tempDir, 'new.yw7')
+                startTime = time.perf_counter()
+                ywFile.merge(source)
+                times.append(time.perf_counter() - startTime)
+            report(f'{fileClass.__name__}.merge', min(times))
+        print(f'{ywFile.fieldsChanged} fields changed')
+
+
+BENCHMARKS = dict(
+    scan_file=bench_scan_file,
+    parse_cache=bench_parse_cache,
+    item_builders=bench_item_builders,
+    relationships=bench_relationships,
+    dates=bench_dates,
+    csv_dates=bench_csv_dates,
+    csv_parallel=bench_csv_parallel,
+    uids=bench_uids,
+    lazy=bench_lazy,
+    narrative=bench_narrative,
+    yw7_write=bench_yw7_write,
+    yw7_read=bench_yw7_read,
+    yw7_parser=bench_yw7_parser,
+    yw7_merge=bench_yw7_merge,
+    merge_plan=bench_merge_plan,
+)
+
+
+def run(names):
+    for name in names:
+        print(f'--- {name}: {BENCHMARKS[name].__doc__}')
+        BENCHMARKS[name]()
+
+
+if __name__ == '__main__':
+    run(sys.argv[1:] or list(BENCHMARKS))
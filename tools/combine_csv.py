@@ -1,36 +1,41 @@
 """Combine csv files
 
+Usage: combine_csv.py [--deduplicate]
+Combine all csv files in the working directory into "combined.csv".
+The aeon3yw converter reads a directory of csv files directly,
+so this is only needed for processing the combined file otherwise.
+
 Requires Python 3.7 or above
 
 Copyright (c) 2022 Peter Triesberger
 Published under the MIT License (https://opensource.org/licenses/mit-license.php)
 """
 import os
-import csv
-
-RESULT = 'combined.csv'
-directory = os.getcwd()
-result = []
-labels = []
-
-# Read all csv files in the working directory and collect the rows in result.
-for filename in os.listdir(directory):
-    if filename.endswith('.csv') and filename != RESULT:
-        print(f'Reading {filename}')
-        with open(filename, newline='') as csvfile:
-            reader = csv.DictReader(csvfile)
-            for label in reader.fieldnames:
-                if not label in labels:
-                    labels.append(label)
-            for row in reader:
-                result.append(row)
-if result:
-    # Write result to a new csv file.
-    with open(RESULT, 'w', newline='') as csvfile:
-        writer = csv.DictWriter(csvfile, fieldnames=labels, quoting=csv.QUOTE_ALL)
-        writer.writeheader()
-        for row in result:
-            writer.writerow(row)
-        print(f'{RESULT} written.')
-else:
-    print('No csv file found.')
+import sys
+
+sys.path.insert(0, f'{os.path.dirname(os.path.abspath(__file__))}/../src')
+from aeon3ywlib.csv_combiner import CsvCombiner
+from aeon3ywlib.csv_combiner import find_csv_files
+from aeon3ywlib.csv_combiner import COMBINED_CSV as RESULT
+
+
+def main(deduplicate=False):
+    csvFiles = find_csv_files(os.getcwd())
+    if not csvFiles:
+        print('No csv file found.')
+        return
+
+    for filePath in csvFiles:
+        print(f'Reading {os.path.basename(filePath)}')
+    keyLabels = None
+    if deduplicate:
+        keyLabels = ('Label', 'Type')
+    combiner = CsvCombiner(csvFiles, keyLabels)
+    combiner.write(RESULT)
+    if deduplicate:
+        print(f'{combiner.duplicates} duplicate rows skipped.')
+    print(f'{RESULT} written.')
+
+
+if __name__ == '__main__':
+    main('--deduplicate' in sys.argv[1:])